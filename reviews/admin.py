@@ -1,6 +1,21 @@
 from django.contrib import admin
 
-from .models import Review
+from .models import (
+    ChunkedUpload,
+    Gender,
+    ImportJob,
+    ProductCategory,
+    Region,
+    Review,
+    SentimentRollup,
+    Source,
+)
+
+
+@admin.register(Region, ProductCategory, Gender, Source)
+class DimensionAdmin(admin.ModelAdmin):
+    list_display = ("id", "name")
+    search_fields = ("name",)
 
 
 @admin.register(Review)
@@ -16,6 +31,77 @@ class ReviewAdmin(admin.ModelAdmin):
         "created_at",
     )
     list_filter = ("sentiment", "region", "product_category", "gender", "date")
-    search_fields = ("review_text", "processed_text", "region", "product_category")
+    list_select_related = ("region", "product_category", "gender")
+    search_fields = (
+        "review_text",
+        "processed_text",
+        "region__name",
+        "product_category__name",
+    )
+    autocomplete_fields = ("region", "product_category", "gender", "source")
     date_hierarchy = "date"
     ordering = ("-created_at",)
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "original_name",
+        "status",
+        "worker",
+        "rows_read",
+        "created",
+        "skipped",
+        "duplicates",
+        "scored",
+        "created_at",
+        "finished_at",
+    )
+    list_filter = ("status",)
+    readonly_fields = ("mapping", "dialect", "error", "warning")
+    ordering = ("-created_at",)
+
+
+@admin.register(ChunkedUpload)
+class ChunkedUploadAdmin(admin.ModelAdmin):
+    list_display = (
+        "upload_id",
+        "original_name",
+        "status",
+        "received_bytes",
+        "total_size",
+        "updated_at",
+    )
+    list_filter = ("status",)
+    exclude = ("head",)
+    readonly_fields = ("upload_id", "part_hashes", "file_hash")
+    ordering = ("-created_at",)
+
+
+@admin.register(SentimentRollup)
+class SentimentRollupAdmin(admin.ModelAdmin):
+    # агрегат пересчитывается автоматически (reviews/rollup.py), руками не правим
+    list_display = (
+        "day",
+        "region",
+        "product_category",
+        "gender",
+        "age_bucket",
+        "source",
+        "sentiment",
+        "count",
+    )
+    list_filter = ("sentiment", "age_bucket", "gender", "source")
+    list_select_related = ("region", "product_category", "gender", "source")
+    search_fields = ("region__name", "product_category__name")
+    date_hierarchy = "day"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
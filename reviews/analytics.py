@@ -0,0 +1,183 @@
+"""
+Аналитика тональности для JSON API поверх SentimentRollup.
+
+Ответы кэшируются в алиасе settings.ANALYTICS_CACHE_ALIAS (файловый кэш,
+общий для веб-процессов и воркеров импорта). Ключ — вид отчёта, версия
+данных и нормализованные фильтры, поэтому одинаковые по смыслу запросы
+(другой порядок параметров, повторы, пробелы) попадают в одну запись.
+Любое изменение агрегата (rollup.apply_deltas, rebuild_rollup) после
+коммита меняет версию данных — старые записи просто перестают читаться
+и вытесняются по TIMEOUT/MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import SentimentRollup
+
+DATA_VERSION_KEY = "analytics:data_version"
+LIST_FILTERS = ("region", "product_category", "gender", "source")
+BUCKETS = {"day": None, "week": TruncWeek, "month": TruncMonth}
+SENTIMENTS = ("negative", "neutral", "positive", "unknown")
+
+_STATS_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "hit_seconds": 0.0, "miss_seconds": 0.0}
+
+
+def _cache():
+    return caches[settings.ANALYTICS_CACHE_ALIAS]
+
+
+def data_version() -> str:
+    version = _cache().get(DATA_VERSION_KEY)
+    if version is None:
+        version = bump_data_version()
+    return version
+
+
+def bump_data_version() -> str:
+    """
+    Новая версия данных. Это не инкремент, а уникальная метка времени:
+    у файлового кэша incr не атомарен, и два параллельных импорта могли бы
+    записать одно и то же значение, оставив в кэше устаревший ответ.
+    """
+    version = f"{time.time_ns():x}"
+    _cache().set(DATA_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def _parse_date(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"{name}: ожидается дата в формате ГГГГ-ММ-ДД")
+
+
+def parse_filters(params) -> Dict[str, object]:
+    """
+    Нормализует фильтры из QueryDict: даты в ISO, списки значений без
+    пустых строк, без повторов и отсортированы. Неизвестные параметры
+    игнорируются. ValueError — при неверной дате.
+    """
+    filters: Dict[str, object] = {}
+    for name in ("date_from", "date_to"):
+        value = params.get(name, "").strip()
+        if value:
+            filters[name] = _parse_date(value, name).isoformat()
+    if (
+        "date_from" in filters
+        and "date_to" in filters
+        and filters["date_from"] > filters["date_to"]
+    ):
+        raise ValueError("date_from позже date_to")
+    for name in LIST_FILTERS:
+        values = sorted({v.strip() for v in params.getlist(name) if v.strip()})
+        if values:
+            filters[name] = values
+    return filters
+
+
+def cache_key(kind: str, filters: Dict[str, object], version: str) -> str:
+    raw = json.dumps(filters, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+    return f"analytics:{kind}:{version}:{digest}"
+
+
+def _rollup_rows(filters: Dict[str, object]):
+    qs = SentimentRollup.objects.order_by()
+    if "date_from" in filters:
+        qs = qs.filter(day__gte=filters["date_from"])
+    if "date_to" in filters:
+        qs = qs.filter(day__lte=filters["date_to"])
+    for name in LIST_FILTERS:
+        if name in filters:
+            # фильтры приходят именами; справочники маленькие, JOIN дешёвый
+            qs = qs.filter(**{f"{name}__name__in": filters[name]})
+    return qs
+
+
+def _label(sentiment: str) -> str:
+    return sentiment or "unknown"
+
+
+def sentiment_distribution(filters: Dict[str, object]) -> dict:
+    counts = dict.fromkeys(SENTIMENTS, 0)
+    rows = _rollup_rows(filters).values("sentiment").annotate(n=Sum("count"))
+    for row in rows:
+        counts[_label(row["sentiment"])] += row["n"]
+    return {"total": sum(counts.values()), "sentiment": counts}
+
+
+def sentiment_timeseries(filters: Dict[str, object], bucket: str = "day") -> dict:
+    """Число отзывов по тональностям за каждый день/неделю/месяц (без дат — мимо)."""
+    trunc = BUCKETS[bucket]
+    qs = _rollup_rows(filters).filter(day__isnull=False)
+    qs = qs.annotate(period=trunc("day") if trunc else F("day"))
+    rows = qs.values("period", "sentiment").annotate(n=Sum("count"))
+
+    series: Dict[str, Dict[str, int]] = {}
+    for row in rows:
+        period = row["period"].isoformat()
+        point = series.setdefault(period, dict.fromkeys(SENTIMENTS, 0))
+        point[_label(row["sentiment"])] += row["n"]
+    return {
+        "bucket": bucket,
+        "series": [{"period": p, **series[p]} for p in sorted(series)],
+    }
+
+
+def cached_report(
+    kind: str, filters: Dict[str, object], compute: Callable[[], dict]
+) -> tuple:
+    """
+    Отчёт из кэша или compute(). Возвращает (данные, hit). Время ответа
+    и попадания копятся в cache_stats().
+    """
+    started = time.perf_counter()
+    version = data_version()
+    key = cache_key(kind, filters, version)
+    cache = _cache()
+    data = cache.get(key)
+    hit = data is not None
+    if not hit:
+        data = {**compute(), "filters": filters, "data_version": version}
+        cache.set(key, data)
+    elapsed = time.perf_counter() - started
+    with _STATS_LOCK:
+        _STATS["hits" if hit else "misses"] += 1
+        _STATS["hit_seconds" if hit else "miss_seconds"] += elapsed
+    return data, hit
+
+
+def cache_stats() -> dict:
+    """Статистика кэша отчётов в этом процессе: доля попаданий и среднее время."""
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    total = stats["hits"] + stats["misses"]
+
+    def mean_ms(seconds: float, n: int) -> Optional[float]:
+        return 1000 * seconds / n if n else None
+
+    return {
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "hit_rate": stats["hits"] / total if total else 0.0,
+        "mean_hit_ms": mean_ms(stats["hit_seconds"], stats["hits"]),
+        "mean_miss_ms": mean_ms(stats["miss_seconds"], stats["misses"]),
+        "data_version": data_version(),
+    }
+
+
+def reset_cache_stats() -> None:
+    with _STATS_LOCK:
+        for key in _STATS:
+            _STATS[key] = 0 if key in ("hits", "misses") else 0.0
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ReviewsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "reviews"
+
+    def ready(self):
+        from reviews import signals  # noqa: F401  (rollup по save/delete)
+
+        # по умолчанию словари грузятся лениво; воркеры, которые сразу
+        # обрабатывают тексты, могут прогреть их при старте
+        if settings.PRELOAD_TEXT_RESOURCES:
+            from reviews.text_preprocess import preload
+
+            preload()
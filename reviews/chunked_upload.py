@@ -0,0 +1,213 @@
+"""
+Загрузка больших файлов по частям с докачкой.
+
+Клиент создаёт загрузку (create_upload) и шлёт части фиксированного размера
+строго по порядку. Каждая часть потоково пишется прямо в файл загрузки в
+TMP_DIR (без буферизации запроса целиком и без повторного чтения) и
+засчитывается, только когда совпали размер и sha256 из заголовка запроса;
+иначе файл обрезается до уже принятых байт.
+После обрыва клиент запрашивает upload_status и продолжает со следующей
+части. Хэш файла и сэмпл для диалекта CSV считаются по ходу записи, поэтому
+перед импортом файл заново не читается.
+"""
+
+import fcntl
+import hashlib
+import os
+import uuid
+from typing import BinaryIO, Dict, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from .forms import ALLOWED_EXTENSIONS
+from .models import ChunkedUpload
+from .utils import (
+    CSV_EXTS,
+    SNIFF_MAX_BYTES,
+    dialect_from_sample,
+    get_ext,
+    sample_from_head,
+)
+
+TMP_DIR = os.path.join(settings.MEDIA_ROOT, "uploads", "tmp")
+READ_BLOCK = 64 * 1024
+
+
+class UploadError(ValueError):
+    """Нарушение протокола загрузки; status — HTTP-код ответа API."""
+
+    def __init__(self, message: str, status: int = 400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def create_upload(filename: str, total_size: int) -> ChunkedUpload:
+    ext = get_ext(filename)
+    if not filename.lower().endswith(ALLOWED_EXTENSIONS):
+        raise UploadError(
+            "Неподдерживаемый тип файла. Разрешены: CSV, XLSX, JSON, NDJSON."
+        )
+    if total_size <= 0:
+        raise UploadError("Пустой файл.")
+    if total_size > settings.REVIEWS_CHUNKED_UPLOAD_MAX_MB * 1024 * 1024:
+        raise UploadError(
+            f"Размер файла превышает {settings.REVIEWS_CHUNKED_UPLOAD_MAX_MB} МБ."
+        )
+
+    os.makedirs(TMP_DIR, exist_ok=True)
+    path = os.path.join(TMP_DIR, f"{uuid.uuid4().hex}{ext}")
+    open(path, "wb").close()
+    return ChunkedUpload.objects.create(
+        original_name=filename,
+        file_path=path,
+        total_size=total_size,
+        part_size=settings.REVIEWS_UPLOAD_PART_BYTES,
+    )
+
+
+def upload_status(upload: ChunkedUpload) -> dict:
+    """Состояние загрузки: с какой части продолжать после обрыва."""
+    return {
+        "upload_id": str(upload.upload_id),
+        "status": upload.status,
+        "part_size": upload.part_size,
+        "total_size": upload.total_size,
+        "received_bytes": upload.received_bytes,
+        "parts_total": upload.parts_total,
+        "parts_received": upload.parts_received,
+        "file_hash": upload.file_hash,
+    }
+
+
+def _accepted(upload: ChunkedUpload, index: int, expected_sha256: str) -> bool:
+    """
+    True — часть index уже принята (повтор после потерянного ответа).
+    Часть не по порядку или повтор с другим sha256 — UploadError 409.
+    """
+    if upload.is_complete:
+        raise UploadError("Загрузка уже завершена.", status=409)
+    received = upload.parts_received
+    if index < received:
+        if expected_sha256 != upload.part_hashes[index]:
+            raise UploadError(f"Часть {index} уже принята с другим sha256.", status=409)
+        return True
+    if index != received or index >= upload.parts_total:
+        raise UploadError(
+            f"Ожидается часть {received}.", status=409, expected_part=received
+        )
+    return False
+
+
+def write_part(
+    upload: ChunkedUpload,
+    index: int,
+    stream: BinaryIO,
+    expected_sha256: Optional[str] = None,
+) -> ChunkedUpload:
+    """
+    Дописывает часть index из stream в файл загрузки.
+
+    Повтор уже принятой части (ответ потерялся при обрыве) не пишется
+    заново — только сверяется хэш. Часть без sha256, не по порядку, неполная
+    или с неверным sha256 отклоняется; файл обрезается до принятых байт.
+    """
+    expected_sha256 = (expected_sha256 or "").strip().lower()
+    if not expected_sha256:
+        raise UploadError("Нет заголовка X-Content-SHA256 с sha256 части.")
+    if _accepted(upload, index, expected_sha256):
+        return upload
+
+    with open(upload.file_path, "r+b") as f:
+        # части одной загрузки пишутся по одной: второй запрос (повтор, пока
+        # первый ещё читает тело) сразу получает 409, а не пишет поверх
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError(
+                f"Часть {index} уже записывается другим запросом.",
+                status=409,
+                expected_part=upload.parts_received,
+            ) from None
+        upload.refresh_from_db()
+        if _accepted(upload, index, expected_sha256):
+            return upload
+
+        offset = upload.received_bytes
+        size = min(upload.part_size, upload.total_size - offset)
+        head = bytes(upload.head)
+        digest = hashlib.sha256()
+        written = 0
+        # байты пишутся сразу на место в файле; received_bytes продвигается
+        # только после проверки, до этого они считаются непринятыми
+        f.seek(offset)
+        f.truncate()  # хвост от оборванного запроса
+        try:
+            while written <= size:
+                block = stream.read(min(READ_BLOCK, size + 1 - written))
+                if not block:
+                    break
+                written += len(block)
+                if written > size:
+                    break
+                digest.update(block)
+                f.write(block)
+                if len(head) < SNIFF_MAX_BYTES:
+                    head += block[: SNIFF_MAX_BYTES - len(head)]
+
+            if written != size:
+                raise UploadError(f"Размер части {index}: ожидалось {size} байт.")
+            part_hash = digest.hexdigest()
+            if part_hash != expected_sha256:
+                raise UploadError(f"sha256 части {index} не совпадает.")
+            f.flush()
+
+            claimed = ChunkedUpload.objects.filter(
+                pk=upload.pk, received_bytes=offset
+            ).update(
+                received_bytes=offset + size,
+                part_hashes=upload.part_hashes + [part_hash],
+                head=head,
+                updated_at=timezone.now(),
+            )
+            if not claimed:
+                raise UploadError(
+                    f"Часть {index} уже принята другим запросом.", status=409
+                )
+        except BaseException:
+            # непринятые байты не остаются в файле
+            upload.refresh_from_db()
+            f.truncate(upload.received_bytes)
+            raise
+
+    upload.refresh_from_db()
+    return upload
+
+
+def complete_upload(upload: ChunkedUpload) -> ChunkedUpload:
+    """
+    Завершает загрузку, когда все байты на диске. file_hash — sha256 от
+    склеенных sha256 частей с числом частей через дефис (как ETag у
+    multipart-загрузок S3): его можно сверить на клиенте без чтения файла.
+    """
+    if upload.is_complete:
+        return upload
+    if upload.received_bytes != upload.total_size:
+        raise UploadError(
+            f"Получено {upload.received_bytes} из {upload.total_size} байт.",
+            status=409,
+            expected_part=upload.parts_received,
+        )
+    joined = "".join(upload.part_hashes).encode()
+    upload.file_hash = f"{hashlib.sha256(joined).hexdigest()}-{upload.parts_received}"
+    upload.status = ChunkedUpload.STATUS_COMPLETE
+    upload.save(update_fields=["file_hash", "status", "updated_at"])
+    return upload
+
+
+def upload_dialect(upload: ChunkedUpload) -> Optional[Dict[str, str]]:
+    """Диалект CSV по сохранённому началу файла; None — не CSV."""
+    if get_ext(upload.original_name) not in CSV_EXTS:
+        return None
+    return dialect_from_sample(*sample_from_head(bytes(upload.head), upload.total_size))
@@ -0,0 +1,67 @@
+"""
+Перевод строковых значений измерений (регион, категория, пол, источник)
+в id справочников для импорта.
+
+DimensionCache держит соответствие имя -> id в памяти на весь импорт.
+Для чанка недостающие имена ищутся одним запросом на справочник, а
+отсутствующие в БД создаются одним bulk_create — без get_or_create на
+каждую строку. Кэш живёт только в пределах импорта: справочник могут
+почистить через админку, и долгоживущий кэш раздавал бы удалённые id.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from .models import Gender, ProductCategory, Region, Source
+
+# поле Review -> модель справочника
+DIMENSIONS = {
+    "region": Region,
+    "product_category": ProductCategory,
+    "gender": Gender,
+    "source": Source,
+}
+
+LOOKUP_BATCH = 900
+
+
+class DimensionCache:
+    def __init__(self):
+        self._ids: Dict[str, Dict[str, int]] = {field: {} for field in DIMENSIONS}
+
+    def _load(self, field: str, names: List[str]) -> None:
+        cache = self._ids[field]
+        model = DIMENSIONS[field]
+        for start in range(0, len(names), LOOKUP_BATCH):
+            chunk = names[start : start + LOOKUP_BATCH]
+            cache.update(
+                model.objects.filter(name__in=chunk)
+                .order_by()
+                .values_list("name", "id")
+            )
+
+    def resolve(self, field: str, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Bulk get-or-create непустых имён field. Возвращает словарь имя -> id
+        (весь кэш справочника). ignore_conflicts: то же имя мог только что
+        создать параллельный импорт — тогда id просто дочитывается.
+        """
+        cache = self._ids[field]
+        missing = sorted({name for name in names if name and name not in cache})
+        if not missing:
+            return cache
+        self._load(field, missing)
+        new = [name for name in missing if name not in cache]
+        if new:
+            model = DIMENSIONS[field]
+            model.objects.bulk_create(
+                [model(name=name) for name in new],
+                batch_size=LOOKUP_BATCH,
+                ignore_conflicts=True,
+            )
+            self._load(field, new)
+        return cache
+
+    def ids(self, field: str, names: List[str]) -> List[Optional[int]]:
+        """id для каждого имени из names; пустое имя -> None."""
+        cache = self.resolve(field, names)
+        return [cache[name] if name else None for name in names]
@@ -1,12 +1,25 @@
 from django import forms
+from django.conf import settings
 
-ALLOWED_EXTENSIONS = (".csv", ".xlsx", ".xls", ".json")
+from .models import Review
+
+ALLOWED_EXTENSIONS = (".csv", ".xlsx", ".xls", ".json", ".ndjson", ".jsonl")
 
 
 class UploadFileForm(forms.Form):
     file = forms.FileField(
         label="Файл с отзывами (CSV / XLSX / JSON)",
-        help_text="Макс. 20 МБ; поддерживаются CSV, XLSX, JSON",
+        help_text=(
+            f"Макс. {settings.REVIEWS_UPLOAD_MAX_MB} МБ (по частям — до "
+            f"{settings.REVIEWS_CHUNKED_UPLOAD_MAX_MB} МБ); "
+            "поддерживаются CSV, XLSX, JSON, NDJSON"
+        ),
+    )
+    sheet = forms.CharField(
+        label="Лист Excel",
+        required=False,
+        max_length=100,
+        help_text="Имя или номер листа (с 1); по умолчанию первый",
     )
 
     def clean_file(self):
@@ -15,12 +28,15 @@ class UploadFileForm(forms.Form):
         # простая проверка расширения
         if not name.endswith(ALLOWED_EXTENSIONS):
             raise forms.ValidationError(
-                "Неподдерживаемый тип файла. Разрешены: CSV, XLSX, JSON."
+                "Неподдерживаемый тип файла. Разрешены: CSV, XLSX, JSON, NDJSON."
             )
-        # ограничение на размер файла (пример: 20 МБ)
-        limit = 20 * 1024 * 1024
+        # импорт потоковый (reviews/importer.py), память от размера не зависит;
+        # лимит ограничивает место во временном каталоге
+        limit = settings.REVIEWS_UPLOAD_MAX_MB * 1024 * 1024
         if f.size > limit:
-            raise forms.ValidationError("Размер файла превышает 20 МБ.")
+            raise forms.ValidationError(
+                f"Размер файла превышает {settings.REVIEWS_UPLOAD_MAX_MB} МБ."
+            )
         return f
 
 
@@ -46,5 +62,46 @@ def make_column_mapping_form(choices):
         source = forms.ChoiceField(
             label="Источник", required=False, choices=col_choices
         )
+        # не колонка: опция импорта, в маппинг не попадает
+        score_sentiment = forms.BooleanField(
+            label="Сразу определить тональность",
+            required=False,
+            initial=True,
+            help_text="Если модель ещё не обучена, отзывы сохранятся без тональности",
+        )
 
     return ColumnMappingForm
+
+
+class ReviewFilterForm(forms.Form):
+    """Фильтры браузера отзывов (GET-параметры reviews_list)."""
+
+    sentiment = forms.ChoiceField(
+        label="Тональность",
+        required=False,
+        choices=[("", "— любая —")]
+        + [(v, v) for v, _ in Review.SENTIMENT_CHOICES if v]
+        + [("unknown", "unknown")],
+    )
+    region = forms.CharField(label="Регион", required=False, max_length=128)
+    product_category = forms.CharField(
+        label="Категория", required=False, max_length=128
+    )
+    date_from = forms.DateField(label="Дата с", required=False)
+    date_to = forms.DateField(label="Дата по", required=False)
+
+    def filter(self, qs):
+        """Применяет валидные фильтры к queryset (равенство, без LIKE — по индексам)."""
+        data = self.cleaned_data
+        if data.get("sentiment"):
+            sentiment = "" if data["sentiment"] == "unknown" else data["sentiment"]
+            qs = qs.filter(sentiment=sentiment)
+        for name in ("region", "product_category"):
+            value = (data.get(name) or "").strip()
+            if value:
+                qs = qs.filter(**{f"{name}__name": value})
+        if data.get("date_from"):
+            qs = qs.filter(date__gte=data["date_from"])
+        if data.get("date_to"):
+            qs = qs.filter(date__lte=data["date_to"])
+        return qs
@@ -0,0 +1,219 @@
+"""
+Очередь фоновых импортов поверх таблицы ImportJob (без Redis и брокеров).
+
+Воркер забирает задачу условным UPDATE ... WHERE status='queued': из
+нескольких воркеров, выбравших одну и ту же задачу, строку обновит только
+один, остальные возьмут следующую. Счётчики прогресса пишутся после
+коммита каждого чанка, страница задачи опрашивает их через JSON.
+"""
+
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import Optional
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .importer import ImportStats, import_reviews_file
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+CLAIM_ATTEMPTS = 5
+
+
+class JobLost(Exception):
+    """Задачу, которую выполняет воркер, уже пометил ошибкой fail_stale_jobs."""
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_import(
+    file_path: str,
+    original_name: str,
+    mapping: dict,
+    dialect: Optional[dict] = None,
+    score_sentiment: bool = False,
+) -> ImportJob:
+    return ImportJob.objects.create(
+        file_path=file_path,
+        original_name=original_name,
+        mapping=mapping,
+        dialect=dialect,
+        score_sentiment=score_sentiment,
+        bytes_total=os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+    )
+
+
+def claim_next_job(worker: str) -> Optional[ImportJob]:
+    """Атомарно переводит самую старую задачу из queued в running."""
+    for _ in range(CLAIM_ATTEMPTS):
+        job_id = (
+            ImportJob.objects.filter(status=ImportJob.STATUS_QUEUED)
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        now = timezone.now()
+        claimed = ImportJob.objects.filter(
+            id=job_id, status=ImportJob.STATUS_QUEUED
+        ).update(
+            status=ImportJob.STATUS_RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return ImportJob.objects.get(id=job_id)
+    return None
+
+
+def fail_stale_jobs(timeout: timedelta) -> int:
+    """
+    Задачи, чей воркер не обновлял прогресс дольше timeout (упал или был
+    убит), помечаются ошибкой. Повторно в очередь они не ставятся: часть
+    чанков уже в БД, и повторный импорт создал бы дубли.
+    """
+    deadline = timezone.now() - timeout
+    return ImportJob.objects.filter(
+        Q(heartbeat_at__lt=deadline) | Q(heartbeat_at__isnull=True),
+        status=ImportJob.STATUS_RUNNING,
+    ).update(
+        status=ImportJob.STATUS_FAILED,
+        error="Воркер перестал отвечать",
+        finished_at=timezone.now(),
+    )
+
+
+def _owned(job: ImportJob):
+    """
+    Задача, пока она всё ещё running у этого воркера. Если fail_stale_jobs
+    успел пометить её ошибкой, запись воркера уже ничего не меняет.
+    """
+    return ImportJob.objects.filter(
+        id=job.id, status=ImportJob.STATUS_RUNNING, worker=job.worker
+    )
+
+
+def _heartbeat(job: ImportJob) -> None:
+    if not _owned(job).update(heartbeat_at=timezone.now()):
+        raise JobLost(job.id)
+
+
+def _save_progress(job: ImportJob, stats: ImportStats) -> None:
+    """
+    Пишет счётчики после коммита чанка. Если задача уже не наша, JobLost
+    останавливает импорт: следующие чанки в БД не попадут.
+    """
+    updated = _owned(job).update(
+        rows_read=stats.rows_read,
+        created=stats.created,
+        skipped=stats.skipped,
+        duplicates=stats.duplicates,
+        scored=stats.scored,
+        warning=stats.scoring_error,
+        bytes_read=stats.bytes_read,
+        bytes_total=stats.bytes_total,
+        heartbeat_at=timezone.now(),
+    )
+    if not updated:
+        raise JobLost(job.id)
+
+
+def run_job(job: ImportJob) -> ImportJob:
+    """Выполняет уже захваченную задачу; временный файл удаляется при успехе."""
+    try:
+        # первый чанк может читаться и размечаться долго — отмечаемся до него
+        _heartbeat(job)
+        stats = import_reviews_file(
+            job.file_path,
+            job.original_name,
+            job.mapping,
+            progress=lambda stats: _save_progress(job, stats),
+            dialect=job.dialect,
+            score_sentiment=job.score_sentiment,
+        )
+    except JobLost:
+        finished = 0
+    except Exception as e:
+        finished = _owned(job).update(
+            status=ImportJob.STATUS_FAILED,
+            error=str(e) or e.__class__.__name__,
+            finished_at=timezone.now(),
+        )
+    else:
+        finished = _owned(job).update(
+            status=ImportJob.STATUS_DONE,
+            rows_read=stats.rows_read,
+            created=stats.created,
+            skipped=stats.skipped,
+            duplicates=stats.duplicates,
+            scored=stats.scored,
+            warning=stats.scoring_error,
+            bytes_read=stats.bytes_total,
+            bytes_total=stats.bytes_total,
+            finished_at=timezone.now(),
+        )
+        if finished:
+            try:
+                os.remove(job.file_path)
+            except OSError:
+                pass
+    if not finished:
+        logger.warning(
+            "Задача импорта %s уже не принадлежит воркеру %s, импорт остановлен",
+            job.id,
+            job.worker,
+        )
+    job.refresh_from_db()
+    return job
+
+
+def job_progress(job: ImportJob) -> dict:
+    """Снимок прогресса для JSON-опроса со страницы задачи."""
+    now = timezone.now()
+    elapsed = None
+    if job.started_at:
+        elapsed = ((job.finished_at or now) - job.started_at).total_seconds()
+
+    rows_per_second = None
+    eta_seconds = None
+    if elapsed and elapsed > 0:
+        rows_per_second = job.rows_read / elapsed
+        if (
+            job.status == ImportJob.STATUS_RUNNING
+            and job.bytes_total
+            and job.bytes_read
+        ):
+            remaining = max(job.bytes_total - job.bytes_read, 0)
+            eta_seconds = elapsed * remaining / job.bytes_read
+
+    percent = None
+    if job.status == ImportJob.STATUS_DONE:
+        percent = 100.0
+    elif job.bytes_total:
+        percent = min(100.0, 100.0 * job.bytes_read / job.bytes_total)
+
+    return {
+        "id": job.id,
+        "status": job.status,
+        "status_display": job.get_status_display(),
+        "finished": job.is_finished,
+        "error": job.error,
+        "warning": job.warning,
+        "rows_read": job.rows_read,
+        "created": job.created,
+        "skipped": job.skipped,
+        "duplicates": job.duplicates,
+        "scored": job.scored,
+        "percent": percent,
+        "elapsed_seconds": elapsed,
+        "rows_per_second": rows_per_second,
+        "eta_seconds": eta_seconds,
+    }
@@ -0,0 +1,412 @@
+"""
+Потоковый импорт отзывов из файла в БД.
+
+Файл читается чанками по chunk_rows строк; каждый чанк предобрабатывается
+(preprocess_many) и записывается одним bulk_create внутри своей транзакции.
+С score_sentiment=True чанк ещё и размечается моделью тональности до вставки,
+и отдельный проход manage.py apply_sentiment_model не нужен.
+В памяти одновременно находится только один чанк, поэтому пиковое
+потребление памяти не зависит от размера файла.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from reviews.text_preprocess import pipeline_version, preprocess_many
+
+from .dimensions import DIMENSIONS, DimensionCache
+from .models import Review
+from .rollup import add_reviews
+from .utils import (
+    CSV_EXTS,
+    JSON_EXTS,
+    NDJSON_EXTS,
+    XLS_EXTS,
+    XLSX_EXTS,
+    excel_sheet_name,
+    get_ext,
+    iter_json_records,
+    iter_xlsx_batches,
+    read_csv_with_dialect,
+    series_to_date_or_none,
+    series_to_int_or_none,
+    series_to_str_or_empty,
+    sniff_csv_dialect,
+)
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_ROWS = settings.REVIEWS_IMPORT_CHUNK_ROWS
+
+HASH_LOOKUP_BATCH = 900
+
+# поле Review -> ключ маппинга колонок (см. make_column_mapping_form)
+MAPPED_FIELDS = ("date", "region", "product_category", "gender", "age", "source")
+
+
+@dataclass
+class ImportStats:
+    rows_read: int = 0
+    created: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    scored: int = 0
+    chunks: int = 0
+    bytes_read: int = 0
+    bytes_total: int = 0
+    # почему разметка тональности была отключена посреди импорта (нет модели)
+    scoring_error: str = ""
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows_read / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Оценка оставшегося времени по доле прочитанных байт файла."""
+        if not self.bytes_total or not self.bytes_read:
+            return None
+        remaining = max(self.bytes_total - self.bytes_read, 0)
+        return self.elapsed * remaining / self.bytes_read
+
+
+def _records_chunks(records, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    # dtype=object: значения остаются как в JSON, без приведения колонки
+    # к float из-за пропусков в отдельном чанке
+    chunk: List[dict] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_rows:
+            yield pd.DataFrame(chunk, dtype=object)
+            chunk = []
+    if chunk:
+        yield pd.DataFrame(chunk, dtype=object)
+
+
+class FileChunkReader:
+    """
+    Итератор чанков DataFrame по chunk_rows строк из CSV/NDJSON/JSON/XLSX.
+
+    CSV, NDJSON и JSON-массив читаются потоково, tell() — сколько байт файла
+    уже прочитано (для оценки ETA). XLSX читается потоково по строкам листа
+    (прогресс по байтам для него недоступен), старый XLS — целиком.
+    dialect — параметры чтения из шага 1: результат sniff_csv_dialect для
+    CSV или {"sheet": ...} для Excel.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        filename: str,
+        chunk_rows: int = IMPORT_CHUNK_ROWS,
+        dialect: Optional[Dict[str, str]] = None,
+    ):
+        self.path = path
+        self.filename = filename
+        self.chunk_rows = chunk_rows
+        self.dialect = dialect
+        self.size = os.path.getsize(path)
+        self._file = None
+        self._done = False
+
+    def tell(self) -> int:
+        if self._done:
+            return self.size
+        if self._file is not None and not self._file.closed:
+            return self._file.tell()
+        return 0
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        ext = get_ext(self.filename)
+        if ext in CSV_EXTS:
+            chunks = self._csv_chunks()
+        elif ext in JSON_EXTS or ext in NDJSON_EXTS:
+            chunks = self._json_chunks()
+        elif ext in XLS_EXTS:
+            chunks = self._excel_chunks()
+        else:
+            raise ValueError("Неподдерживаемый формат файла")
+        yield from chunks
+        self._done = True
+
+    def _csv_chunks(self) -> Iterator[pd.DataFrame]:
+        # диалект определяется один раз по сэмплу (или приходит из шага 1),
+        # дальше файл читает C-парсер без перебора кодировок и разделителей
+        dialect = self.dialect or sniff_csv_dialect(self.path)
+        with open(self.path, "rb") as f:
+            self._file = f
+            # dtype=str: тип колонки не зависит от того, какие строки попали
+            # в чанк (иначе возраст "30" в чанке с пропуском стал бы 30.0)
+            yield from read_csv_with_dialect(
+                f, dialect, chunksize=self.chunk_rows, dtype=str
+            )
+
+    def _json_chunks(self) -> Iterator[pd.DataFrame]:
+        # массив и NDJSON разбираются потоково (utils.iter_json_records)
+        with open(self.path, "rb") as f:
+            self._file = f
+            yield from _records_chunks(iter_json_records(f), self.chunk_rows)
+
+    def _excel_chunks(self) -> Iterator[pd.DataFrame]:
+        sheet = (self.dialect or {}).get("sheet")
+        if get_ext(self.filename) in XLSX_EXTS:
+            # dtype=object: значения ячеек как есть (int, datetime, None)
+            for header, rows in iter_xlsx_batches(self.path, self.chunk_rows, sheet):
+                yield pd.DataFrame(rows, columns=header, dtype=object)
+            return
+        df = pd.read_excel(self.path, sheet_name=excel_sheet_name(sheet))
+        for start in range(0, len(df), self.chunk_rows):
+            yield df.iloc[start : start + self.chunk_rows]
+
+
+def iter_file_chunks(
+    path: str,
+    filename: str,
+    chunk_rows: int = IMPORT_CHUNK_ROWS,
+    dialect: Optional[Dict[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Читает файл чанками DataFrame (см. FileChunkReader)."""
+    return iter(FileChunkReader(path, filename, chunk_rows, dialect))
+
+
+# поле Review -> (векторный конвертер, значение при отсутствии колонки)
+_FIELD_CONVERTERS = {
+    "date": (series_to_date_or_none, None),
+    "region": (series_to_str_or_empty, ""),
+    "product_category": (series_to_str_or_empty, ""),
+    "gender": (series_to_str_or_empty, ""),
+    "age": (series_to_int_or_none, None),
+    "source": (series_to_str_or_empty, ""),
+}
+
+
+def build_reviews(
+    df: pd.DataFrame,
+    mapping: Dict[str, str],
+    dimensions: Optional[DimensionCache] = None,
+) -> tuple:
+    """
+    Превращает чанк в список несохранённых Review. Возвращает (reviews, skipped).
+
+    Колонки конвертируются целиком (series_to_* из utils) — результат тот же,
+    что у to_str_or_empty / to_int_or_none / parse_date_or_none по строкам.
+    Строки измерений переводятся в id справочников через dimensions
+    (одна bulk-операция на справочник), content_hash считается по именам.
+    """
+    if dimensions is None:
+        dimensions = DimensionCache()
+    texts = series_to_str_or_empty(df[mapping["review_text"]])
+    n = len(texts)
+    values = {}
+    for name in MAPPED_FIELDS:
+        convert, default = _FIELD_CONVERTERS[name]
+        col = mapping.get(name) or None
+        if col and col in df.columns:
+            values[name] = convert(df[col])
+        else:
+            values[name] = [default] * n
+
+    kept = [i for i, text in enumerate(texts) if text]
+    ids = {
+        name: dimensions.ids(name, [values[name][i] for i in kept])
+        for name in DIMENSIONS
+    }
+
+    reviews = []
+    for j, i in enumerate(kept):
+        reviews.append(
+            Review(
+                review_text=texts[i],
+                sentiment="",
+                date=values["date"][i],
+                region_id=ids["region"][j],
+                product_category_id=ids["product_category"][j],
+                gender_id=ids["gender"][j],
+                age=values["age"][i],
+                source_id=ids["source"][j],
+                content_hash=Review.make_content_hash(
+                    texts[i],
+                    values["date"][i],
+                    values["region"][i],
+                    values["product_category"][i],
+                    values["gender"][i],
+                    values["age"][i],
+                    values["source"][i],
+                ),
+            )
+        )
+    return reviews, n - len(kept)
+
+
+def existing_content_hashes(hashes) -> set:
+    """Какие из хэшей уже есть в БД — запросами по HASH_LOOKUP_BATCH штук."""
+    hashes = list(hashes)
+    found = set()
+    for start in range(0, len(hashes), HASH_LOOKUP_BATCH):
+        chunk = hashes[start : start + HASH_LOOKUP_BATCH]
+        # exclude — то же условие, что у частичного уникального индекса,
+        # поэтому SQLite его использует; order_by() убирает сортировку Meta
+        qs = Review.objects.filter(content_hash__in=chunk).exclude(content_hash="")
+        found.update(qs.order_by().values_list("content_hash", flat=True))
+    return found
+
+
+def drop_duplicates(reviews: List[Review]) -> tuple:
+    """
+    Отбрасывает отзывы (с уже посчитанным content_hash), которые есть в БД
+    или повторяются внутри чанка. Возвращает (новые отзывы, число дублей).
+    """
+    seen = existing_content_hashes({r.content_hash for r in reviews})
+    unique = []
+    for r in reviews:
+        if r.content_hash not in seen:
+            seen.add(r.content_hash)
+            unique.append(r)
+    return unique, len(reviews) - len(unique)
+
+
+def insert_reviews(reviews: List[Review]) -> List[Review]:
+    """
+    Вставляет отзывы и возвращает те, что действительно попали в БД.
+
+    Параллельный импорт мог вставить тот же отзыв между drop_duplicates и
+    вставкой. Тогда уникальный индекс по content_hash откатывает savepoint,
+    уже занятые хэши отбрасываются, и вставка повторяется с остатком.
+    Вызывается внутри транзакции чанка.
+    """
+    while reviews:
+        try:
+            with transaction.atomic():
+                Review.objects.bulk_create(reviews, batch_size=1000)
+            return reviews
+        except IntegrityError:
+            taken = existing_content_hashes({r.content_hash for r in reviews})
+            if not taken:
+                raise
+            reviews = [r for r in reviews if r.content_hash not in taken]
+            # первые батчи могли получить id до отката savepoint
+            for r in reviews:
+                r.pk = None
+                r._state.adding = True
+    return reviews
+
+
+def preprocess_reviews(reviews: List[Review], version: str) -> None:
+    # лемматизируем чанк целиком: каждый уникальный токен — один раз
+    processed = preprocess_many([r.review_text for r in reviews])
+    for r, text in zip(reviews, processed):
+        r.processed_text = text
+        r.processed_version = version
+
+
+def score_reviews(reviews: List[Review], version: str) -> int:
+    """
+    Предобработка и разметка чанка одним батчем модели. Возвращает, сколько
+    отзывов получили тональность. RuntimeError (нет артефактов модели)
+    пробрасывается — решение о фолбэке принимает import_chunks.
+    """
+    # импорт здесь: importer грузится вместе с URLconf, а модель и scipy
+    # нужны только импортам с разметкой
+    from .ml_inference import preprocess_and_predict_batch
+
+    predictions = preprocess_and_predict_batch([r.review_text for r in reviews])
+    scored = 0
+    for r, prediction in zip(reviews, predictions):
+        r.processed_text = prediction.processed_text
+        r.processed_version = version
+        r.sentiment = prediction.label
+        scored += bool(prediction.label)
+    return scored
+
+
+def import_chunks(
+    chunks,
+    mapping: Dict[str, str],
+    progress: Optional[Callable[[ImportStats], None]] = None,
+    score_sentiment: bool = False,
+) -> ImportStats:
+    """
+    Импортирует поток чанков DataFrame. Каждый чанк коммитится отдельной
+    транзакцией; после коммита вызывается progress(stats). Исключение из
+    progress останавливает импорт: следующие чанки не читаются.
+    Ошибка в чанке откатывает только его: предыдущие чанки уже в БД.
+    Если chunks — FileChunkReader, в stats попадает и прогресс по байтам.
+
+    score_sentiment — сразу размечать тональность. Если модели нет,
+    разметка отключается до конца импорта, а отзывы сохраняются с пустой
+    тональностью (их доразметит apply_sentiment_model).
+    """
+    stats = ImportStats(bytes_total=getattr(chunks, "size", 0))
+    tell = getattr(chunks, "tell", None)
+    version = pipeline_version()
+    review_col = mapping.get("review_text")
+    # имя -> id справочников на весь импорт: следующие чанки ходят в БД
+    # только за новыми значениями
+    dimensions = DimensionCache()
+
+    for df in chunks:
+        df.columns = [str(c).strip() for c in df.columns]
+        if not review_col or review_col not in df.columns:
+            raise ValueError("Не выбрана валидная колонка с текстом отзыва.")
+
+        reviews, skipped = build_reviews(df, mapping, dimensions)
+        reviews, duplicates = drop_duplicates(reviews)
+
+        if score_sentiment and reviews:
+            try:
+                stats.scored += score_reviews(reviews, version)
+            except RuntimeError as e:
+                logger.warning("Разметка тональности при импорте отключена: %s", e)
+                stats.scoring_error = str(e)
+                score_sentiment = False
+                for r in reviews:
+                    r.sentiment = ""
+                preprocess_reviews(reviews, version)
+        else:
+            preprocess_reviews(reviews, version)
+
+        with transaction.atomic():
+            inserted = insert_reviews(reviews)
+            # bulk_create не шлёт сигналы: дельты rollup — в той же транзакции,
+            # и только по реально вставленным строкам
+            add_reviews(inserted)
+
+        stats.rows_read += len(df)
+        stats.created += len(inserted)
+        stats.skipped += skipped
+        # отзывы, которые успел вставить параллельный импорт, — тоже дубли
+        stats.duplicates += duplicates + len(reviews) - len(inserted)
+        stats.chunks += 1
+        if tell is not None:
+            stats.bytes_read = tell()
+        if progress is not None:
+            progress(stats)
+
+    return stats
+
+
+def import_reviews_file(
+    path: str,
+    filename: str,
+    mapping: Dict[str, str],
+    chunk_rows: int = IMPORT_CHUNK_ROWS,
+    progress: Optional[Callable[[ImportStats], None]] = None,
+    dialect: Optional[Dict[str, str]] = None,
+    score_sentiment: bool = False,
+) -> ImportStats:
+    """Потоковый импорт файла: см. FileChunkReader и import_chunks."""
+    reader = FileChunkReader(path, filename, chunk_rows, dialect)
+    return import_chunks(reader, mapping, progress, score_sentiment)
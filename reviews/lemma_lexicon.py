@@ -0,0 +1,180 @@
+"""
+Замороженный словарь token -> lemma в компактном бинарном формате.
+
+Файл отображается в память (mmap), поэтому страницы делятся между всеми
+процессами на машине через page cache, а не копируются в каждый воркер
+как Python-объекты. Формат (порядок байт — нативный, фиксируется в meta):
+
+    magic "RLEX" | uint32 version | uint32 n_keys | uint32 n_lemmas | uint32 meta_len
+    meta (JSON, выровнено до 4 байт)
+    key_offsets   uint32[n_keys + 1]
+    key_lemmas    uint32[n_keys]       — индекс леммы для каждого ключа
+    lemma_offsets uint32[n_lemmas + 1]
+    key_blob      — ключи в UTF-8, отсортированы побайтово
+    lemma_blob    — уникальные леммы в UTF-8
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Optional
+
+MAGIC = b"RLEX"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("=4sIIII")
+
+
+def _pad4(n: int) -> int:
+    return (4 - n % 4) % 4
+
+
+def build_lexicon(
+    path: Path, mapping: Dict[str, str], meta: Optional[dict] = None
+) -> int:
+    """
+    Записывает словарь token -> lemma в файл. Возвращает размер файла в байтах.
+    """
+    path = Path(path)
+    meta = dict(meta or {})
+    meta["byteorder"] = sys.byteorder
+
+    items = sorted((k.encode("utf-8"), v) for k, v in mapping.items())
+
+    lemma_index: Dict[str, int] = {}
+    lemma_blob = bytearray()
+    lemma_offsets = array("I", [0])
+    key_blob = bytearray()
+    key_offsets = array("I", [0])
+    key_lemmas = array("I")
+
+    for key, lemma in items:
+        idx = lemma_index.get(lemma)
+        if idx is None:
+            idx = len(lemma_index)
+            lemma_index[lemma] = idx
+            lemma_blob += lemma.encode("utf-8")
+            lemma_offsets.append(len(lemma_blob))
+        key_blob += key
+        key_offsets.append(len(key_blob))
+        key_lemmas.append(idx)
+
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    meta_bytes += b" " * _pad4(len(meta_bytes))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC, FORMAT_VERSION, len(items), len(lemma_index), len(meta_bytes)
+            )
+        )
+        f.write(meta_bytes)
+        f.write(key_offsets.tobytes())
+        f.write(key_lemmas.tobytes())
+        f.write(lemma_offsets.tobytes())
+        f.write(key_blob)
+        f.write(lemma_blob)
+    os.replace(tmp_path, path)
+    return path.stat().st_size
+
+
+class LemmaLexicon:
+    """
+    Read-only словарь поверх mmap: бинарный поиск по отсортированным ключам.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Unsupported lemma lexicon format: {self.path}")
+        magic, version, n_keys, n_lemmas, meta_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported lemma lexicon format: {self.path}")
+
+        pos = _HEADER.size
+        tables_len = 4 * (n_keys + 1) + 4 * n_keys + 4 * (n_lemmas + 1)
+        if len(self._mm) < pos + meta_len + tables_len:
+            self.close()
+            raise ValueError(f"Truncated lemma lexicon: {self.path}")
+        try:
+            self.meta = json.loads(bytes(self._mm[pos : pos + meta_len]))
+        except ValueError:
+            self.meta = None
+        if not isinstance(self.meta, dict):
+            self.close()
+            raise ValueError(f"Unsupported lemma lexicon format: {self.path}")
+        if self.meta.get("byteorder") != sys.byteorder:
+            self.close()
+            raise ValueError(f"Lemma lexicon byte order mismatch: {self.path}")
+        pos += meta_len
+
+        view = memoryview(self._mm)
+        self._key_offsets = view[pos : pos + 4 * (n_keys + 1)].cast("I")
+        pos += 4 * (n_keys + 1)
+        self._key_lemmas = view[pos : pos + 4 * n_keys].cast("I")
+        pos += 4 * n_keys
+        self._lemma_offsets = view[pos : pos + 4 * (n_lemmas + 1)].cast("I")
+        pos += 4 * (n_lemmas + 1)
+        self._keys_start = pos
+        self._lemmas_start = pos + self._key_offsets[n_keys]
+        del view  # иначе close() не сможет закрыть mmap
+        if self._lemmas_start + self._lemma_offsets[n_lemmas] > len(self._mm):
+            self.close()
+            raise ValueError(f"Truncated lemma lexicon: {self.path}")
+
+        self._n_keys = n_keys
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return self._n_keys
+
+    def _key_at(self, i: int) -> bytes:
+        start = self._keys_start
+        return self._mm[start + self._key_offsets[i] : start + self._key_offsets[i + 1]]
+
+    def get(self, token: str) -> Optional[str]:
+        key = token.encode("utf-8")
+        lo, hi = 0, self._n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_keys and self._key_at(lo) == key:
+            self.hits += 1
+            idx = self._key_lemmas[lo]
+            start = self._lemmas_start
+            raw = self._mm[
+                start + self._lemma_offsets[idx] : start + self._lemma_offsets[idx + 1]
+            ]
+            return raw.decode("utf-8")
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": self._n_keys,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def close(self) -> None:
+        for name in ("_key_offsets", "_key_lemmas", "_lemma_offsets"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._mm.close()
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Потокобезопасный LRU-кэш с ограничением по количеству элементов
+    и счётчиками попаданий/промахов.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than 0")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
+
+    def save_json(self, path: Path, meta: Optional[dict] = None) -> int:
+        """
+        Сохраняет содержимое кэша в JSON (от старых записей к свежим).
+        Запись атомарная: сначала во временный файл, затем os.replace.
+        """
+        path = Path(path)
+        with self._lock:
+            items = list(self._data.items())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta or {}, "items": items}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return len(items)
+
+    def load_json(self, path: Path, meta: Optional[dict] = None) -> int:
+        """
+        Загружает записи из JSON, сохранённого save_json.
+        Если файла нет, он повреждён или meta не совпадает — ничего не грузим.
+        """
+        path = Path(path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(payload, dict) or payload.get("meta", {}) != (meta or {}):
+            return 0
+
+        items = payload.get("items") or []
+        loaded = 0
+        with self._lock:
+            for key, value in items[-self.maxsize :]:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                loaded += 1
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return loaded
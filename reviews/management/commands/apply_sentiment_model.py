@@ -1,8 +1,19 @@
+import time
+from collections import Counter
+
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
-from reviews.ml_inference import predict_sentiment
+from reviews.ml_inference import prediction_cache_stats, preprocess_and_predict_batch
 from reviews.models import Review
-from reviews.text_preprocess import preprocess_pipeline
+from reviews.rollup import apply_deltas, count_keys
+from reviews.text_preprocess import (
+    lemma_cache_stats,
+    lemma_lexicon_stats,
+    load_lemma_cache,
+    pipeline_version,
+    save_lemma_cache,
+)
 
 
 class Command(BaseCommand):
@@ -26,11 +37,17 @@ class Command(BaseCommand):
             action="store_true",
             help="Process all reviews, including reviews with existing sentiment.",
         )
+        parser.add_argument(
+            "--no-lemma-cache",
+            action="store_true",
+            help="Do not load or save the on-disk lemma cache.",
+        )
 
     def handle(self, *args, **options):
         batch_size = options["batch"]
         limit = options["limit"]
         force = options["force"]
+        use_lemma_cache = not options["no_lemma_cache"]
 
         if batch_size <= 0:
             raise ValueError("--batch must be greater than 0")
@@ -48,37 +65,105 @@ class Command(BaseCommand):
 
         self.stdout.write(f"Found reviews: {total}")
 
+        if use_lemma_cache:
+            loaded = load_lemma_cache()
+            self.stdout.write(f"Lemma cache: loaded {loaded} entries")
+
         processed_count = 0
         buffer = []
+        self.model_versions = Counter()
+        started = time.monotonic()
 
         for review in qs.iterator(chunk_size=batch_size):
-            text_for_prediction = review.processed_text or review.review_text
-            if not review.processed_text:
-                review.processed_text = preprocess_pipeline(review.review_text)
-                text_for_prediction = review.processed_text
-
-            review.sentiment = predict_sentiment(text_for_prediction)
             buffer.append(review)
 
             if len(buffer) >= batch_size:
-                Review.objects.bulk_update(
-                    buffer,
-                    ["processed_text", "sentiment"],
-                    batch_size=batch_size,
-                )
+                self._process_batch(buffer, batch_size)
                 processed_count += len(buffer)
-                self.stdout.write(f"Processed: {processed_count}/{total}")
+                self._report_progress(processed_count, total, started)
                 buffer.clear()
 
         if buffer:
-            Review.objects.bulk_update(
-                buffer,
-                ["processed_text", "sentiment"],
-                batch_size=batch_size,
-            )
+            self._process_batch(buffer, batch_size)
             processed_count += len(buffer)
-            self.stdout.write(f"Processed: {processed_count}/{total}")
+            self._report_progress(processed_count, total, started)
+
+        if use_lemma_cache:
+            save_lemma_cache()
+            stats = lemma_cache_stats()
+            self.stdout.write(
+                f"Lemma cache: {stats['size']} entries, "
+                f"hits {stats['hits']}, misses {stats['misses']} "
+                f"({stats['hit_rate']:.1%})"
+            )
+
+        lexicon_stats = lemma_lexicon_stats()
+        if lexicon_stats is not None:
+            self.stdout.write(
+                f"Lemma lexicon: {lexicon_stats['size']} entries, "
+                f"hits {lexicon_stats['hits']}, misses {lexicon_stats['misses']} "
+                f"({lexicon_stats['hit_rate']:.1%})"
+            )
+
+        if self.model_versions:
+            versions = ", ".join(
+                f"{version} ({count})"
+                for version, count in self.model_versions.most_common()
+            )
+            self.stdout.write(f"Model versions: {versions}")
+
+        cache_stats = prediction_cache_stats()
+        self.stdout.write(
+            f"Prediction cache: {cache_stats['size']} entries, "
+            f"hits {cache_stats['hits']}, misses {cache_stats['misses']} "
+            f"({cache_stats['hit_rate']:.1%})"
+        )
 
         self.stdout.write(
             self.style.SUCCESS(f"Done: processed {processed_count} reviews.")
         )
+
+    def _report_progress(self, processed_count, total, started):
+        elapsed = time.monotonic() - started
+        rate = processed_count / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(
+            f"Processed: {processed_count}/{total} ({rate:.0f} reviews/s)"
+        )
+
+    def _process_batch(self, buffer, batch_size):
+        # rollup deltas: -1 for the old sentiment, +1 for the new one
+        rollup_deltas = count_keys(buffer, sign=-1)
+
+        # reviews without processed_text are looked up by raw text, so
+        # prediction cache hits skip lemmatization as well as inference
+        missing = [review for review in buffer if not review.processed_text]
+        ready = [review for review in buffer if review.processed_text]
+        if missing:
+            predictions = preprocess_and_predict_batch(
+                [review.review_text for review in missing]
+            )
+            version = pipeline_version()
+            for review, prediction in zip(missing, predictions):
+                review.processed_text = prediction.processed_text
+                review.processed_version = version
+                self._apply_prediction(review, prediction)
+        if ready:
+            predictions = preprocess_and_predict_batch(
+                [review.processed_text for review in ready]
+            )
+            for review, prediction in zip(ready, predictions):
+                self._apply_prediction(review, prediction)
+        rollup_deltas.update(count_keys(buffer))
+
+        with transaction.atomic():
+            Review.objects.bulk_update(
+                buffer,
+                ["processed_text", "processed_version", "sentiment"],
+                batch_size=batch_size,
+            )
+            apply_deltas(rollup_deltas)
+
+    def _apply_prediction(self, review, prediction):
+        review.sentiment = prediction.label
+        if prediction.model_version:
+            self.model_versions[prediction.model_version] += 1
@@ -0,0 +1,92 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.importer import existing_content_hashes
+from reviews.models import Review
+
+# хэш считается по именам справочников — они подтягиваются JOIN-ом
+FIELDS = (
+    "id",
+    "review_text",
+    "date",
+    "age",
+    *(f"{name}__name" for name in Review.DIMENSION_FIELDS),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Посчитать content_hash для отзывов, где он пуст. Повторы уже "
+        "посчитанных отзывов остаются без хэша (или удаляются с --delete-duplicates)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch", type=int, default=2000, help="Размер батча (по умолчанию 2000)"
+        )
+        parser.add_argument(
+            "--delete-duplicates",
+            action="store_true",
+            help="Удалить найденные дубли (остаётся отзыв с меньшим id)",
+        )
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch"]
+        if batch_size <= 0:
+            raise CommandError("--batch должен быть больше 0")
+
+        started = time.monotonic()
+        last_id = 0
+        hashed = 0
+        duplicate_ids = []
+
+        while True:
+            # keyset по id: строки-дубли остаются с пустым хэшем и не
+            # выбираются повторно
+            batch = list(
+                Review.objects.filter(content_hash="", id__gt=last_id)
+                .select_related(*Review.DIMENSION_FIELDS)
+                .order_by("id")
+                .only(*FIELDS)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for review in batch:
+                review.content_hash = review.compute_content_hash()
+            seen = existing_content_hashes({r.content_hash for r in batch})
+
+            to_update = []
+            for review in batch:
+                if review.content_hash in seen:
+                    duplicate_ids.append(review.id)
+                else:
+                    seen.add(review.content_hash)
+                    to_update.append(review)
+
+            with transaction.atomic():
+                Review.objects.bulk_update(to_update, ["content_hash"])
+            hashed += len(to_update)
+
+            elapsed = time.monotonic() - started
+            rate = hashed / elapsed if elapsed > 0 else 0.0
+            self.stdout.write(
+                f"Хэшировано: {hashed}, дублей: {len(duplicate_ids)} ({rate:.0f} строк/с)"
+            )
+
+        if duplicate_ids and opts["delete_duplicates"]:
+            deleted = 0
+            for start in range(0, len(duplicate_ids), batch_size):
+                chunk = duplicate_ids[start : start + batch_size]
+                deleted += Review.objects.filter(id__in=chunk).delete()[0]
+            self.stdout.write(f"Удалено дублей: {deleted}")
+        elif duplicate_ids:
+            self.stdout.write(
+                f"Найдено дублей: {len(duplicate_ids)}; они оставлены без хэша. "
+                "Удалить: --delete-duplicates"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: хэшировано {hashed} отзывов."))
@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from reviews.lemma_lexicon import build_lexicon
+from reviews.models import Review
+from reviews.text_preprocess import (
+    LEMMA_LEXICON_PATH,
+    clean_tokens,
+    get_morph,
+    lemma_lexicon_meta,
+)
+
+DEFAULT_DATASET = (
+    Path(settings.BASE_DIR) / "data" / "women-clothing-accessories.3-class.balanced.csv"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Собрать словарь лемм (token -> lemma) по словарю отзывов в БД "
+        "и обучающего датасета; результат подключается через mmap"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch", type=int, default=5000, help="Размер батча чтения из БД"
+        )
+        parser.add_argument(
+            "--dataset",
+            default=str(DEFAULT_DATASET),
+            help="TSV с колонкой review (по умолчанию — обучающий датасет)",
+        )
+        parser.add_argument(
+            "--output", default=str(LEMMA_LEXICON_PATH), help="Куда записать словарь"
+        )
+
+    def handle(self, *args, **opts):
+        started = time.monotonic()
+        vocab = set()
+
+        # review_text даёт токены до лемматизации, processed_text — уже леммы,
+        # которые повторно проходят через пайплайн при скоринге
+        qs = Review.objects.values_list("review_text", "processed_text")
+        rows = 0
+        for review_text, processed_text in qs.iterator(chunk_size=opts["batch"]):
+            vocab.update(clean_tokens(review_text))
+            vocab.update(processed_text.split())
+            rows += 1
+        self.stdout.write(f"Отзывов в БД: {rows}")
+
+        dataset = Path(opts["dataset"])
+        if dataset.exists():
+            df = pd.read_csv(dataset, sep="\t", usecols=["review"])
+            for text in df["review"].fillna("").astype(str):
+                vocab.update(clean_tokens(text))
+            self.stdout.write(f"Отзывов в датасете: {len(df)}")
+        else:
+            self.stdout.write(self.style.WARNING(f"Датасет не найден: {dataset}"))
+
+        # латиница не лемматизируется (см. lemmatize_ru)
+        vocab = sorted(t for t in vocab if not "a" <= t[0] <= "z")
+        self.stdout.write(f"Уникальных токенов: {len(vocab)}")
+
+        morph = get_morph()
+        mapping = {t: morph.parse(t)[0].normal_form for t in vocab}
+
+        output = Path(opts["output"])
+        size = build_lexicon(output, mapping, meta=lemma_lexicon_meta())
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Словарь лемм: {len(mapping)} записей, {size / 1024:.0f} КБ "
+                f"-> {output} ({elapsed:.1f} с)"
+            )
+        )
@@ -1,7 +1,17 @@
-from django.core.management.base import BaseCommand
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
 
 from reviews.models import Review
-from reviews.text_preprocess import preprocess_pipeline
+from reviews.preprocess_pool import imap_preprocess, lemma_counters, preprocess_batch
+from reviews.text_preprocess import (
+    get_lemma_lexicon,
+    lemma_cache_stats,
+    load_lemma_cache,
+    pipeline_version,
+    save_lemma_cache,
+)
 
 
 class Command(BaseCommand):
@@ -16,41 +26,153 @@ class Command(BaseCommand):
             action="store_true",
             help="Обрабатывать только записи, где processed_text пуст",
         )
+        parser.add_argument(
+            "--stale",
+            action="store_true",
+            help=(
+                "Обрабатывать только записи, обработанные другой версией пайплайна "
+                "(стоп-слова, регулярки, флаг лемматизации)"
+            ),
+        )
         parser.add_argument(
             "--no-lemma",
             action="store_true",
             help="Не делать лемматизацию (только чистка+стоп-слова)",
         )
+        parser.add_argument(
+            "--no-lemma-cache",
+            action="store_true",
+            help=(
+                "Не загружать и не сохранять кэш лемм на диске. С --workers > 1 "
+                "кэш только загружается: каждый воркер наполняет свою копию, "
+                "и на диск она не сохраняется"
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Число процессов для предобработки (по умолчанию 1 — без пула). "
+                "В режиме пула кэш лемм наполняется в воркерах и не сохраняется "
+                "на диск; попадания в кэш и словарь лемм суммируются по воркерам"
+            ),
+        )
 
     def handle(self, *args, **opts):
         batch_size = opts["batch"]
         only_empty = opts["only_empty"]
+        stale = opts["stale"]
         do_lemma = not opts["no_lemma"]
+        use_lemma_cache = do_lemma and not opts["no_lemma_cache"]
+        workers = opts["workers"]
+
+        if batch_size <= 0:
+            raise CommandError("--batch должен быть больше 0")
+        if workers <= 0:
+            raise CommandError("--workers должен быть больше 0")
 
-        qs = Review.objects.all().order_by("id")
+        if use_lemma_cache:
+            loaded = load_lemma_cache()
+            self.stdout.write(f"Кэш лемм: загружено {loaded} записей")
+
+        version = pipeline_version(do_lemmatize=do_lemma)
+        self.stdout.write(f"Версия пайплайна: {version}")
+
+        qs = Review.objects.all()
         if only_empty:
             qs = qs.filter(processed_text="")
+        if stale:
+            qs = qs.exclude(processed_version=version)
 
         total = qs.count()
         self.stdout.write(self.style.NOTICE(f"Найдено записей: {total}"))
 
+        batches = self._iter_batches(qs, batch_size)
+        # прирост счётчиков кэша и словаря лемм, сложенный по воркерам
+        counts = Counter()
+        if workers > 1:
+            self.stdout.write(f"Процессов: {workers}")
+            results = self._collect_counts(
+                imap_preprocess(
+                    batches,
+                    workers=workers,
+                    do_lemmatize=do_lemma,
+                    use_lemma_cache=use_lemma_cache,
+                ),
+                counts,
+            )
+        else:
+            before = lemma_counters()
+            results = (preprocess_batch(b, do_lemmatize=do_lemma) for b in batches)
+
         processed = 0
-        buf = []
-
-        # итерируемся по батчам, чтобы не держать всё в памяти
-        for r in qs.iterator(chunk_size=batch_size):
-            r.processed_text = preprocess_pipeline(r.review_text, do_lemmatize=do_lemma)
-            buf.append(r)
-            if len(buf) >= batch_size:
-                Review.objects.bulk_update(
-                    buf, ["processed_text"], batch_size=batch_size
-                )
-                processed += len(buf)
-                self.stdout.write(f"Обработано: {processed}/{total}")
-                buf.clear()
-
-        if buf:
-            Review.objects.bulk_update(buf, ["processed_text"], batch_size=batch_size)
-            processed += len(buf)
+        started = time.monotonic()
+
+        for result in results:
+            Review.objects.bulk_update(
+                [
+                    Review(id=pk, processed_text=text, processed_version=version)
+                    for pk, text in result
+                ],
+                ["processed_text", "processed_version"],
+                batch_size=batch_size,
+            )
+            processed += len(result)
+            elapsed = time.monotonic() - started
+            rate = processed / elapsed if elapsed > 0 else 0.0
+            self.stdout.write(f"Обработано: {processed}/{total} ({rate:.0f} строк/с)")
+
+        if workers == 1:
+            counts.update(lemma_counters())
+            counts.subtract(before)
+
+        if use_lemma_cache and workers == 1:
+            save_lemma_cache()
+            self.stdout.write(
+                f"Кэш лемм: {lemma_cache_stats()['size']} записей, "
+                + self._hit_rate(counts["cache_hits"], counts["cache_misses"])
+            )
+        elif use_lemma_cache:
+            # в режиме пула кэш наполняется в воркерах и теряется с ними
+            self.stdout.write(
+                "Кэш лемм (в воркерах, не сохраняется): "
+                + self._hit_rate(counts["cache_hits"], counts["cache_misses"])
+            )
+
+        if counts["lexicon_hits"] or counts["lexicon_misses"]:
+            # воркеры отображают тот же файл словаря, что и главный процесс
+            self.stdout.write(
+                f"Словарь лемм: {len(get_lemma_lexicon())} записей, "
+                + self._hit_rate(counts["lexicon_hits"], counts["lexicon_misses"])
+            )
 
         self.stdout.write(self.style.SUCCESS(f"Готово: обработано {processed} записей"))
+
+    @staticmethod
+    def _collect_counts(results, counts):
+        for result, batch_counts in results:
+            counts.update(batch_counts)
+            yield result
+
+    @staticmethod
+    def _hit_rate(hits, misses):
+        total = hits + misses
+        rate = hits / total if total else 0.0
+        return f"попаданий {hits}, промахов {misses} ({rate:.1%})"
+
+    def _iter_batches(self, qs, batch_size):
+        # батчи по ключу id: не держим всё в памяти, и обновлённые строки
+        # (которые могут выпасть из фильтра --only-empty/--stale) не сдвигают
+        # окно выборки, как это было бы с OFFSET или открытым курсором
+        last_id = 0
+        while True:
+            batch = list(
+                qs.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "review_text")[:batch_size]
+            )
+            if not batch:
+                return
+            last_id = batch[-1][0]
+            yield batch
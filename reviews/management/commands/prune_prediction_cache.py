@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.prediction_cache import DiskPredictionCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Почистить файловый кэш предсказаний (SENTIMENT_PREDICTION_CACHE_PATH): "
+        "удалить записи старше --max-age-days и самые старые сверх --max-rows. "
+        "Записи разных версий модели хранятся вместе и при смене модели "
+        "не удаляются — их чистит только эта команда"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age-days",
+            type=float,
+            default=None,
+            help="Удалить записи старше N дней",
+        )
+        parser.add_argument(
+            "--max-rows",
+            type=int,
+            default=None,
+            help="Оставить не больше N самых свежих записей",
+        )
+
+    def handle(self, *args, **opts):
+        path = settings.SENTIMENT_PREDICTION_CACHE_PATH
+        if not path:
+            raise CommandError("SENTIMENT_PREDICTION_CACHE_PATH не задан")
+        max_age_days, max_rows = opts["max_age_days"], opts["max_rows"]
+        if max_age_days is None and max_rows is None:
+            raise CommandError("Укажите --max-age-days и/или --max-rows")
+        if max_age_days is not None and max_age_days < 0:
+            raise CommandError("--max-age-days не может быть отрицательным")
+        if max_rows is not None and max_rows <= 0:
+            raise CommandError("--max-rows должен быть больше 0")
+
+        cache = DiskPredictionCache(path)
+        deleted = cache.prune(
+            max_age=max_age_days * 86400 if max_age_days is not None else None,
+            max_rows=max_rows,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Удалено записей: {deleted}"))
+        for fingerprint, count in sorted(cache.counts().items()):
+            self.stdout.write(f"  {fingerprint}: {count}")
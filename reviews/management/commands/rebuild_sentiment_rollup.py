@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.models import Review, SentimentRollup
+from reviews.rollup import rebuild_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитать агрегат SentimentRollup заново по всем отзывам. Нужен после "
+        "массовых правок в обход ORM или для проверки инкрементальных дельт"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch", type=int, default=2000, help="Размер батча (по умолчанию 2000)"
+        )
+
+    def handle(self, *args, **opts):
+        if opts["batch"] <= 0:
+            raise CommandError("--batch должен быть больше 0")
+
+        started = time.monotonic()
+        rows = rebuild_rollup(batch_size=opts["batch"])
+        elapsed = time.monotonic() - started
+        reviews = Review.objects.count()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Готово: {rows} строк агрегата по {reviews} отзывам "
+                f"за {elapsed:.1f} с"
+            )
+        )
+        if rows:
+            self.stdout.write(
+                f"В среднем {reviews / rows:.0f} отзывов на строку "
+                f"({SentimentRollup._meta.db_table})"
+            )
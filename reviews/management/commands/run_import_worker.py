@@ -0,0 +1,87 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from reviews.import_jobs import (
+    claim_next_job,
+    default_worker_name,
+    fail_stale_jobs,
+    run_job,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Воркер фоновых импортов: забирает задачи ImportJob из очереди в БД "
+        "и выполняет их. Можно запускать несколько воркеров одновременно"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить задачи из очереди и выйти, не дожидаясь новых",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=2.0,
+            help="Пауза между проверками пустой очереди, с (по умолчанию 2)",
+        )
+        parser.add_argument(
+            "--stale-minutes",
+            type=float,
+            default=30.0,
+            help="Через сколько минут без прогресса задача считается упавшей",
+        )
+        parser.add_argument(
+            "--name", default=None, help="Имя воркера (по умолчанию host:pid)"
+        )
+
+    def handle(self, *args, **opts):
+        if opts["poll"] <= 0:
+            raise CommandError("--poll должен быть больше 0")
+
+        worker = opts["name"] or default_worker_name()
+        stale_timeout = timedelta(minutes=opts["stale_minutes"])
+        self.stdout.write(f"Воркер {worker} запущен")
+
+        done = 0
+        while True:
+            close_old_connections()
+            stale = fail_stale_jobs(stale_timeout)
+            if stale:
+                self.stdout.write(f"Помечено упавшими зависших задач: {stale}")
+
+            job = claim_next_job(worker)
+            if job is None:
+                if opts["once"]:
+                    break
+                time.sleep(opts["poll"])
+                continue
+
+            self.stdout.write(f"Задача #{job.id}: {job.original_name}")
+            started = time.monotonic()
+            job = run_job(job)
+            elapsed = time.monotonic() - started
+            rate = job.rows_read / elapsed if elapsed > 0 else 0.0
+            if job.status == job.STATUS_DONE:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Задача #{job.id}: создано {job.created}, "
+                        f"пропущено {job.skipped} ({rate:.0f} строк/с)"
+                    )
+                )
+                if job.score_sentiment:
+                    self.stdout.write(f"Определена тональность: {job.scored}")
+                if job.warning:
+                    self.stdout.write(self.style.WARNING(job.warning))
+            else:
+                self.stdout.write(
+                    self.style.ERROR(f"Задача #{job.id}: ошибка — {job.error}")
+                )
+            done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Готово: выполнено задач {done}"))
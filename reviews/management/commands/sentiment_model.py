@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews import model_registry
+from reviews.ml_inference import ML_DIR, REGISTRY_DIR
+
+
+class Command(BaseCommand):
+    help = (
+        "Реестр версий модели тональности: list — список версий, "
+        "publish — опубликовать артефакты из ml/, activate — переключить "
+        "активную версию (воркеры подхватят её без перезапуска)"
+    )
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        sub.add_parser("list", help="Показать опубликованные версии")
+
+        publish = sub.add_parser("publish", help="Опубликовать новую версию")
+        publish.add_argument(
+            "--source",
+            default=str(ML_DIR),
+            help="Каталог с *.joblib и bundle/ (по умолчанию ml/)",
+        )
+        publish.add_argument(
+            "--version", default=None, help="Имя версии (по умолчанию — время UTC)"
+        )
+        publish.add_argument(
+            "--activate", action="store_true", help="Сразу сделать версию активной"
+        )
+
+        activate = sub.add_parser("activate", help="Сделать версию активной")
+        activate.add_argument("version")
+
+    def handle(self, *args, **opts):
+        action = opts["action"]
+        try:
+            if action == "list":
+                self._list()
+            elif action == "publish":
+                version = model_registry.publish(
+                    REGISTRY_DIR,
+                    Path(opts["source"]),
+                    version=opts["version"],
+                    activate=opts["activate"],
+                )
+                self.stdout.write(self.style.SUCCESS(f"Опубликована версия {version}"))
+            elif action == "activate":
+                model_registry.activate_version(REGISTRY_DIR, opts["version"])
+                self.stdout.write(
+                    self.style.SUCCESS(f"Активная версия: {opts['version']}")
+                )
+        except (LookupError, ValueError, FileNotFoundError) as exc:
+            raise CommandError(str(exc)) from exc
+
+    def _list(self):
+        active = model_registry.active_version(REGISTRY_DIR)
+        versions = model_registry.list_versions(REGISTRY_DIR)
+        if not versions:
+            self.stdout.write("Реестр пуст: используются артефакты из ml/")
+            return
+        for version in versions:
+            manifest = model_registry.read_manifest(REGISTRY_DIR, version)
+            mark = "*" if version == active else " "
+            bundle = ", bundle" if manifest.get("has_bundle") else ""
+            self.stdout.write(
+                f"{mark} {version}  {manifest.get('created_at', '')}"
+                f"  {manifest['fingerprint'][:12]}{bundle}"
+            )
@@ -0,0 +1,106 @@
+"""
+Asyncio micro-batcher: collects items submitted by concurrent requests and
+runs one batched call for all of them.
+
+A flush happens when max_batch items are queued or max_delay seconds have
+passed since the first item of the batch arrived. The batch function is
+synchronous (sparse matrix ops, numpy) and runs in a worker thread, so the
+event loop keeps accepting requests; while one batch is scored the next one
+fills up in the queue.
+"""
+
+import asyncio
+from typing import Any, Callable, Optional, Sequence
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        infer: Callable[[list], Sequence[Any]],
+        max_batch: int = 64,
+        max_delay: float = 0.005,
+    ):
+        if max_batch <= 0:
+            raise ValueError("max_batch must be greater than 0")
+        self.infer = infer
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        # queue and worker task belong to one event loop; a new loop
+        # (tests, dev server reloads) gets fresh ones
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def submit(self, item: Any) -> Any:
+        """Queues one item and waits for its result from the next batch."""
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((item, future))
+        return await future
+
+    async def submit_many(self, items: Sequence[Any]) -> list:
+        return list(await asyncio.gather(*(self.submit(item) for item in items)))
+
+    async def _collect(self, queue: asyncio.Queue) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_delay
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = await self._collect(queue)
+            # requests that were cancelled while queued are not scored
+            batch = [(item, fut) for item, fut in batch if not fut.done()]
+            if not batch:
+                continue
+            try:
+                results = await asyncio.to_thread(
+                    self.infer, [item for item, _ in batch]
+                )
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        "Batch function returned a wrong number of results"
+                    )
+            except Exception as exc:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(exc)
+            else:
+                for (_, fut), result in zip(batch, results):
+                    if not fut.done():
+                        fut.set_result(result)
+            self.batches += 1
+            self.items += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": (self.items / self.batches) if self.batches else 0.0,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="processed_version",
+            field=models.CharField(blank=True, default="", max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["processed_version"], name="reviews_rev_process_6c805f_idx"
+            ),
+        ),
+    ]
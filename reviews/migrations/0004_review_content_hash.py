@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0003_importjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="duplicates",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="review",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=32),
+        ),
+        migrations.AddConstraint(
+            model_name="review",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("content_hash", ""), _negated=True),
+                fields=("content_hash",),
+                name="review_content_hash_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0004_review_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="score_sentiment",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="scored",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="warning",
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:21
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0005_importjob_score_sentiment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChunkedUpload",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "upload_id",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("original_name", models.CharField(max_length=255)),
+                ("file_path", models.CharField(max_length=512)),
+                ("total_size", models.BigIntegerField()),
+                ("part_size", models.PositiveIntegerField()),
+                ("received_bytes", models.BigIntegerField(default=0)),
+                ("part_hashes", models.JSONField(default=list)),
+                ("head", models.BinaryField(blank=True, default=b"")),
+                ("file_hash", models.CharField(blank=True, max_length=80)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("active", "загружается"), ("complete", "загружен")],
+                        default="active",
+                        max_length=16,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
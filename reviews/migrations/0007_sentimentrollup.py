@@ -0,0 +1,81 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:23
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Value, When
+
+AGE_BUCKETS = ((18, "<18"), (25, "18-24"), (35, "25-34"), (45, "35-44"), (55, "45-54"))
+
+
+def fill_rollup(apps, schema_editor):
+    # та же группировка, что rollup.rebuild_rollup, но на исторических моделях
+    Review = apps.get_model("reviews", "Review")
+    SentimentRollup = apps.get_model("reviews", "SentimentRollup")
+    bucket = Case(
+        When(age__isnull=True, then=Value("")),
+        *[When(age__lt=upper, then=Value(name)) for upper, name in AGE_BUCKETS],
+        default=Value("55+"),
+    )
+    rows = (
+        Review.objects.order_by()
+        .annotate(day=F("date"), age_bucket=bucket)
+        .values(
+            "day", "region", "product_category", "gender", "age_bucket", "sentiment"
+        )
+        .annotate(n=Count("id"))
+    )
+    SentimentRollup.objects.bulk_create(
+        (SentimentRollup(count=row.pop("n"), **row) for row in rows.iterator()),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0006_chunkedupload"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SentimentRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(blank=True, null=True)),
+                ("region", models.CharField(blank=True, max_length=128)),
+                ("product_category", models.CharField(blank=True, max_length=128)),
+                ("gender", models.CharField(blank=True, max_length=16)),
+                ("age_bucket", models.CharField(blank=True, max_length=8)),
+                ("sentiment", models.CharField(blank=True, max_length=16)),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["region", "day"], name="reviews_sen_region_d3687d_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "day",
+                            "region",
+                            "product_category",
+                            "gender",
+                            "age_bucket",
+                            "sentiment",
+                        ),
+                        name="sentiment_rollup_key_unique",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_rollup, migrations.RunPython.noop),
+    ]
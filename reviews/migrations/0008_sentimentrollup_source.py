@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:24
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Value, When
+
+AGE_BUCKETS = ((18, "<18"), (25, "18-24"), (35, "25-34"), (45, "35-44"), (55, "45-54"))
+
+
+def refill_rollup(apps, schema_editor):
+    # ключ расширился источником: пересчитываем агрегат на исторических моделях
+    Review = apps.get_model("reviews", "Review")
+    SentimentRollup = apps.get_model("reviews", "SentimentRollup")
+    SentimentRollup.objects.all().delete()
+    bucket = Case(
+        When(age__isnull=True, then=Value("")),
+        *[When(age__lt=upper, then=Value(name)) for upper, name in AGE_BUCKETS],
+        default=Value("55+"),
+    )
+    rows = (
+        Review.objects.order_by()
+        .annotate(day=F("date"), age_bucket=bucket)
+        .values(
+            "day",
+            "region",
+            "product_category",
+            "gender",
+            "age_bucket",
+            "source",
+            "sentiment",
+        )
+        .annotate(n=Count("id"))
+    )
+    SentimentRollup.objects.bulk_create(
+        (SentimentRollup(count=row.pop("n"), **row) for row in rows.iterator()),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0007_sentimentrollup"),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="sentimentrollup",
+            name="sentiment_rollup_key_unique",
+        ),
+        migrations.AddField(
+            model_name="sentimentrollup",
+            name="source",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name="sentimentrollup",
+            constraint=models.UniqueConstraint(
+                fields=(
+                    "day",
+                    "region",
+                    "product_category",
+                    "gender",
+                    "age_bucket",
+                    "source",
+                    "sentiment",
+                ),
+                name="sentiment_rollup_key_unique",
+            ),
+        ),
+        migrations.RunPython(refill_rollup, migrations.RunPython.noop),
+    ]
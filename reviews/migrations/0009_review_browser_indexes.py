@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0008_sentimentrollup_source"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["created_at", "id"], name="review_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["sentiment", "created_at", "id"], name="review_sent_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["region", "created_at", "id"], name="review_region_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["product_category", "created_at", "id"],
+                name="review_cat_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+from django.db import migrations
+from django.db.models import Case, Count, F, Value, When
+
+# поле Review -> модель справочника
+DIMENSIONS = {
+    "region": "Region",
+    "product_category": "ProductCategory",
+    "gender": "Gender",
+    "source": "Source",
+}
+AGE_BUCKETS = ((18, "<18"), (25, "18-24"), (35, "25-34"), (45, "35-44"), (55, "45-54"))
+
+
+def fill_dimensions(apps, schema_editor):
+    # по одному UPDATE на каждое различное значение: справочники маленькие,
+    # а строковые поля ещё проиндексированы
+    Review = apps.get_model("reviews", "Review")
+    for field, model_name in DIMENSIONS.items():
+        Dimension = apps.get_model("reviews", model_name)
+        names = (
+            Review.objects.order_by()
+            .exclude(**{field: ""})
+            .values_list(field, flat=True)
+            .distinct()
+        )
+        Dimension.objects.bulk_create(
+            [Dimension(name=name) for name in names],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        for pk, name in Dimension.objects.values_list("id", "name"):
+            Review.objects.filter(**{field: name}).update(**{f"{field}_ref": pk})
+
+
+def unfill_dimensions(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    for field, model_name in DIMENSIONS.items():
+        Dimension = apps.get_model("reviews", model_name)
+        for pk, name in Dimension.objects.values_list("id", "name"):
+            Review.objects.filter(**{f"{field}_ref": pk}).update(**{field: name})
+
+
+def refill_rollup(apps, schema_editor):
+    # при откате 0012 агрегат снова строковый: пересчитываем его по Review
+    Review = apps.get_model("reviews", "Review")
+    SentimentRollup = apps.get_model("reviews", "SentimentRollup")
+    SentimentRollup.objects.all().delete()
+    bucket = Case(
+        When(age__isnull=True, then=Value("")),
+        *[When(age__lt=upper, then=Value(name)) for upper, name in AGE_BUCKETS],
+        default=Value("55+"),
+    )
+    rows = (
+        Review.objects.order_by()
+        .annotate(day=F("date"), age_bucket=bucket)
+        .values("day", "age_bucket", "sentiment", *DIMENSIONS)
+        .annotate(n=Count("id"))
+    )
+    SentimentRollup.objects.bulk_create(
+        (SentimentRollup(count=row.pop("n"), **row) for row in rows.iterator()),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0010_dimension_tables"),
+    ]
+
+    operations = [
+        # при откате выполняется последней, после unfill_dimensions
+        migrations.RunPython(migrations.RunPython.noop, refill_rollup),
+        migrations.RunPython(fill_dimensions, unfill_dimensions),
+    ]
@@ -0,0 +1,160 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Value, When
+
+AGE_BUCKETS = ((18, "<18"), (25, "18-24"), (35, "25-34"), (45, "35-44"), (55, "45-54"))
+ROLLUP_KEY = (
+    "day",
+    "region",
+    "product_category",
+    "gender",
+    "age_bucket",
+    "source",
+    "sentiment",
+)
+
+
+def refill_rollup(apps, schema_editor):
+    # ключ агрегата теперь из id справочников: пересчитываем по Review
+    Review = apps.get_model("reviews", "Review")
+    SentimentRollup = apps.get_model("reviews", "SentimentRollup")
+    SentimentRollup.objects.all().delete()
+    bucket = Case(
+        When(age__isnull=True, then=Value("")),
+        *[When(age__lt=upper, then=Value(name)) for upper, name in AGE_BUCKETS],
+        default=Value("55+"),
+    )
+    rows = (
+        Review.objects.order_by()
+        .annotate(day=F("date"), age_bucket=bucket)
+        .values(
+            "day",
+            "region_id",
+            "product_category_id",
+            "gender_id",
+            "age_bucket",
+            "source_id",
+            "sentiment",
+        )
+        .annotate(n=Count("id"))
+    )
+    SentimentRollup.objects.bulk_create(
+        (SentimentRollup(count=row.pop("n"), **row) for row in rows.iterator()),
+        batch_size=2000,
+    )
+
+
+def dimension_fk(model):
+    return models.ForeignKey(
+        blank=True,
+        db_index=False,
+        null=True,
+        on_delete=django.db.models.deletion.PROTECT,
+        related_name="+",
+        to=f"reviews.{model}",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0011_fill_review_dimensions"),
+    ]
+
+    operations = [
+        # Review: строковые поля и индексы по ним -> FK *_ref под старыми именами
+        migrations.RemoveIndex(
+            model_name="review",
+            name="reviews_rev_region_28f5d7_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="review",
+            name="reviews_rev_product_bdcf70_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="review",
+            name="review_region_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="review",
+            name="review_cat_created_idx",
+        ),
+        migrations.RemoveField(model_name="review", name="region"),
+        migrations.RemoveField(model_name="review", name="product_category"),
+        migrations.RemoveField(model_name="review", name="gender"),
+        migrations.RemoveField(model_name="review", name="source"),
+        migrations.RenameField(
+            model_name="review", old_name="region_ref", new_name="region"
+        ),
+        migrations.RenameField(
+            model_name="review",
+            old_name="product_category_ref",
+            new_name="product_category",
+        ),
+        migrations.RenameField(
+            model_name="review", old_name="gender_ref", new_name="gender"
+        ),
+        migrations.RenameField(
+            model_name="review", old_name="source_ref", new_name="source"
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["region", "created_at", "id"],
+                name="review_region_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["product_category", "created_at", "id"],
+                name="review_cat_created_idx",
+            ),
+        ),
+        # SentimentRollup — производная таблица: меняем схему и пересчитываем
+        migrations.RemoveConstraint(
+            model_name="sentimentrollup",
+            name="sentiment_rollup_key_unique",
+        ),
+        migrations.RemoveIndex(
+            model_name="sentimentrollup",
+            name="reviews_sen_region_d3687d_idx",
+        ),
+        migrations.RemoveField(model_name="sentimentrollup", name="region"),
+        migrations.RemoveField(model_name="sentimentrollup", name="product_category"),
+        migrations.RemoveField(model_name="sentimentrollup", name="gender"),
+        migrations.RemoveField(model_name="sentimentrollup", name="source"),
+        migrations.AddField(
+            model_name="sentimentrollup",
+            name="region",
+            field=dimension_fk("region"),
+        ),
+        migrations.AddField(
+            model_name="sentimentrollup",
+            name="product_category",
+            field=dimension_fk("productcategory"),
+        ),
+        migrations.AddField(
+            model_name="sentimentrollup",
+            name="gender",
+            field=dimension_fk("gender"),
+        ),
+        migrations.AddField(
+            model_name="sentimentrollup",
+            name="source",
+            field=dimension_fk("source"),
+        ),
+        migrations.AddConstraint(
+            model_name="sentimentrollup",
+            constraint=models.UniqueConstraint(
+                fields=ROLLUP_KEY, name="sentiment_rollup_key_unique"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sentimentrollup",
+            index=models.Index(
+                fields=["region", "day"], name="reviews_sen_region__6a7889_idx"
+            ),
+        ),
+        migrations.RunPython(refill_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,225 @@
+"""
+Compact, memory-mappable sentiment model bundle and a numpy/scipy-only scorer.
+
+A bundle is a directory:
+
+    manifest.json   format version, bundle version, labels, vectorizer settings
+    vocab_hash.npy  uint64, sorted blake2b-64 hashes of the vocabulary terms
+    idf.npy         float32 idf weights, columns in vocab_hash order
+    coef.npy        float32 (n_rows, n_features) linear model coefficients
+    intercept.npy   float64 (n_rows,), kept exact: with an all-OOV document the
+                    intercepts alone decide the label
+
+The arrays are loaded with mmap_mode="r", so worker processes share the pages
+through the OS page cache, and scoring needs neither sklearn nor a Python dict
+vocabulary. Export reads plain attributes of the fitted TfidfVectorizer and
+linear classifier, so this module never imports sklearn either.
+"""
+
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+from scipy import sparse
+
+BUNDLE_FORMAT = "sentiment-bundle"
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def term_hash(term: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def _check_vectorizer(vectorizer) -> None:
+    unsupported = []
+    if getattr(vectorizer, "analyzer", "word") != "word":
+        unsupported.append("analyzer")
+    for attr in ("preprocessor", "tokenizer", "stop_words", "strip_accents"):
+        if getattr(vectorizer, attr, None) is not None:
+            unsupported.append(attr)
+    if unsupported:
+        raise ValueError(
+            "Vectorizer settings are not supported by the bundle scorer: "
+            + ", ".join(unsupported)
+        )
+
+
+def export_bundle(
+    vectorizer,
+    model,
+    labels: Sequence[str],
+    out_dir: Path,
+    bundle_version: str | None = None,
+) -> Path:
+    """
+    Writes a fitted TfidfVectorizer + linear classifier as a bundle directory.
+    The directory is written next to out_dir and swapped in at the end.
+    """
+    _check_vectorizer(vectorizer)
+
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    hashes = np.array([term_hash(t) for t in terms], dtype=np.uint64)
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+    if len(sorted_hashes) and np.any(sorted_hashes[1:] == sorted_hashes[:-1]):
+        raise ValueError("Vocabulary term hash collision; bundle cannot be exported")
+
+    if getattr(vectorizer, "use_idf", True):
+        idf = np.asarray(vectorizer.idf_, dtype=np.float32)[order]
+    else:
+        idf = np.ones(len(terms), dtype=np.float32)
+    coef = np.asarray(model.coef_, dtype=np.float32)[:, order]
+    intercept = np.asarray(model.intercept_, dtype=np.float64).reshape(-1)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "bundle_version": bundle_version
+        or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "labels": list(labels),
+        "classes": [str(c) for c in model.classes_],
+        "n_features": len(terms),
+        "vectorizer": {
+            "lowercase": bool(vectorizer.lowercase),
+            "token_pattern": vectorizer.token_pattern,
+            "ngram_range": list(vectorizer.ngram_range),
+            "binary": bool(vectorizer.binary),
+            "sublinear_tf": bool(vectorizer.sublinear_tf),
+            "norm": vectorizer.norm,
+        },
+    }
+
+    out_dir = Path(out_dir)
+    tmp_dir = out_dir.with_name(f"{out_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    np.save(tmp_dir / "vocab_hash.npy", sorted_hashes)
+    np.save(tmp_dir / "idf.npy", idf)
+    np.save(tmp_dir / "coef.npy", np.ascontiguousarray(coef))
+    np.save(tmp_dir / "intercept.npy", intercept)
+    with open(tmp_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    if out_dir.exists():
+        old_dir = out_dir.with_name(f"{out_dir.name}.{os.getpid()}.old")
+        os.replace(out_dir, old_dir)
+        os.replace(tmp_dir, out_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    else:
+        os.replace(tmp_dir, out_dir)
+    return out_dir
+
+
+class ModelBundle:
+    """Scores preprocessed texts with the bundle arrays (numpy/scipy only)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if (
+            self.manifest.get("format") != BUNDLE_FORMAT
+            or self.manifest.get("format_version") != BUNDLE_FORMAT_VERSION
+        ):
+            raise ValueError(f"Unsupported model bundle format: {self.path}")
+
+        self.version: str = self.manifest["bundle_version"]
+        self.labels: list[str] = self.manifest["labels"]
+        self.classes = np.array(self.manifest["classes"], dtype=object)
+
+        vec = self.manifest["vectorizer"]
+        self._lowercase = vec["lowercase"]
+        self._token_re = re.compile(vec["token_pattern"])
+        self._min_n, self._max_n = vec["ngram_range"]
+        self._binary = vec["binary"]
+        self._sublinear_tf = vec["sublinear_tf"]
+        self._norm = vec["norm"]
+
+        self.vocab_hash = np.load(self.path / "vocab_hash.npy", mmap_mode="r")
+        self.idf = np.load(self.path / "idf.npy", mmap_mode="r")
+        self.coef = np.load(self.path / "coef.npy", mmap_mode="r")
+        self.intercept = np.load(self.path / "intercept.npy", mmap_mode="r")
+
+    def _analyze(self, doc: str) -> list[str]:
+        # same as sklearn's word analyzer: lowercase -> token_pattern -> n-grams
+        if self._lowercase:
+            doc = doc.lower()
+        tokens = self._token_re.findall(doc)
+        if self._max_n == 1:
+            return tokens
+        terms = list(tokens) if self._min_n == 1 else []
+        n_tokens = len(tokens)
+        for n in range(max(self._min_n, 2), min(self._max_n + 1, n_tokens + 1)):
+            for i in range(n_tokens - n + 1):
+                terms.append(" ".join(tokens[i : i + n]))
+        return terms
+
+    def transform(self, docs: Iterable[str]) -> sparse.csr_matrix:
+        rows: list[int] = []
+        hashes: list[int] = []
+        n_docs = 0
+        for row, doc in enumerate(docs):
+            n_docs += 1
+            for term in self._analyze(doc):
+                rows.append(row)
+                hashes.append(term_hash(term))
+
+        n_features = len(self.vocab_hash)
+        if not hashes or n_features == 0:
+            return sparse.csr_matrix((n_docs, n_features), dtype=np.float32)
+
+        hash_arr = np.array(hashes, dtype=np.uint64)
+        cols = np.searchsorted(self.vocab_hash, hash_arr)
+        cols = np.minimum(cols, n_features - 1)
+        found = self.vocab_hash[cols] == hash_arr
+
+        rows_arr = np.array(rows, dtype=np.int64)[found]
+        cols = cols[found]
+        data = np.ones(len(cols), dtype=np.float32)
+        X = sparse.csr_matrix(
+            (data, (rows_arr, cols)), shape=(n_docs, n_features), dtype=np.float32
+        )
+        X.sum_duplicates()
+
+        if self._binary:
+            X.data[:] = 1.0
+        elif self._sublinear_tf:
+            np.log(X.data, out=X.data)
+            X.data += 1.0
+        X.data *= self.idf[X.indices]
+
+        if self._norm == "l2":
+            norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+        elif self._norm == "l1":
+            norms = np.asarray(abs(X).sum(axis=1)).ravel()
+        else:
+            return X
+        norms[norms == 0.0] = 1.0
+        X.data /= np.repeat(norms, np.diff(X.indptr)).astype(np.float32)
+        return X
+
+    def decision_function(self, X: sparse.csr_matrix) -> np.ndarray:
+        scores = np.asarray(X @ self.coef.T) + self.intercept
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, docs: Sequence[str]) -> list[str]:
+        """Returns the predicted label for every preprocessed document."""
+        if not len(docs):
+            return []
+        scores = self.decision_function(self.transform(docs))
+        if scores.ndim == 1:
+            indices = (scores > 0).astype(int)
+        else:
+            indices = scores.argmax(axis=1)
+        return [str(c) for c in self.classes[indices]]
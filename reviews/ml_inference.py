@@ -1,27 +1,80 @@
+import hashlib
+import logging
+import threading
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterable, NamedTuple, Sequence
 
-import joblib
 from django.conf import settings
 
+from reviews import model_registry
+from reviews.ml_bundle import MANIFEST_NAME, ModelBundle
+from reviews.prediction_cache import PredictionCache, prediction_key
+
+logger = logging.getLogger(__name__)
+
 ML_DIR = Path(settings.BASE_DIR) / "ml"
 VECTORIZER_PATH = ML_DIR / "sentiment_vectorizer.joblib"
 MODEL_PATH = ML_DIR / "sentiment_model.joblib"
 LABELS_PATH = ML_DIR / "sentiment_labels.joblib"
+BUNDLE_DIR = ML_DIR / "bundle"
+REGISTRY_DIR = ML_DIR / "registry"
+
+# model version reported for the unversioned artifacts directly in ml/
+LEGACY_VERSION = "legacy"
 
 _ARTIFACTS: tuple[Any, Any, list[str]] | None = None
+_MODEL_FINGERPRINT: str | None = None
+_BUNDLE: ModelBundle | None = None
+_BUNDLE_FINGERPRINT: str | None = None
+
+_PREDICTION_CACHE = PredictionCache(
+    maxsize=settings.SENTIMENT_PREDICTION_CACHE_SIZE,
+    disk_path=settings.SENTIMENT_PREDICTION_CACHE_PATH,
+)
+
+
+class ServedModel(NamedTuple):
+    version: str
+    predict: Callable[[Sequence[str]], Sequence[Any]]
+    labels: list[str]
+    fingerprint: str
+
+
+class Prediction(NamedTuple):
+    processed_text: str
+    label: str
+    model_version: str
+
+
+# registry state: the model being served is replaced by a single reference
+# assignment, so a batch that already picked it up finishes on the old model
+_SERVED: ServedModel | None = None
+_SWAP_LOCK = threading.Lock()
+_LOADING: str | None = None
+_ACTIVE_SEEN: str | None = None
+_NEXT_POLL = 0.0
 
 
 def model_files_exist() -> bool:
-    return (
-        VECTORIZER_PATH.exists()
-        and MODEL_PATH.exists()
-        and LABELS_PATH.exists()
-    )
+    if model_registry.active_version(REGISTRY_DIR) is not None:
+        return True
+    if settings.SENTIMENT_ENGINE == "bundle":
+        return (BUNDLE_DIR / MANIFEST_NAME).exists()
+    return VECTORIZER_PATH.exists() and MODEL_PATH.exists() and LABELS_PATH.exists()
+
+
+def _fingerprint_files(*paths: Path) -> str:
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
 
 
 def load_model_artifacts():
-    global _ARTIFACTS
+    global _ARTIFACTS, _MODEL_FINGERPRINT
 
     if _ARTIFACTS is not None:
         return _ARTIFACTS
@@ -32,30 +85,253 @@ def load_model_artifacts():
             "Run: python scripts/train_sentiment_model.py"
         )
 
+    import joblib
+
     vectorizer = joblib.load(VECTORIZER_PATH)
     model = joblib.load(MODEL_PATH)
     labels = joblib.load(LABELS_PATH)
+    _MODEL_FINGERPRINT = _fingerprint_files(VECTORIZER_PATH, MODEL_PATH, LABELS_PATH)
     _ARTIFACTS = (vectorizer, model, labels)
     return _ARTIFACTS
 
 
+def model_fingerprint() -> str:
+    """Content hash of the loaded model artifacts."""
+    global _MODEL_FINGERPRINT
+
+    load_model_artifacts()
+    if _MODEL_FINGERPRINT is None:
+        _MODEL_FINGERPRINT = _fingerprint_files(
+            VECTORIZER_PATH, MODEL_PATH, LABELS_PATH
+        )
+    return _MODEL_FINGERPRINT
+
+
+def load_model_bundle() -> ModelBundle:
+    """Loads the memory-mapped model bundle (numpy/scipy scorer, no sklearn)."""
+    global _BUNDLE, _BUNDLE_FINGERPRINT
+
+    if _BUNDLE is not None:
+        return _BUNDLE
+
+    if not (BUNDLE_DIR / MANIFEST_NAME).exists():
+        raise RuntimeError(
+            "Sentiment model bundle is missing. "
+            "Run: python scripts/export_model_bundle.py"
+        )
+
+    bundle = ModelBundle(BUNDLE_DIR)
+    _BUNDLE_FINGERPRINT = _fingerprint_files(
+        *(BUNDLE_DIR / name for name in sorted(p.name for p in BUNDLE_DIR.iterdir()))
+    )
+    _BUNDLE = bundle
+    return _BUNDLE
+
+
+def _load_scorer() -> tuple[Callable[[Sequence[str]], Sequence[Any]], list[str], str]:
+    """Returns (predict, labels, fingerprint) for the configured engine."""
+    if settings.SENTIMENT_ENGINE == "bundle":
+        bundle = load_model_bundle()
+        return bundle.predict, bundle.labels, _BUNDLE_FINGERPRINT
+
+    vectorizer, model, labels = load_model_artifacts()
+
+    def predict(docs):
+        return model.predict(vectorizer.transform(docs))
+
+    return predict, labels, model_fingerprint()
+
+
+def _load_registry_version(version: str) -> ServedModel:
+    """Reads one published version from disk; runs off the request path."""
+    path = model_registry.version_dir(REGISTRY_DIR, version)
+    manifest = model_registry.read_manifest(REGISTRY_DIR, version)
+    engine = settings.SENTIMENT_ENGINE
+    fingerprint = f"{manifest['fingerprint']}:{engine}"
+
+    if engine == "bundle":
+        bundle = ModelBundle(path / model_registry.BUNDLE_NAME)
+        return ServedModel(version, bundle.predict, bundle.labels, fingerprint)
+
+    import joblib
+
+    vectorizer, model, labels = (
+        joblib.load(path / name) for name in model_registry.ARTIFACT_FILES
+    )
+
+    def predict(docs):
+        return model.predict(vectorizer.transform(docs))
+
+    return ServedModel(version, predict, labels, fingerprint)
+
+
+def _swap(served: ServedModel) -> None:
+    global _SERVED
+
+    _SERVED = served
+    _PREDICTION_CACHE.bind(served.fingerprint)
+    logger.info("Serving sentiment model version %s", served.version)
+
+
+def _background_load(version: str) -> None:
+    global _LOADING
+
+    try:
+        served = _load_registry_version(version)
+        with _SWAP_LOCK:
+            _swap(served)
+    except Exception:
+        # keep serving the current model; the next poll retries
+        logger.exception("Failed to load sentiment model version %s", version)
+    finally:
+        with _SWAP_LOCK:
+            _LOADING = None
+
+
+def _poll_active_version(force: bool = False) -> str | None:
+    """Re-reads the ACTIVE pointer at most every SENTIMENT_MODEL_POLL_SECONDS."""
+    global _ACTIVE_SEEN, _NEXT_POLL
+
+    now = time.monotonic()
+    if force or now >= _NEXT_POLL:
+        _ACTIVE_SEEN = model_registry.active_version(REGISTRY_DIR)
+        _NEXT_POLL = now + settings.SENTIMENT_MODEL_POLL_SECONDS
+    return _ACTIVE_SEEN
+
+
+def _served_model(force_poll: bool = False, wait: bool = False) -> ServedModel:
+    """
+    Returns the model to score the next batch with.
+
+    Without a registry pointer the legacy artifacts in ml/ are served. With
+    one, the first load is synchronous (there is nothing to serve yet); later
+    version changes are loaded in a background thread and swapped in, while
+    requests keep using the previous model.
+    """
+    global _LOADING
+
+    active = _poll_active_version(force_poll)
+    served = _SERVED
+    if active is None:
+        if served is not None:
+            return served
+        predict, labels, fingerprint = _load_scorer()
+        _PREDICTION_CACHE.bind(fingerprint)
+        return ServedModel(LEGACY_VERSION, predict, labels, fingerprint)
+
+    if served is not None and served.version == active:
+        return served
+
+    if served is None or wait:
+        with _SWAP_LOCK:
+            if _SERVED is None or _SERVED.version != active:
+                try:
+                    loaded = _load_registry_version(active)
+                except LookupError as exc:
+                    raise RuntimeError(
+                        f"Active sentiment model version is not published: {active}"
+                    ) from exc
+                _swap(loaded)
+            return _SERVED
+
+    with _SWAP_LOCK:
+        if _LOADING is None:
+            _LOADING = active
+            threading.Thread(
+                target=_background_load,
+                args=(active,),
+                name=f"sentiment-model-load-{active}",
+                daemon=True,
+            ).start()
+    return served
+
+
+def refresh_model(wait: bool = False) -> str:
+    """
+    Re-reads the registry pointer now instead of waiting for the next poll.
+    With wait=True a pending version is loaded synchronously. Returns the
+    version that serves predictions afterwards.
+    """
+    return _served_model(force_poll=True, wait=wait).version
+
+
+def served_model_version() -> str:
+    return _served_model().version
+
+
+def prediction_cache_stats() -> dict:
+    return _PREDICTION_CACHE.stats()
+
+
 def predict_sentiment(text: str) -> str:
     if not text or not str(text).strip():
         return ""
 
-    vectorizer, model, labels = load_model_artifacts()
+    return predict_sentiment_batch([text])[0]
 
-    from reviews.text_preprocess import preprocess_pipeline
 
-    processed_text = preprocess_pipeline(str(text))
-    if not processed_text:
-        return ""
+def predict_sentiment_batch(texts: Iterable[str]) -> list[str]:
+    """
+    Batch version of predict_sentiment: preprocesses the whole batch with
+    preprocess_many, vectorizes it into one sparse matrix and calls
+    model.predict once. Returns one label per input ("" for empty texts).
+    """
+    return [p.label for p in preprocess_and_predict_batch(texts)]
+
+
+def preprocess_and_predict_batch(texts: Iterable[str]) -> list[Prediction]:
+    """
+    Returns Prediction(processed_text, label, model_version) for every input
+    text; empty texts get an all-empty Prediction.
+
+    Results are cached by a hash of the text, the preprocessing pipeline
+    version and the model fingerprint, so duplicate reviews skip both
+    preprocessing and inference. Only cache misses are vectorized, as one
+    sparse matrix. The scorer is sklearn or the memory-mapped bundle,
+    depending on settings.SENTIMENT_ENGINE. The whole batch is scored by one
+    model version, even if a new version is swapped in meanwhile.
+    """
+    texts = list(texts)
+    results = [Prediction("", "", "")] * len(texts)
+
+    positions = [i for i, text in enumerate(texts) if text and str(text).strip()]
+    if not positions:
+        return results
+
+    served = _served_model()
+    predict, labels, fingerprint = served.predict, served.labels, served.fingerprint
+
+    from reviews.text_preprocess import pipeline_version, preprocess_many
+
+    version = pipeline_version()
+    keys = {i: prediction_key(str(texts[i]), fingerprint, version) for i in positions}
+    cached = _PREDICTION_CACHE.get_many(set(keys.values()))
+
+    # unique misses only: identical texts in a batch are scored once
+    missing: dict[str, str] = {}
+    for i in positions:
+        if keys[i] not in cached:
+            missing.setdefault(keys[i], str(texts[i]))
+
+    if missing:
+        miss_keys = list(missing)
+        processed = preprocess_many([missing[k] for k in miss_keys])
+        fresh = {k: (text, "") for k, text in zip(miss_keys, processed)}
 
-    vector = vectorizer.transform([processed_text])
-    prediction = model.predict(vector)[0]
-    prediction = str(prediction)
+        scored = [k for k, text in zip(miss_keys, processed) if text]
+        if scored:
+            predictions = predict([fresh[k][0] for k in scored])
+            for k, prediction in zip(scored, predictions):
+                prediction = str(prediction)
+                if prediction not in labels:
+                    raise RuntimeError(
+                        f"Sentiment model returned unknown label: {prediction}"
+                    )
+                fresh[k] = (fresh[k][0], prediction)
 
-    if prediction not in labels:
-        raise RuntimeError(f"Sentiment model returned unknown label: {prediction}")
+        _PREDICTION_CACHE.put_many(fresh, fingerprint)
+        cached.update(fresh)
 
-    return prediction
+    for i in positions:
+        results[i] = Prediction(*cached[keys[i]], served.version)
+    return results
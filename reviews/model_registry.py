@@ -0,0 +1,152 @@
+"""
+Versioned registry of sentiment model artifacts.
+
+    ml/registry/
+        ACTIVE                       name of the version workers should serve
+        <version>/
+            manifest.json            version, creation time, content fingerprint
+            sentiment_vectorizer.joblib
+            sentiment_model.joblib
+            sentiment_labels.joblib
+            bundle/                  numpy bundle (optional, see ml_bundle)
+
+Published versions are immutable: a version directory is assembled next to
+the registry and renamed into place, and switching models is an atomic
+replace of the ACTIVE pointer file. Workers poll the pointer and load the new
+version in the background (see ml_inference).
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+ACTIVE_NAME = "ACTIVE"
+MANIFEST_NAME = "manifest.json"
+BUNDLE_NAME = "bundle"
+ARTIFACT_FILES = (
+    "sentiment_vectorizer.joblib",
+    "sentiment_model.joblib",
+    "sentiment_labels.joblib",
+)
+
+_VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+def new_version() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def version_dir(registry_dir: Path, version: str) -> Path:
+    if not _VERSION_RE.match(version or ""):
+        raise ValueError(f"Invalid model version name: {version!r}")
+    return Path(registry_dir) / version
+
+
+def _fingerprint_dir(path: Path) -> str:
+    digest = hashlib.sha1()
+    for file in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(file.relative_to(path).as_posix().encode("utf-8") + b"\0")
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(registry_dir: Path, version: str) -> dict:
+    path = version_dir(registry_dir, version) / MANIFEST_NAME
+    if not path.exists():
+        raise LookupError(f"Model version is not published: {version}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def list_versions(registry_dir: Path) -> list[str]:
+    registry_dir = Path(registry_dir)
+    if not registry_dir.is_dir():
+        return []
+    return sorted(
+        p.name
+        for p in registry_dir.iterdir()
+        if p.is_dir() and _VERSION_RE.match(p.name) and (p / MANIFEST_NAME).exists()
+    )
+
+
+def publish(
+    registry_dir: Path,
+    source_dir: Path,
+    version: Optional[str] = None,
+    activate: bool = False,
+) -> str:
+    """
+    Copies the joblib artifacts (and bundle/, when present) from source_dir
+    into a new immutable version directory. Returns the version name.
+    """
+    registry_dir = Path(registry_dir)
+    source_dir = Path(source_dir)
+    version = version or new_version()
+    target = version_dir(registry_dir, version)
+    if target.exists():
+        raise ValueError(f"Model version already exists: {version}")
+
+    missing = [name for name in ARTIFACT_FILES if not (source_dir / name).exists()]
+    if missing:
+        raise FileNotFoundError(
+            f"Model artifacts are missing in {source_dir}: {', '.join(missing)}"
+        )
+
+    registry_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = registry_dir / f".{version}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+    try:
+        for name in ARTIFACT_FILES:
+            shutil.copy2(source_dir / name, tmp_dir / name)
+        if (source_dir / BUNDLE_NAME).is_dir():
+            shutil.copytree(source_dir / BUNDLE_NAME, tmp_dir / BUNDLE_NAME)
+
+        manifest = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "fingerprint": _fingerprint_dir(tmp_dir),
+            "has_bundle": (tmp_dir / BUNDLE_NAME).is_dir(),
+        }
+        with open(tmp_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        # rename fails if another publisher created the same version meanwhile
+        os.rename(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    if activate:
+        activate_version(registry_dir, version)
+    return version
+
+
+def active_version(registry_dir: Path) -> Optional[str]:
+    """Version named by the ACTIVE pointer, or None when nothing is active."""
+    try:
+        with open(Path(registry_dir) / ACTIVE_NAME, "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return version or None
+
+
+def activate_version(registry_dir: Path, version: str) -> None:
+    """Points ACTIVE at a published version (atomic replace of the pointer)."""
+    registry_dir = Path(registry_dir)
+    read_manifest(registry_dir, version)
+
+    pointer = registry_dir / ACTIVE_NAME
+    tmp_path = pointer.with_name(f"{ACTIVE_NAME}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, pointer)
@@ -1,7 +1,78 @@
+import hashlib
+import uuid
+
 from django.db import models
+from django.db.models import Q
+
+
+class Dimension(models.Model):
+    """
+    Справочник значений измерения (регион, категория, пол, источник).
+    Review и SentimentRollup ссылаются на него целочисленным FK;
+    пустое значение — NULL, отдельной записи для него нет.
+    """
+
+    name = models.CharField(max_length=128, unique=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
+
+    @classmethod
+    def of(cls, name: str):
+        """Запись по имени (создаётся при необходимости); None для пустого имени."""
+        name = (name or "").strip()
+        return cls.objects.get_or_create(name=name)[0] if name else None
+
+
+class Region(Dimension):
+    class Meta(Dimension.Meta):
+        verbose_name = "регион"
+        verbose_name_plural = "регионы"
+
+
+class ProductCategory(Dimension):
+    class Meta(Dimension.Meta):
+        verbose_name = "категория товара"
+        verbose_name_plural = "категории товаров"
+
+
+class Gender(Dimension):
+    name = models.CharField(max_length=16, unique=True)
+
+    class Meta(Dimension.Meta):
+        verbose_name = "пол"
+        verbose_name_plural = "пол"
+
+
+class Source(Dimension):
+    name = models.CharField(max_length=64, unique=True)
+
+    class Meta(Dimension.Meta):
+        verbose_name = "источник"
+        verbose_name_plural = "источники"
+
+
+def dimension_fk(model):
+    # без отдельного индекса на FK: поиск по региону и категории покрывают
+    # составные индексы из Meta, а пол и источник не индексировались и раньше
+    return models.ForeignKey(
+        model,
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name="+",
+        db_index=False,
+    )
 
 
 class Review(models.Model):
+    # поля-справочники (FK на Dimension); в выгрузках и хэше — по имени
+    DIMENSION_FIELDS = ("region", "product_category", "gender", "source")
+
     SENTIMENT_CHOICES = [
         ("negative", "negative"),
         ("neutral", "neutral"),
@@ -11,32 +82,252 @@ class Review(models.Model):
 
     review_text = models.TextField()
     processed_text = models.TextField(blank=True)
+    # отпечаток пайплайна предобработки (text_preprocess.pipeline_version),
+    # которым получен processed_text; пусто — ещё не обрабатывалось
+    processed_version = models.CharField(max_length=16, blank=True, default="")
     sentiment = models.CharField(
         max_length=16, choices=SENTIMENT_CHOICES, default="", blank=True
     )
 
     date = models.DateField(null=True, blank=True)
-    region = models.CharField(max_length=128, blank=True)
-    product_category = models.CharField(max_length=128, blank=True)
-    gender = models.CharField(max_length=16, blank=True)
+    region = dimension_fk(Region)
+    product_category = dimension_fk(ProductCategory)
+    gender = dimension_fk(Gender)
     age = models.PositiveIntegerField(null=True, blank=True)
-    source = models.CharField(max_length=64, blank=True)
+    source = dimension_fk(Source)
+
+    # хэш нормализованного текста и метаданных (make_content_hash) —
+    # по нему импорт отбрасывает повторно загруженные отзывы;
+    # пусто — ещё не посчитан (manage.py backfill_content_hash)
+    content_hash = models.CharField(max_length=32, blank=True, default="")
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         indexes = [
+            # своих индексов у FK-измерений нет (dimension_fk): region и
+            # product_category покрыты только составными индексами ниже,
+            # gender и source не индексируются
             models.Index(fields=["date"]),
-            models.Index(fields=["region"]),
-            models.Index(fields=["product_category"]),
             models.Index(fields=["sentiment"]),
+            models.Index(fields=["processed_version"]),
+            # браузер отзывов: фильтр по равенству + keyset по (created_at, id)
+            models.Index(fields=["created_at", "id"], name="review_created_id_idx"),
+            models.Index(
+                fields=["sentiment", "created_at", "id"],
+                name="review_sent_created_idx",
+            ),
+            models.Index(
+                fields=["region", "created_at", "id"],
+                name="review_region_created_idx",
+            ),
+            models.Index(
+                fields=["product_category", "created_at", "id"],
+                name="review_cat_created_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_hash"],
+                condition=~Q(content_hash=""),
+                name="review_content_hash_unique",
+            )
         ]
         ordering = ["-created_at"]
 
+    @staticmethod
+    def make_content_hash(
+        review_text, date, region, product_category, gender, age, source
+    ) -> str:
+        """
+        blake2b-128 от текста и метаданных. Текст и строковые поля
+        нормализуются: пробелы схлопываются, регистр не учитывается.
+        """
+        parts = [
+            " ".join(str(v or "").split()).casefold()
+            for v in (review_text, region, product_category, gender, source)
+        ]
+        parts.append(date.isoformat() if date else "")
+        parts.append("" if age is None else str(age))
+        raw = "\x1f".join(parts).encode("utf-8")
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    def dimension_name(self, field: str) -> str:
+        """Имя значения справочника field ("" если не задано)."""
+        value = getattr(self, field)
+        return value.name if value is not None else ""
+
+    def compute_content_hash(self) -> str:
+        # хэш считается по именам, а не по id: он не зависит от справочников
+        return self.make_content_hash(
+            self.review_text,
+            self.date,
+            self.dimension_name("region"),
+            self.dimension_name("product_category"),
+            self.dimension_name("gender"),
+            self.age,
+            self.dimension_name("source"),
+        )
+
     def __str__(self) -> str:
         parts = [
             self.date.isoformat() if self.date else "no_date",
-            self.region or "no_region",
+            self.dimension_name("region") or "no_region",
             self.sentiment or "unknown",
         ]
         return " | ".join(parts)
+
+
+class ImportJob(models.Model):
+    """
+    Фоновый импорт файла с отзывами. Очередь — сама таблица: воркер
+    (manage.py run_import_worker) атомарно забирает задачу в статусе queued.
+    """
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "в очереди"),
+        (STATUS_RUNNING, "выполняется"),
+        (STATUS_DONE, "завершён"),
+        (STATUS_FAILED, "ошибка"),
+    ]
+
+    original_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=512)
+    mapping = models.JSONField(default=dict)
+    # параметры чтения из шага 1: диалект CSV (utils.sniff_csv_dialect)
+    # или {"sheet": ...} для Excel; null — по умолчанию
+    dialect = models.JSONField(null=True, blank=True)
+    # размечать тональность во время импорта (importer.score_reviews)
+    score_sentiment = models.BooleanField(default=False)
+
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    worker = models.CharField(max_length=128, blank=True)
+    error = models.TextField(blank=True)
+    # импорт завершён, но без части работы (например, разметка отключена)
+    warning = models.TextField(blank=True)
+
+    rows_read = models.PositiveIntegerField(default=0)
+    created = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(default=0)
+    scored = models.PositiveIntegerField(default=0)
+    bytes_read = models.BigIntegerField(default=0)
+    bytes_total = models.BigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"#{self.pk} {self.original_name} ({self.status})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class ChunkedUpload(models.Model):
+    """
+    Загрузка большого файла по частям (reviews/chunked_upload.py). Части
+    дописываются в file_path строго по порядку; received_bytes — сколько
+    байт уже на диске, с этого места клиент продолжает после обрыва.
+    """
+
+    STATUS_ACTIVE = "active"
+    STATUS_COMPLETE = "complete"
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, "загружается"),
+        (STATUS_COMPLETE, "загружен"),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    original_name = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=512)
+    total_size = models.BigIntegerField()
+    part_size = models.PositiveIntegerField()
+    received_bytes = models.BigIntegerField(default=0)
+    # sha256 каждой принятой части, по порядку
+    part_hashes = models.JSONField(default=list)
+    # начало файла (до utils.SNIFF_MAX_BYTES) — диалект CSV определяется
+    # по нему, не перечитывая файл с диска
+    head = models.BinaryField(default=b"", blank=True)
+    # sha256 от склеенных sha256 частей: считается без повторного чтения
+    file_hash = models.CharField(max_length=80, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_ACTIVE
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return f"{self.original_name} ({self.received_bytes}/{self.total_size})"
+
+    @property
+    def parts_total(self) -> int:
+        return max(1, -(-self.total_size // self.part_size))
+
+    @property
+    def parts_received(self) -> int:
+        return len(self.part_hashes)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.status == self.STATUS_COMPLETE
+
+
+class SentimentRollup(models.Model):
+    """
+    Предагрегат для дашбордов: число отзывов по день × регион × категория ×
+    пол × возрастная группа × источник × тональность.
+
+    Поддерживается инкрементально (reviews/rollup.py): импорт,
+    apply_sentiment_model и правки отзывов применяют дельты count.
+    Восстановление — manage.py rebuild_sentiment_rollup. В запросах
+    count суммируется, а не берётся как есть.
+    """
+
+    day = models.DateField(null=True, blank=True)
+    region = dimension_fk(Region)
+    product_category = dimension_fk(ProductCategory)
+    gender = dimension_fk(Gender)
+    age_bucket = models.CharField(max_length=8, blank=True)
+    source = dimension_fk(Source)
+    sentiment = models.CharField(max_length=16, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    "day",
+                    "region",
+                    "product_category",
+                    "gender",
+                    "age_bucket",
+                    "source",
+                    "sentiment",
+                ],
+                name="sentiment_rollup_key_unique",
+            )
+        ]
+        indexes = [models.Index(fields=["region", "day"])]
+
+    def __str__(self) -> str:
+        day = self.day.isoformat() if self.day else "no_date"
+        region = self.region.name if self.region_id else "no_region"
+        return f"{day} | {region} | {self.sentiment}: {self.count}"
@@ -0,0 +1,86 @@
+"""
+Keyset-пагинация по (created_at, id) от новых к старым.
+
+Вместо OFFSET страница начинается с курсора — ключа последней (или первой)
+строки соседней страницы: WHERE (created_at, id) < (курсор) ORDER BY
+created_at DESC, id DESC LIMIT n. По составному индексу это одинаково
+быстро и для первой, и для тысячной страницы.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+
+
+@dataclass
+class Page:
+    items: List
+    next_cursor: Optional[str]  # для ссылки «старее»
+    prev_cursor: Optional[str]  # для ссылки «новее»
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    raw = json.dumps([created_at.isoformat(), pk]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """(created_at, id) из курсора; None, если курсор испорчен."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, pk = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page(
+    qs: QuerySet,
+    size: int,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> Page:
+    """
+    Страница из size строк qs. after — строки старше курсора (следующая
+    страница), before — новее курсора (предыдущая). Испорченный курсор
+    даёт первую страницу.
+    """
+    key = decode_cursor(before) if before else None
+    backwards = key is not None
+    if not backwards and after:
+        key = decode_cursor(after)
+
+    if key is None:
+        rows = list(qs.order_by("-created_at", "-id")[: size + 1])
+    elif backwards:
+        created_at, pk = key
+        newer = Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+        rows = list(qs.filter(newer).order_by("created_at", "id")[: size + 1])
+    else:
+        created_at, pk = key
+        older = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        rows = list(qs.filter(older).order_by("-created_at", "-id")[: size + 1])
+
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if backwards:
+        rows.reverse()
+
+    def cursor(row) -> str:
+        return encode_cursor(row.created_at, row.pk)
+
+    if not rows:
+        return Page([], None, None)
+    # в сторону движения «ещё есть» известно по лишней строке; в обратную
+    # сторону страница есть, если мы пришли по курсору
+    has_older = has_more if not backwards else True
+    has_newer = has_more if backwards else key is not None
+    return Page(
+        rows,
+        cursor(rows[-1]) if has_older else None,
+        cursor(rows[0]) if has_newer else None,
+    )
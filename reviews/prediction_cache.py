@@ -0,0 +1,194 @@
+"""
+Content-addressed cache for sentiment predictions.
+
+Keys are hashes of (model fingerprint, preprocessing pipeline version, input
+text), values are (processed_text, label) pairs, so a hit skips both
+preprocessing and inference. Two tiers: a bounded in-process LRU and an
+optional SQLite file shared by all processes on the machine.
+
+Processes serving different model artifacts may share the SQLite file while a
+new version rolls out, so rows of all fingerprints are kept side by side (the
+key already includes the fingerprint). The file is trimmed by age and size
+with the prune_prediction_cache management command, not on model switch.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from reviews.lru import LRUCache
+
+Prediction = Tuple[str, str]
+
+_SQLITE_BATCH = 500
+
+
+def prediction_key(text: str, model_fingerprint: str, pipeline_version: str) -> str:
+    raw = "\0".join((model_fingerprint, pipeline_version, text)).encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+class DiskPredictionCache:
+    """SQLite-backed tier; one connection per thread, WAL for concurrent readers."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS predictions ("
+                    "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+                    "processed TEXT NOT NULL, label TEXT NOT NULL, "
+                    "created_at REAL NOT NULL DEFAULT 0)"
+                )
+                columns = {
+                    row[1] for row in conn.execute("PRAGMA table_info(predictions)")
+                }
+                if "created_at" not in columns:
+                    # files created before rows were timestamped
+                    conn.execute(
+                        "ALTER TABLE predictions "
+                        "ADD COLUMN created_at REAL NOT NULL DEFAULT 0"
+                    )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS predictions_fingerprint "
+                    "ON predictions (fingerprint)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS predictions_created_at "
+                    "ON predictions (created_at)"
+                )
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Prediction]:
+        keys = list(keys)
+        found: Dict[str, Prediction] = {}
+        conn = self._conn()
+        for start in range(0, len(keys), _SQLITE_BATCH):
+            chunk = keys[start : start + _SQLITE_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                "SELECT key, processed, label FROM predictions "
+                f"WHERE key IN ({placeholders})",
+                chunk,
+            )
+            for key, processed, label in rows:
+                found[key] = (processed, label)
+        return found
+
+    def put_many(self, items: Dict[str, Prediction], fingerprint: str) -> None:
+        if not items:
+            return
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO predictions "
+                "(key, fingerprint, processed, label, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(k, fingerprint, p, label, now) for k, (p, label) in items.items()],
+            )
+
+    def prune(
+        self,
+        max_age: Optional[float] = None,
+        max_rows: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> int:
+        """
+        Drops entries older than max_age seconds, then the oldest entries
+        beyond max_rows. Returns the number of deleted rows.
+        """
+        now = time.time() if now is None else now
+        deleted = 0
+        conn = self._conn()
+        with conn:
+            if max_age is not None:
+                cur = conn.execute(
+                    "DELETE FROM predictions WHERE created_at < ?", (now - max_age,)
+                )
+                deleted += cur.rowcount
+            if max_rows is not None:
+                # a put_many batch shares one timestamp, so a batch on the cut-off
+                # survives whole and the file may slightly exceed max_rows
+                cur = conn.execute(
+                    "DELETE FROM predictions WHERE created_at < ("
+                    "SELECT created_at FROM predictions "
+                    "ORDER BY created_at DESC LIMIT 1 OFFSET ?)",
+                    (max(max_rows - 1, 0),),
+                )
+                deleted += cur.rowcount
+        return deleted
+
+    def counts(self) -> Dict[str, int]:
+        """Number of stored entries per model fingerprint."""
+        rows = self._conn().execute(
+            "SELECT fingerprint, COUNT(*) FROM predictions GROUP BY fingerprint"
+        )
+        return dict(rows)
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int, disk_path: Optional[Path] = None):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk = DiskPredictionCache(disk_path) if disk_path else None
+        self.fingerprint: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def bind(self, fingerprint: str) -> None:
+        """
+        Binds the cache to the current model artifacts. When the fingerprint
+        changes, the in-process tier is cleared; disk rows are left alone,
+        other processes may still serve the previous model.
+        """
+        if fingerprint == self.fingerprint:
+            return
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            self.memory.clear()
+            self.fingerprint = fingerprint
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Prediction]:
+        found: Dict[str, Prediction] = {}
+        missing = []
+        for key in keys:
+            value = self.memory.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing and self.disk is not None:
+            from_disk = self.disk.get_many(missing)
+            for key, value in from_disk.items():
+                self.memory.put(key, value)
+            found.update(from_disk)
+        return found
+
+    def put_many(
+        self, items: Dict[str, Prediction], fingerprint: Optional[str] = None
+    ) -> None:
+        """
+        fingerprint is the model that produced the items; it may differ from
+        the bound one while a hot-swapped model finishes in-flight batches.
+        """
+        for key, value in items.items():
+            self.memory.put(key, value)
+        fingerprint = fingerprint or self.fingerprint
+        if self.disk is not None and fingerprint is not None:
+            self.disk.put_many(items, fingerprint)
+
+    def stats(self) -> dict:
+        return self.memory.stats()
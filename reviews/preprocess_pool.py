@@ -0,0 +1,93 @@
+"""
+Параллельная предобработка текстов в пуле процессов.
+
+Модуль не зависит от Django: воркеры импортируют только text_preprocess,
+поэтому пул можно запускать в режиме spawn без настройки Django в дочерних
+процессах.
+"""
+
+import multiprocessing
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+Batch = Sequence[Tuple[int, str]]
+
+
+def _init_worker(use_lemma_cache: bool) -> None:
+    # импорт внутри воркера: у каждого процесса свои MorphAnalyzer и стоп-слова
+    from reviews import text_preprocess
+
+    text_preprocess.preload()
+    if use_lemma_cache:
+        text_preprocess.load_lemma_cache()
+
+
+def preprocess_batch(batch: Batch, do_lemmatize: bool = True) -> List[Tuple[int, str]]:
+    """
+    Обрабатывает батч пар (id, текст), возвращает пары (id, processed_text).
+    """
+    from reviews.text_preprocess import preprocess_many
+
+    ids = [pk for pk, _ in batch]
+    texts = preprocess_many([text for _, text in batch], do_lemmatize=do_lemmatize)
+    return list(zip(ids, texts))
+
+
+def lemma_counters() -> Dict[str, int]:
+    """Счётчики попаданий/промахов кэша лемм и словаря лемм этого процесса."""
+    from reviews.text_preprocess import lemma_cache_stats, lemma_lexicon_stats
+
+    cache = lemma_cache_stats()
+    lexicon = lemma_lexicon_stats() or {"hits": 0, "misses": 0}
+    return {
+        "cache_hits": cache["hits"],
+        "cache_misses": cache["misses"],
+        "lexicon_hits": lexicon["hits"],
+        "lexicon_misses": lexicon["misses"],
+    }
+
+
+def _preprocess_counted(
+    batch: Batch, do_lemmatize: bool
+) -> Tuple[List[Tuple[int, str]], Dict[str, int]]:
+    # счётчики живут в воркере — в главный процесс уходит их прирост за батч
+    before = lemma_counters()
+    result = preprocess_batch(batch, do_lemmatize)
+    after = Counter(lemma_counters())
+    after.subtract(before)
+    return result, dict(after)
+
+
+def imap_preprocess(
+    batches: Iterable[Batch],
+    workers: int,
+    do_lemmatize: bool = True,
+    use_lemma_cache: bool = True,
+    max_pending: int | None = None,
+) -> Iterator[Tuple[List[Tuple[int, str]], Dict[str, int]]]:
+    """
+    Раздаёт батчи пулу из `workers` процессов и отдаёт результаты в исходном
+    порядке по мере готовности — вместе с приростом lemma_counters() за
+    батч, чтобы главный процесс мог сложить статистику воркеров. В работе одновременно не больше `max_pending`
+    батчей (по умолчанию 2 на воркер), поэтому входной итератор читается
+    лениво и память не растёт с объёмом данных.
+    """
+    if workers <= 0:
+        raise ValueError("workers must be greater than 0")
+    max_pending = max_pending or workers * 2
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(use_lemma_cache,),
+    ) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(_preprocess_counted, list(batch), do_lemmatize))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
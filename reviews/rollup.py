@@ -0,0 +1,209 @@
+"""
+Инкрементальное обновление SentimentRollup.
+
+Каждое изменение отзывов превращается в дельты по ключу
+(день, регион, категория, пол, возрастная группа, источник, тональность),
+где измерения — id справочников (None для пустых):
++1 для новой строки, -1/+1 при смене тональности или метаданных,
+-1 при удалении. Дельты одного батча применяются несколькими запросами:
+существующие строки — UPDATE count = count + delta, новые — bulk_create.
+
+bulk_create/bulk_update/QuerySet.update обходят сигналы, поэтому импорт
+и apply_sentiment_model вызывают add_reviews/apply_deltas сами; правки
+через save()/delete() (админка, shell) ловят сигналы из signals.py.
+После коммита дельт меняется версия данных кэша аналитики (analytics.py).
+"""
+
+import logging
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+
+from .analytics import bump_data_version
+from .models import Review, SentimentRollup
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_FIELDS = (
+    "day",
+    "region_id",
+    "product_category_id",
+    "gender_id",
+    "age_bucket",
+    "source_id",
+    "sentiment",
+)
+# поля Review, из которых собирается ключ (FK — по attname, без JOIN)
+SOURCE_FIELDS = (
+    "date",
+    "region_id",
+    "product_category_id",
+    "gender_id",
+    "age",
+    "source_id",
+    "sentiment",
+)
+
+# (верхняя граница не включительно, название); возраст >= последней — "55+"
+AGE_BUCKETS = ((18, "<18"), (25, "18-24"), (35, "25-34"), (45, "35-44"), (55, "45-54"))
+AGE_BUCKET_MAX = "55+"
+
+UPDATE_BATCH = 900
+# ключей на один SELECT существующих строк: по параметру на поле ключа
+LOOKUP_BATCH = UPDATE_BATCH // len(ROLLUP_FIELDS)
+
+
+def age_bucket(age: Optional[int]) -> str:
+    if age is None:
+        return ""
+    for upper, name in AGE_BUCKETS:
+        if age < upper:
+            return name
+    return AGE_BUCKET_MAX
+
+
+def _key(date, region, product_category, gender, age, source, sentiment) -> tuple:
+    return (date, region, product_category, gender, age_bucket(age), source, sentiment)
+
+
+def rollup_key(review) -> tuple:
+    return _key(*(getattr(review, f) for f in SOURCE_FIELDS))
+
+
+def rollup_key_from_values(values: dict) -> tuple:
+    """Ключ по словарю из Review.objects.values(*SOURCE_FIELDS)."""
+    return _key(*(values[f] for f in SOURCE_FIELDS))
+
+
+def count_keys(reviews: Iterable, sign: int = 1) -> Counter:
+    deltas = Counter()
+    for review in reviews:
+        deltas[rollup_key(review)] += sign
+    return deltas
+
+
+def _key_filter(key: tuple) -> Q:
+    lookups = {}
+    for field, value in zip(ROLLUP_FIELDS, key):
+        if value is None:
+            lookups[f"{field}__isnull"] = True
+        else:
+            lookups[field] = value
+    return Q(**lookups)
+
+
+def _existing_rows(keys) -> dict:
+    """
+    key -> id для уже существующих строк rollup с такими ключами. Ключи ищутся
+    точно, пачками по уникальному индексу: стоимость растёт с числом ключей,
+    а не с размером rollup.
+    """
+    keys = list(keys)
+    found = {}
+    for start in range(0, len(keys), LOOKUP_BATCH):
+        key_filter = Q()
+        for key in keys[start : start + LOOKUP_BATCH]:
+            key_filter |= _key_filter(key)
+        qs = SentimentRollup.objects.filter(key_filter).values_list(
+            "id", *ROLLUP_FIELDS
+        )
+        found.update((row[1:], row[0]) for row in qs)
+    return found
+
+
+def _add_one(key: tuple, delta: int) -> None:
+    values = dict(zip(ROLLUP_FIELDS, key))
+    if not SentimentRollup.objects.filter(**values).update(count=F("count") + delta):
+        SentimentRollup.objects.create(count=delta, **values)
+
+
+def apply_deltas(deltas: Counter) -> None:
+    """Применяет дельты в одной транзакции; строки с count <= 0 удаляются."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        # кэш аналитики сбрасывается, только если изменения закоммичены
+        transaction.on_commit(bump_data_version)
+        existing = _existing_rows(deltas.keys())
+        ids_by_delta = defaultdict(list)
+        new_rows = []
+        missing = 0
+        for key, delta in deltas.items():
+            if key in existing:
+                ids_by_delta[delta].append(existing[key])
+            elif delta > 0:
+                new_rows.append(
+                    SentimentRollup(count=delta, **dict(zip(ROLLUP_FIELDS, key)))
+                )
+            else:
+                missing += 1
+        if missing:
+            # вычитать не из чего: агрегат разошёлся с отзывами (например,
+            # после QuerySet.update) — строку с count < 0 не создаём
+            logger.warning(
+                "Rollup рассинхронизирован: %s ключей с отрицательной дельтой "
+                "без строки, нужен manage.py rebuild_sentiment_rollup",
+                missing,
+            )
+
+        # одинаковая дельта (обычно +1/-1) — один UPDATE на пачку строк
+        for delta, ids in ids_by_delta.items():
+            for start in range(0, len(ids), UPDATE_BATCH):
+                batch = ids[start : start + UPDATE_BATCH]
+                SentimentRollup.objects.filter(id__in=batch).update(
+                    count=F("count") + delta
+                )
+            if delta < 0:
+                SentimentRollup.objects.filter(id__in=ids, count__lte=0).delete()
+
+        if new_rows:
+            try:
+                with transaction.atomic():
+                    SentimentRollup.objects.bulk_create(new_rows, batch_size=500)
+            except IntegrityError:
+                # параллельная транзакция успела создать часть ключей
+                for row in new_rows:
+                    _add_one(tuple(getattr(row, f) for f in ROLLUP_FIELDS), row.count)
+
+
+def add_reviews(reviews: Iterable, sign: int = 1) -> None:
+    """+1 (или sign) по ключу каждого отзыва — для импорта и удаления пачкой."""
+    apply_deltas(count_keys(reviews, sign))
+
+
+def _age_bucket_expression():
+    whens = [When(age__lt=upper, then=Value(name)) for upper, name in AGE_BUCKETS]
+    return Case(
+        When(age__isnull=True, then=Value("")),
+        *whens,
+        default=Value(AGE_BUCKET_MAX),
+    )
+
+
+def rebuild_rollup(batch_size: int = 2000) -> int:
+    """Пересчитывает rollup целиком одним GROUP BY по Review. Возвращает число строк."""
+    rows = (
+        Review.objects.order_by()
+        .annotate(day=F("date"), age_bucket=_age_bucket_expression())
+        .values(*ROLLUP_FIELDS)
+        .annotate(n=Count("id"))
+    )
+    with transaction.atomic():
+        transaction.on_commit(bump_data_version)
+        SentimentRollup.objects.all().delete()
+        buffer = []
+        created = 0
+        for row in rows.iterator(chunk_size=batch_size):
+            count = row.pop("n")
+            buffer.append(SentimentRollup(count=count, **row))
+            if len(buffer) >= batch_size:
+                SentimentRollup.objects.bulk_create(buffer)
+                created += len(buffer)
+                buffer = []
+        if buffer:
+            SentimentRollup.objects.bulk_create(buffer)
+            created += len(buffer)
+    return created
@@ -0,0 +1,62 @@
+"""
+Сигналы Review -> SentimentRollup для правок через save()/delete().
+
+Массовые операции (bulk_create, bulk_update, QuerySet.update) сигналов не
+шлют — импорт и apply_sentiment_model обновляют rollup сами (rollup.py).
+"""
+
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Review
+from .rollup import (
+    SOURCE_FIELDS,
+    apply_deltas,
+    count_keys,
+    rollup_key,
+    rollup_key_from_values,
+)
+
+
+# update_fields может содержать и имя FK ("region"), и attname ("region_id")
+SOURCE_FIELDS_SET = frozenset(SOURCE_FIELDS) | frozenset(
+    f.removesuffix("_id") for f in SOURCE_FIELDS
+)
+
+
+def _touches_rollup(update_fields) -> bool:
+    return update_fields is None or not SOURCE_FIELDS_SET.isdisjoint(update_fields)
+
+
+@receiver(pre_save, sender=Review)
+def remember_rollup_key(sender, instance, raw=False, update_fields=None, **kwargs):
+    # ключ до сохранения читается из БД: в экземпляре уже новые значения
+    instance._rollup_old_key = None
+    if raw or instance.pk is None or not _touches_rollup(update_fields):
+        return
+    old = Review.objects.filter(pk=instance.pk).values(*SOURCE_FIELDS).first()
+    if old is not None:
+        instance._rollup_old_key = rollup_key_from_values(old)
+
+
+@receiver(post_save, sender=Review)
+def update_rollup_on_save(
+    sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if raw or not (created or _touches_rollup(update_fields)):
+        return
+    old_key = None if created else getattr(instance, "_rollup_old_key", None)
+    new_key = rollup_key(instance)
+    if old_key == new_key:
+        return
+    deltas = Counter({new_key: 1})
+    if old_key is not None:
+        deltas[old_key] -= 1
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Review)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    apply_deltas(count_keys([instance], sign=-1))
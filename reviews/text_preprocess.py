@@ -22,14 +22,38 @@ if not hasattr(inspect, "getargspec"):
     inspect.getargspec = getargspec
 # КОНЕЦ ПАТЧА
 
+import hashlib
+import json
+import logging
 import re
-from typing import Iterable, List
+import threading
+from importlib import metadata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
 
-from nltk.corpus import stopwords
-from pymorphy2 import MorphAnalyzer
+from reviews.lemma_lexicon import LemmaLexicon
+from reviews.lru import LRUCache
 
-_RU_STOP = set(stopwords.words("russian"))
-_MORPH = MorphAnalyzer()
+logger = logging.getLogger(__name__)
+
+# Словари pymorphy2 и стоп-слова NLTK грузятся лениво, при первом обращении:
+# views импортирует этот модуль при загрузке URLconf, и migrate/админка/тесты
+# не должны платить за загрузку словарей. Для процессов, которым ресурсы точно
+# нужны, есть явный preload().
+_RU_STOP: Optional[Set[str]] = None
+_MORPH = None
+_INIT_LOCK = threading.Lock()
+
+# кэш token -> lemma: словарь отзывов очень повторяющийся, pymorphy2 дорогой
+LEMMA_CACHE_SIZE = 200_000
+LEMMA_CACHE_PATH = Path(__file__).resolve().parent.parent / "ml" / "lemma_cache.json"
+_LEMMA_CACHE = LRUCache(maxsize=LEMMA_CACHE_SIZE)
+
+# замороженный словарь лемм, собранный по нашему корпусу (build_lemma_lexicon);
+# отображается в память и общий для всех процессов, pymorphy2 — только для OOV
+LEMMA_LEXICON_PATH = Path(__file__).resolve().parent.parent / "ml" / "lemma_lexicon.bin"
+_LEXICON: Optional[LemmaLexicon] = None
+_LEXICON_CHECKED = False
 
 _COMMON_TRASH = {
     "ооо",
@@ -52,6 +76,44 @@ _TAG_RE = re.compile(r"<[^>]+>")
 # оставляем буквы/цифры/пробел, заменяя остальное на пробел
 _NON_ALNUM_RE = re.compile(r"[^0-9a-zа-яё\s]+", flags=re.IGNORECASE)
 _MULTI_SPACE_RE = re.compile(r"\s+")
+_LATIN_RE = re.compile(r"[a-z]+")
+# токен = максимальная серия символов, которые _NON_ALNUM_RE не трогает
+_WORD_RE = re.compile(r"[0-9a-zа-яё]+", flags=re.IGNORECASE)
+
+
+def get_stopwords() -> Set[str]:
+    """Множество русских стоп-слов NLTK (загружается один раз на процесс)."""
+    global _RU_STOP
+    if _RU_STOP is None:
+        with _INIT_LOCK:
+            if _RU_STOP is None:
+                from nltk.corpus import stopwords
+
+                _RU_STOP = set(stopwords.words("russian"))
+    return _RU_STOP
+
+
+def get_morph():
+    """MorphAnalyzer pymorphy2 (создаётся один раз на процесс)."""
+    global _MORPH
+    if _MORPH is None:
+        with _INIT_LOCK:
+            if _MORPH is None:
+                from pymorphy2 import MorphAnalyzer
+
+                _MORPH = MorphAnalyzer()
+    return _MORPH
+
+
+def preload() -> None:
+    """
+    Явная инициализация стоп-слов и MorphAnalyzer — для воркеров и команд,
+    которые точно будут обрабатывать тексты. Если есть словарь лемм,
+    MorphAnalyzer не создаётся: он понадобится только для токенов вне словаря.
+    """
+    get_stopwords()
+    if get_lemma_lexicon() is None:
+        get_morph()
 
 
 def basic_cleanup(text: str) -> str:
@@ -79,11 +141,12 @@ def filter_stopwords(tokens: Iterable[str]) -> List[str]:
     """
     Удаляем стоп-слова и слишком короткие токены.
     """
+    ru_stop = get_stopwords()
     out = []
     for t in tokens:
         if len(t) <= 2:
             continue
-        if t in _RU_STOP:
+        if t in ru_stop:
             continue
         if t in _COMMON_TRASH:
             continue
@@ -91,27 +154,192 @@ def filter_stopwords(tokens: Iterable[str]) -> List[str]:
     return out
 
 
+def clean_tokens(text: str) -> List[str]:
+    """
+    Быстрый путь для basic_cleanup -> tokenize -> filter_stopwords.
+    Вместо четырёх полных замен по строке и отдельных проходов split/фильтра —
+    один проход регуляркой по словам с фильтрацией на лету. URL и теги
+    вырезаются заранее только если в тексте есть их признаки.
+    Результат совпадает с исходной цепочкой побайтно.
+    """
+    s = str(text).lower()
+    if "http" in s or "www." in s:
+        s = _URL_RE.sub(" ", s)
+    if "<" in s:
+        s = _TAG_RE.sub(" ", s)
+    ru_stop = get_stopwords()
+    return [
+        t
+        for t in _WORD_RE.findall(s)
+        if len(t) > 2 and t not in ru_stop and t not in _COMMON_TRASH
+    ]
+
+
 def lemmatize_ru(tokens: Iterable[str]) -> List[str]:
     """
     Лемматизация русских слов через pymorphy2.
     """
+    lexicon = get_lemma_lexicon()
     out = []
     for t in tokens:
-        if re.match(r"[a-z]+", t):
+        if _LATIN_RE.match(t):
             out.append(t)
             continue
-        out.append(_MORPH.parse(t)[0].normal_form)
+        lemma = _LEMMA_CACHE.get(t)
+        if lemma is None:
+            if lexicon is not None:
+                lemma = lexicon.get(t)
+            if lemma is None:
+                lemma = get_morph().parse(t)[0].normal_form
+            _LEMMA_CACHE.put(t, lemma)
+        out.append(lemma)
     return out
 
 
+def _lemma_cache_meta() -> dict:
+    # при смене pymorphy2 или словаря сохранённый кэш становится невалидным;
+    # версии берём из метаданных пакетов, чтобы не грузить сами словари
+    meta = {}
+    for dist in ("pymorphy2", "pymorphy2-dicts-ru"):
+        try:
+            meta[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            meta[dist] = ""
+    return meta
+
+
+def load_lemma_cache(path: Optional[Path] = None) -> int:
+    """
+    Прогревает кэш лемм с диска. Возвращает количество загруженных записей.
+    """
+    return _LEMMA_CACHE.load_json(path or LEMMA_CACHE_PATH, meta=_lemma_cache_meta())
+
+
+def save_lemma_cache(path: Optional[Path] = None) -> int:
+    """
+    Сохраняет кэш лемм на диск. Возвращает количество сохранённых записей.
+    """
+    return _LEMMA_CACHE.save_json(path or LEMMA_CACHE_PATH, meta=_lemma_cache_meta())
+
+
+def lemma_cache_stats() -> dict:
+    """Размер кэша лемм и счётчики попаданий/промахов."""
+    return _LEMMA_CACHE.stats()
+
+
+def load_lemma_lexicon(path: Optional[Path] = None) -> int:
+    """
+    Подключает словарь лемм (mmap). Возвращает число записей, 0 — если файла
+    нет, он повреждён или собран под другую версию pymorphy2: тогда леммы
+    считает pymorphy2.
+    """
+    global _LEXICON, _LEXICON_CHECKED
+    path = Path(path or LEMMA_LEXICON_PATH)
+    with _INIT_LOCK:
+        _LEXICON_CHECKED = True
+        if _LEXICON is not None and _LEXICON.path == path:
+            return len(_LEXICON)
+        if not path.exists():
+            return 0
+        try:
+            lexicon = LemmaLexicon(path)
+        except (OSError, ValueError) as e:
+            logger.warning("Словарь лемм не подключён: %s", e)
+            return 0
+        if lexicon.meta.get("pymorphy", {}) != _lemma_cache_meta():
+            lexicon.close()
+            return 0
+        _LEXICON = lexicon
+    return len(lexicon)
+
+
+def get_lemma_lexicon() -> Optional[LemmaLexicon]:
+    """Словарь лемм по умолчанию; при первом обращении пробуем его подключить."""
+    if not _LEXICON_CHECKED:
+        load_lemma_lexicon()
+    return _LEXICON
+
+
+def lemma_lexicon_meta() -> dict:
+    """Метаданные для build_lexicon: привязка словаря к версии pymorphy2."""
+    return {"pymorphy": _lemma_cache_meta()}
+
+
+def lemma_lexicon_stats() -> Optional[dict]:
+    """Размер словаря лемм и доля попаданий; None, если словарь не подключён."""
+    return _LEXICON.stats() if _LEXICON is not None else None
+
+
+# меняйте при изменении логики пайплайна, которую не видно в данных ниже
+PIPELINE_REVISION = 1
+
+# do_lemmatize -> (стоп-слова, мусорные слова, отпечаток): отпечаток нужен на
+# каждый батч предсказаний, а сортировать и хешировать стоп-слова каждый раз
+# дорого. Запомненное значение действует, пока наборы слов те же объекты:
+# перезагрузка стоп-слов или подмена _COMMON_TRASH его сбрасывают.
+_PIPELINE_VERSIONS: Dict[bool, tuple] = {}
+
+
+def pipeline_version(do_lemmatize: bool = True) -> str:
+    """
+    Отпечаток пайплайна: стоп-слова, регулярки, флаг лемматизации и версия
+    словарей pymorphy2. Хранится в Review.processed_version, чтобы
+    перерабатывать только строки, обработанные другой версией.
+    """
+    stopwords, trash = get_stopwords(), _COMMON_TRASH
+    cached = _PIPELINE_VERSIONS.get(do_lemmatize)
+    if cached is not None and cached[0] is stopwords and cached[1] is trash:
+        return cached[2]
+    payload = {
+        "revision": PIPELINE_REVISION,
+        "stopwords": sorted(stopwords),
+        "trash": sorted(trash),
+        "regexes": [
+            (r.pattern, int(r.flags))
+            for r in (_URL_RE, _TAG_RE, _NON_ALNUM_RE, _MULTI_SPACE_RE, _WORD_RE)
+        ],
+        "lemmatize": do_lemmatize,
+        "morph": _lemma_cache_meta() if do_lemmatize else {},
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    version = hashlib.sha1(raw).hexdigest()[:12]
+    _PIPELINE_VERSIONS[do_lemmatize] = (stopwords, trash, version)
+    return version
+
+
 def preprocess_pipeline(text: str, do_lemmatize: bool = True) -> str:
     """
     Полный пайплайн: clean -> tokenize -> stopwords -> (lemmatize) -> join.
     Возвращает строку, готовую для TF-IDF/модели.
     """
-    s = basic_cleanup(text)
-    toks = tokenize(s)
-    toks = filter_stopwords(toks)
+    toks = clean_tokens(text)
     if do_lemmatize:
         toks = lemmatize_ru(toks)
     return " ".join(toks)
+
+
+def preprocess_many(texts: Iterable[str], do_lemmatize: bool = True) -> List[str]:
+    """
+    Пакетный вариант preprocess_pipeline: результат совпадает поэлементно.
+    Одинаковые тексты обрабатываются один раз, а лемматизируется только
+    множество уникальных токенов батча — стоимость pymorphy2 зависит
+    от размера словаря, а не от объёма корпуса.
+    """
+    keys = [str(t) for t in texts]
+
+    tokens_by_text: Dict[str, List[str]] = {}
+    for key in keys:
+        if key not in tokens_by_text:
+            tokens_by_text[key] = clean_tokens(key)
+
+    if do_lemmatize:
+        vocab = list({t for toks in tokens_by_text.values() for t in toks})
+        lemmas = dict(zip(vocab, lemmatize_ru(vocab)))
+        processed = {
+            key: " ".join(lemmas[t] for t in toks)
+            for key, toks in tokens_by_text.items()
+        }
+    else:
+        processed = {key: " ".join(toks) for key, toks in tokens_by_text.items()}
+
+    return [processed[key] for key in keys]
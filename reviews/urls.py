@@ -1,10 +1,61 @@
 from django.urls import path
 
-from .views import home, reviews_list, upload_step1, upload_step2_import
+from .views import (
+    analytics_distribution,
+    analytics_stats,
+    analytics_timeseries,
+    chunked_upload_complete,
+    chunked_upload_create,
+    chunked_upload_detail,
+    chunked_upload_part,
+    home,
+    import_job_detail,
+    import_job_progress,
+    predict_api,
+    reviews_list,
+    upload_mapping,
+    upload_step1,
+    upload_step2_import,
+)
 
 urlpatterns = [
     path("", home, name="home"),
     path("reviews/", reviews_list, name="reviews_list"),
     path("upload/", upload_step1, name="upload_step1"),
+    path("upload/mapping/", upload_mapping, name="upload_mapping"),
     path("upload/import/", upload_step2_import, name="upload_step2_import"),
+    path("upload/chunked/", chunked_upload_create, name="chunked_upload_create"),
+    path(
+        "upload/chunked/<uuid:upload_id>/",
+        chunked_upload_detail,
+        name="chunked_upload_detail",
+    ),
+    path(
+        "upload/chunked/<uuid:upload_id>/parts/<int:index>/",
+        chunked_upload_part,
+        name="chunked_upload_part",
+    ),
+    path(
+        "upload/chunked/<uuid:upload_id>/complete/",
+        chunked_upload_complete,
+        name="chunked_upload_complete",
+    ),
+    path("upload/jobs/<int:job_id>/", import_job_detail, name="import_job_detail"),
+    path(
+        "upload/jobs/<int:job_id>/progress/",
+        import_job_progress,
+        name="import_job_progress",
+    ),
+    path("api/predict/", predict_api, name="predict_api"),
+    path(
+        "api/analytics/distribution/",
+        analytics_distribution,
+        name="analytics_distribution",
+    ),
+    path(
+        "api/analytics/timeseries/",
+        analytics_timeseries,
+        name="analytics_timeseries",
+    ),
+    path("api/analytics/stats/", analytics_stats, name="analytics_stats"),
 ]
@@ -1,37 +1,332 @@
+import codecs
+import csv
 import io
 import json
 import os
 import re
-from typing import List, Optional, Tuple
+from datetime import datetime
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from dateutil import parser
 
 CSV_EXTS = {".csv"}
 XLS_EXTS = {".xlsx", ".xls"}
+# .xlsx читается потоково через openpyxl (iter_xlsx_batches);
+# старый .xls — только pd.read_excel целиком
+XLSX_EXTS = {".xlsx"}
 JSON_EXTS = {".json"}
+NDJSON_EXTS = {".ndjson", ".jsonl"}
 
 HEADER_ROWS_PREVIEW = 5
 
+CSV_SEPARATORS = [",", ";", "\t", "|"]
+CSV_ENCODINGS = ["utf-8", "cp1251"]
+SNIFF_BYTES = 64 * 1024
+# если в первых SNIFF_BYTES только ASCII, кириллица может начаться дальше
+SNIFF_MAX_BYTES = 1024 * 1024
+
+# сколько байт JSON-файла читается за раз при потоковом разборе
+JSON_READ_BYTES = 64 * 1024
+
 
 def get_ext(filename: str) -> str:
     return os.path.splitext(filename.lower())[1]
 
 
+def sample_from_head(head: bytes, total_size: int) -> Tuple[bytes, bool]:
+    """
+    Сэмпл для определения диалекта из начала файла (до SNIFF_MAX_BYTES байт):
+    первые SNIFF_BYTES, больше — если они целиком ASCII. Возвращает
+    (сэмпл, весь ли файл в него попал).
+    """
+    size = SNIFF_BYTES
+    while head[:size].isascii() and size < min(len(head), SNIFF_MAX_BYTES):
+        size += SNIFF_BYTES
+    sample = head[:size]
+    return sample, len(sample) >= total_size
+
+
+def _read_sample(path: str) -> Tuple[bytes, bool]:
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_MAX_BYTES)
+    return sample_from_head(head, os.path.getsize(path))
+
+
+def _detect_encoding(sample: bytes, complete: bool) -> str:
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        # final=False: сэмпл может обрываться посреди многобайтового символа
+        decoder.decode(sample, final=complete)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1251"
+
+
+def _detect_separator(lines: List[str]) -> str:
+    """
+    Выбирает разделитель, при котором строки сэмпла дают одинаковое
+    и наибольшее число колонок (с учётом кавычек).
+    """
+    best_sep, best_score = CSV_SEPARATORS[0], None
+    for sep in CSV_SEPARATORS:
+        widths = [len(row) for row in csv.reader(lines, delimiter=sep) if row]
+        if not widths:
+            continue
+        header = widths[0]
+        consistent = sum(w == header for w in widths) / len(widths)
+        score = (header > 1, consistent, header)
+        if best_score is None or score > best_score:
+            best_sep, best_score = sep, score
+    return best_sep
+
+
+def sniff_csv_dialect(path: str) -> Dict[str, str]:
+    """
+    Определяет кодировку и разделитель CSV по небольшому сэмплу байт,
+    не разбирая весь файл. Возвращает {"encoding": ..., "sep": ...}
+    (JSON-сериализуемо — хранится в сессии между шагами импорта).
+    """
+    return dialect_from_sample(*_read_sample(path))
+
+
+def dialect_from_sample(sample: bytes, complete: bool) -> Dict[str, str]:
+    """sniff_csv_dialect по уже прочитанному сэмплу (см. sample_from_head)."""
+    encoding = _detect_encoding(sample, complete)
+    text = sample.decode(encoding, errors="ignore")
+    lines = text.splitlines()
+    if not complete and len(lines) > 1:
+        lines = lines[:-1]  # последняя строка сэмпла может быть обрезана
+    return {"encoding": encoding, "sep": _detect_separator(lines)}
+
+
+def read_csv_with_dialect(path: str, dialect: Dict[str, str], **kwargs):
+    """pd.read_csv с готовым диалектом: сразу C-парсер, без перебора вариантов."""
+    return pd.read_csv(
+        path,
+        encoding=dialect["encoding"],
+        sep=dialect["sep"],
+        quotechar='"',
+        engine="c",
+        **kwargs,
+    )
+
+
+def _json_text_chunks(f: BinaryIO) -> Iterator[str]:
+    """Текст бинарного файла кусками по JSON_READ_BYTES (utf-8, BOM пропускается)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        raw = f.read(JSON_READ_BYTES)
+        text = decoder.decode(raw, final=not raw)
+        if text:
+            yield text
+        if not raw:
+            return
+
+
+def _json_array_items(chunks: Iterator[str]) -> Iterator[dict]:
+    """
+    Элементы JSON-массива верхнего уровня по одному, через
+    JSONDecoder.raw_decode по скользящему буферу: в памяти — только
+    текущий элемент и недочитанный хвост, а не весь файл.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    for text in chunks:
+        buf = text.lstrip()
+        if buf:
+            break
+    if not buf.startswith("["):
+        raise ValueError("Ожидался JSON-массив")
+    pos = 1
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        more = next(chunks, None)
+        if more is None:
+            eof = True
+            return False
+        buf = buf[pos:] + more
+        pos = 0
+        return True
+
+    while True:
+        # пропускаем пробелы и запятые между элементами
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or not fill():
+                break
+        if pos >= len(buf):
+            raise ValueError("JSON-массив оборван: нет закрывающей ']'")
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # элемент не поместился в буфер — дочитываем и пробуем снова
+            if fill():
+                continue
+            raise
+        if end == len(buf) and not eof and fill():
+            # число или литерал на границе буфера могли обрезаться
+            continue
+        pos = end
+        yield item
+
+
+def iter_json_records(f: BinaryIO) -> Iterator[dict]:
+    """
+    Потоковое чтение записей из JSON-массива или NDJSON (бинарный файл).
+    Формат определяется по первому непробельному байту: '[' — массив,
+    иначе — по объекту на строку. Файл читается кусками, поэтому tell()
+    файла показывает прогресс, а память не зависит от его размера.
+    """
+    head = f.read(SNIFF_BYTES)
+    f.seek(0)
+    if head.startswith(codecs.BOM_UTF8):
+        head = head[len(codecs.BOM_UTF8) :]
+    if head.lstrip().startswith(b"["):
+        yield from _json_array_items(_json_text_chunks(f))
+        return
+    for raw in iter(f.readline, b""):
+        line = raw.decode("utf-8-sig").strip()
+        if line:
+            yield json.loads(line)
+
+
+def _xlsx_worksheet(wb, sheet: Optional[str]):
+    """Лист по имени или номеру (с 1); None/"" — первый лист, как у read_excel."""
+    if not sheet:
+        return wb.worksheets[0]
+    if sheet in wb.sheetnames:
+        return wb[sheet]
+    if str(sheet).isdigit() and 1 <= int(sheet) <= len(wb.worksheets):
+        return wb.worksheets[int(sheet) - 1]
+    raise ValueError(
+        f"Лист «{sheet}» не найден. Листы в файле: {', '.join(wb.sheetnames)}"
+    )
+
+
+def iter_xlsx_batches(
+    path: str, batch_rows: int, sheet: Optional[str] = None
+) -> Iterator[Tuple[List[str], List[tuple]]]:
+    """
+    Потоковое чтение листа XLSX: openpyxl в режиме read_only отдаёт строки
+    по одной, не строя объектную модель книги. Выдаёт (header, rows) —
+    заголовок (первая непустая строка) и батч до batch_rows строк данных,
+    выровненных по длине заголовка. Пустые строки пропускаются.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = _xlsx_worksheet(wb, sheet)
+        header = None
+        width = 0
+        batch = []
+        yielded = False
+        for row in ws.iter_rows(values_only=True):
+            if all(v is None or v == "" for v in row):
+                continue
+            if header is None:
+                # безымянные колонки называем как pandas
+                header = [
+                    f"Unnamed: {i}" if v is None else str(v) for i, v in enumerate(row)
+                ]
+                width = len(header)
+                continue
+            row = tuple(row[:width])
+            if len(row) < width:
+                row += (None,) * (width - len(row))
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                yield header, batch
+                batch = []
+                yielded = True
+        # лист только с заголовком — тоже один (пустой) батч, чтобы были колонки
+        if batch or (header is not None and not yielded):
+            yield header, batch
+    finally:
+        wb.close()
+
+
+def read_xlsx_to_df(
+    path: str, nrows: Optional[int] = None, sheet: Optional[str] = None
+) -> pd.DataFrame:
+    """Лист XLSX в DataFrame (dtype=object) через iter_xlsx_batches."""
+    header, rows = [], []
+    for header, batch in iter_xlsx_batches(path, nrows or 10_000, sheet):
+        rows.extend(batch)
+        if nrows is not None and len(rows) >= nrows:
+            rows = rows[:nrows]
+            break
+    return pd.DataFrame(rows, columns=header, dtype=object)
+
+
+def excel_sheet_name(sheet: Optional[str]):
+    """sheet_name для pd.read_excel: номер с 1 -> индекс, имя как есть."""
+    if not sheet:
+        return 0
+    return int(sheet) - 1 if str(sheet).isdigit() else sheet
+
+
+def read_file_preview(
+    path: str,
+    filename: str,
+    nrows: int = HEADER_ROWS_PREVIEW,
+    sheet: Optional[str] = None,
+    dialect: Optional[Dict[str, str]] = None,
+) -> Tuple[pd.DataFrame, Optional[Dict[str, str]]]:
+    """
+    Читает только первые nrows строк файла для страницы маппинга колонок.
+    Возвращает (DataFrame, параметры чтения): диалект CSV, {"sheet": ...}
+    для XLSX с выбранным листом, иначе None. dialect — диалект CSV, если
+    он уже определён (например, при загрузке по частям).
+    """
+    ext = get_ext(filename)
+    if ext in CSV_EXTS:
+        dialect = dialect or sniff_csv_dialect(path)
+        return read_csv_with_dialect(path, dialect, nrows=nrows), dialect
+
+    if ext in XLSX_EXTS:
+        df = read_xlsx_to_df(path, nrows=nrows, sheet=sheet)
+        return df, ({"sheet": sheet} if sheet else None)
+
+    if ext in XLS_EXTS:
+        return (
+            pd.read_excel(path, nrows=nrows, sheet_name=excel_sheet_name(sheet)),
+            None,
+        )
+
+    if ext in JSON_EXTS or ext in NDJSON_EXTS:
+        with open(path, "rb") as f:
+            return pd.DataFrame(list(islice(iter_json_records(f), nrows))), None
+
+    raise ValueError("Неподдерживаемый формат файла")
+
+
 def safe_read_textlike_file_to_df(path: str, filename: str) -> pd.DataFrame:
     """
     Универсальное чтение CSV/XLSX/JSON в DataFrame.
-    - CSV: пробуем utf-8, затем cp1251; autodetect sep (',' ';' '\t')
-    - XLS/XLSX: через pandas.read_excel
-    - JSON: ожидается список объектов (list[dict]) или NDJSON (по строкам)
+    - CSV: кодировка и разделитель по сэмплу (sniff_csv_dialect), C-парсер;
+      если не вышло — перебор utf-8/cp1251 × (',' ';' '\t' '|')
+    - XLSX: потоково через openpyxl (iter_xlsx_batches); XLS — pandas.read_excel
+    - JSON: список объектов (list[dict]) или NDJSON, см. iter_json_records
     """
     ext = get_ext(filename)
     if ext in CSV_EXTS:
-        seps = [",", ";", "\t", "|"]
-        encodings = ["utf-8", "cp1251"]  # разные кодировки и разделители
-        last_err = None
-        for enc in encodings:
-            for sep in seps:
+        try:
+            return read_csv_with_dialect(path, sniff_csv_dialect(path))
+        except Exception as e:
+            last_err = e
+        for enc in CSV_ENCODINGS:
+            for sep in CSV_SEPARATORS:
                 try:
                     return pd.read_csv(
                         path, encoding=enc, sep=sep, engine="python", quotechar='"'
@@ -40,23 +335,15 @@ def safe_read_textlike_file_to_df(path: str, filename: str) -> pd.DataFrame:
                     last_err = e
         raise last_err or ValueError("Не удалось прочитать CSV")
 
+    if ext in XLSX_EXTS:
+        return read_xlsx_to_df(path)
+
     if ext in XLS_EXTS:
         return pd.read_excel(path)
 
-    if ext in JSON_EXTS:
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            return pd.DataFrame(data)
-        except json.JSONDecodeError:
-            records = []
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    records.append(json.loads(line))
-            return pd.DataFrame(records)
+    if ext in JSON_EXTS or ext in NDJSON_EXTS:
+        with open(path, "rb") as f:
+            return pd.DataFrame(list(iter_json_records(f)))
 
     raise ValueError("Неподдерживаемый формат файла")
 
@@ -111,3 +398,113 @@ def parse_date_or_none(x):
         return parser.parse(str(x)).date()
     except Exception:
         return None
+
+
+# --- Поколоночные (векторные) версии to_str_or_empty / to_int_or_none /
+# parse_date_or_none для импорта. Результат поэлементно совпадает с
+# применением хелперов к значениям series.tolist().
+
+# форматы, которые dateutil.parser.parse понимает однозначно (год первым);
+# форматы вида 10.11.2025 dateutil читает month-first с откатом на day-first,
+# поэтому они идут через memo по уникальным значениям, а не через strptime
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M",
+    "%Y/%m/%d",
+)
+DATE_FORMAT_SAMPLE = 200
+
+
+def _str_values(s: pd.Series) -> pd.Series:
+    """str(x) для каждого значения series.tolist()."""
+    if s.dtype == object or s.dtype in ("int64", "float64", "bool"):
+        return s.astype(str)
+    # float32 и прочие: tolist() даёт Python-объекты, их str отличается
+    return pd.Series([str(v) for v in s.tolist()], index=s.index, dtype=object)
+
+
+def _map_distinct(strs: pd.Series, fn) -> list:
+    """Применяет fn один раз к каждому уникальному значению."""
+    codes, uniques = pd.factorize(strs, use_na_sentinel=False)
+    results = np.empty(len(uniques), dtype=object)
+    results[:] = [fn(u) for u in uniques]
+    return results[codes].tolist()
+
+
+def series_to_str_or_empty(s: pd.Series) -> List[str]:
+    """Векторный to_str_or_empty: None -> "", NaN -> "nan", как у хелпера."""
+    strs = _str_values(s)
+    if s.dtype == object:
+        na = s.isna().to_numpy()
+        if na.any():
+            none_mask = np.zeros(len(s), dtype=bool)
+            none_mask[na] = [v is None for v in s.to_numpy()[na]]
+            strs = strs.mask(none_mask, "")
+    return strs.str.strip().tolist()
+
+
+def series_to_int_or_none(s: pd.Series) -> List[Optional[int]]:
+    """Векторный to_int_or_none: целые >= 0, остальное — None."""
+    kind = s.dtype.kind
+    if kind in "iu":
+        values = s.to_numpy()
+        out = np.empty(len(values), dtype=object)
+        out[:] = values.tolist()
+        out[values < 0] = None
+        return out.tolist()
+    if kind in "fb":
+        # str(30.0) == "30.0" и str(True) == "True": int() не парсит ни то, ни другое
+        return [None] * len(s)
+    return _map_distinct(_str_values(s), to_int_or_none)
+
+
+def _date_via_format(value: str, fmt: str):
+    try:
+        return datetime.strptime(value, fmt).date()
+    except ValueError:
+        return None
+
+
+def infer_date_format(values: List[str]) -> Optional[str]:
+    """
+    Подбирает формат из DATE_FORMATS, которому соответствует большая часть
+    сэмпла и с которым strptime даёт ту же дату, что и parse_date_or_none.
+    """
+    sample = [v for v in values if v not in ("", "nan", "NaT", "None")]
+    if not sample:
+        return None
+    for fmt in DATE_FORMATS:
+        matched = [(v, _date_via_format(v, fmt)) for v in sample]
+        matched = [(v, d) for v, d in matched if d is not None]
+        if len(matched) >= 0.9 * len(sample) and all(
+            d == parse_date_or_none(v) for v, d in matched
+        ):
+            return fmt
+    return None
+
+
+def series_to_date_or_none(s: pd.Series) -> list:
+    """
+    Векторный parse_date_or_none. Формат колонки определяется по сэмплу
+    (infer_date_format); значения, которые в него не укладываются, и
+    колонки без общего формата разбираются dateutil — один раз на каждое
+    уникальное значение.
+    """
+    strs = _str_values(s)
+    codes, uniques = pd.factorize(strs, use_na_sentinel=False)
+    uniques = list(uniques)
+    fmt = infer_date_format(uniques[:DATE_FORMAT_SAMPLE])
+
+    results = np.empty(len(uniques), dtype=object)
+    if fmt is not None:
+        parsed = pd.to_datetime(pd.Series(uniques), format=fmt, errors="coerce")
+        dates = parsed.dt.date.to_numpy(dtype=object)
+        ok = parsed.notna().to_numpy()
+        for i, value in enumerate(uniques):
+            results[i] = dates[i] if ok[i] else parse_date_or_none(value)
+    else:
+        results[:] = [parse_date_or_none(v) for v in uniques]
+    return results[codes].tolist()
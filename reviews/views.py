@@ -1,4 +1,6 @@
+import json
 import os
+import time
 import uuid
 from typing import Dict, List
 
@@ -6,20 +8,32 @@ import pandas as pd
 from django.conf import settings
 from django.contrib import messages
 from django.core.files.storage import FileSystemStorage
-from django.shortcuts import redirect, render
+from django.db.models.functions import Substr
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+
+from reviews import analytics
+from reviews.chunked_upload import (
+    TMP_DIR,
+    UploadError,
+    complete_upload,
+    create_upload,
+    upload_dialect,
+    upload_status,
+    write_part,
+)
+from reviews.import_jobs import enqueue_import, job_progress
+from reviews.microbatch import MicroBatcher
 
-from reviews.text_preprocess import preprocess_pipeline
-
-from .forms import UploadFileForm, make_column_mapping_form
-from .models import Review
+from .forms import ReviewFilterForm, UploadFileForm, make_column_mapping_form
+from .models import ChunkedUpload, ImportJob, Review
+from .pagination import keyset_page
 from .utils import (
     dataframe_head_columns,
-    parse_date_or_none,
-    safe_read_textlike_file_to_df,
+    read_file_preview,
     suggest_text_columns,
-    to_int_or_none,
-    to_str_or_empty,
 )
 
 
@@ -27,12 +41,65 @@ def home(request):
     return render(request, "home.html")
 
 
-def reviews_list(request):
-    qs = Review.objects.all()[:50]
-    return render(request, "reviews_list.html", {"reviews": qs})
+REVIEWS_PAGE_SIZE = 50
+# символов текста для колонки «Фрагмент»: +1, чтобы truncatechars поставил «…»
+SNIPPET_CHARS = 81
 
 
-TMP_DIR = os.path.join(settings.MEDIA_ROOT, "uploads", "tmp")
+def reviews_list(request):
+    """
+    Браузер отзывов: фильтры из GET и keyset-пагинация по (created_at, id).
+    Из БД читаются только показываемые колонки и начало текста (Substr),
+    поэтому длинные отзывы не тянутся целиком.
+    """
+    form = ReviewFilterForm(request.GET or None)
+    qs = (
+        Review.objects.select_related("region", "product_category")
+        .only(
+            "id",
+            "date",
+            "region__name",
+            "product_category__name",
+            "sentiment",
+            "created_at",
+        )
+        .annotate(snippet=Substr("review_text", 1, SNIPPET_CHARS))
+    )
+    if form.is_bound and form.is_valid():
+        qs = form.filter(qs)
+
+    page = keyset_page(
+        qs,
+        REVIEWS_PAGE_SIZE,
+        after=request.GET.get("after"),
+        before=request.GET.get("before"),
+    )
+
+    # ссылки на соседние страницы сохраняют фильтры
+    params = request.GET.copy()
+    for key in ("after", "before"):
+        params.pop(key, None)
+
+    def page_url(key, cursor):
+        if not cursor:
+            return None
+        query = params.copy()
+        query[key] = cursor
+        return f"?{query.urlencode()}"
+
+    return render(
+        request,
+        "reviews_list.html",
+        {
+            "form": form,
+            "reviews": page.items,
+            "next_url": page_url("after", page.next_cursor),
+            "prev_url": page_url("before", page.prev_cursor),
+        },
+    )
+
+
+UPLOAD_SESSION_KEYS = ("tmp_full_path", "original_name", "preview_cols", "csv_dialect")
 os.makedirs(TMP_DIR, exist_ok=True)
 
 
@@ -45,6 +112,36 @@ def _save_temp_file(fobj) -> str:
     return os.path.join(TMP_DIR, path)
 
 
+def _remember_upload(request, tmp_full_path, original_name, df, dialect) -> None:
+    """Кладёт в сессию всё, что нужно шагу 2 (маппинг и импорт)."""
+    request.session["tmp_full_path"] = tmp_full_path
+    request.session["original_name"] = original_name
+    request.session["preview_cols"] = dataframe_head_columns(df)
+    request.session["csv_dialect"] = dialect
+
+
+def _render_mapping(request):
+    cols = request.session.get("preview_cols") or []
+    choices = [(c, c) for c in cols]
+    ColumnMappingForm = make_column_mapping_form(choices)
+
+    initial = {}
+    text_candidates = suggest_text_columns(cols)
+    if text_candidates:
+        initial["review_text"] = text_candidates[0]
+
+    form_map = ColumnMappingForm(initial=initial)
+    return render(
+        request,
+        "reviews/column_mapping.html",
+        {
+            "form": form_map,
+            "columns": cols,
+            "original_name": request.session.get("original_name"),
+        },
+    )
+
+
 def upload_step1(request):
     """
     Шаг 1: загрузка файла, чтение первых строк и показ формы маппинга.
@@ -56,39 +153,117 @@ def upload_step1(request):
             original_name = form.cleaned_data["file"].name
 
             try:
-                df = safe_read_textlike_file_to_df(tmp_full_path, original_name)
+                # только заголовок и HEADER_ROWS_PREVIEW строк, а не весь файл
+                df, dialect = read_file_preview(
+                    tmp_full_path,
+                    original_name,
+                    sheet=form.cleaned_data["sheet"].strip() or None,
+                )
             except Exception as e:
                 messages.error(request, f"Ошибка чтения файла: {e}")
                 return render(request, "reviews/upload.html", {"form": form})
 
-            cols = dataframe_head_columns(df)
-            request.session["tmp_full_path"] = tmp_full_path
-            request.session["original_name"] = original_name
-            request.session["preview_cols"] = cols
-
-            choices = [(c, c) for c in cols]
-            ColumnMappingForm = make_column_mapping_form(choices)
-
-            initial = {}
-            text_candidates = suggest_text_columns(cols)
-            if text_candidates:
-                initial["review_text"] = text_candidates[0]
-
-            form_map = ColumnMappingForm(initial=initial)
-            return render(
-                request,
-                "reviews/column_mapping.html",
-                {
-                    "form": form_map,
-                    "columns": cols,
-                    "original_name": original_name,
-                },
-            )
+            _remember_upload(request, tmp_full_path, original_name, df, dialect)
+            return _render_mapping(request)
     else:
         form = UploadFileForm()
     return render(request, "reviews/upload.html", {"form": form})
 
 
+def upload_mapping(request):
+    """Форма маппинга для уже загруженного файла (после загрузки по частям)."""
+    tmp_full_path = request.session.get("tmp_full_path")
+    if not (tmp_full_path and os.path.exists(tmp_full_path)):
+        messages.error(request, "Не найден временный файл. Повторите загрузку.")
+        return redirect("upload_step1")
+    return _render_mapping(request)
+
+
+def _json_payload(request) -> dict:
+    try:
+        payload = json.loads(request.body or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        raise UploadError("Тело запроса должно быть JSON")
+    if not isinstance(payload, dict):
+        raise UploadError("Ожидается JSON-объект")
+    return payload
+
+
+def _upload_error(e: UploadError) -> JsonResponse:
+    return JsonResponse({"error": str(e), **e.extra}, status=e.status)
+
+
+def chunked_upload_create(request):
+    """
+    POST {"filename": ..., "size": ...} -> состояние новой загрузки.
+    Дальше клиент шлёт части (chunked_upload_part) по part_size байт.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Метод не поддерживается"}, status=405)
+    try:
+        payload = _json_payload(request)
+        filename = payload.get("filename")
+        size = payload.get("size")
+        if not isinstance(filename, str) or not isinstance(size, int):
+            raise UploadError("Передайте filename (строка) и size (число байт)")
+        upload = create_upload(os.path.basename(filename), size)
+    except UploadError as e:
+        return _upload_error(e)
+    return JsonResponse(upload_status(upload), status=201)
+
+
+def chunked_upload_detail(request, upload_id):
+    """GET -> сколько частей уже принято: с какой продолжать после обрыва."""
+    upload = get_object_or_404(ChunkedUpload, upload_id=upload_id)
+    return JsonResponse(upload_status(upload))
+
+
+def chunked_upload_part(request, upload_id, index):
+    """
+    PUT тела части index (сырые байты), обязательный заголовок
+    X-Content-SHA256 — её sha256 в hex. Тело читается потоком и сразу
+    пишется на диск.
+    """
+    if request.method != "PUT":
+        return JsonResponse({"error": "Метод не поддерживается"}, status=405)
+    upload = get_object_or_404(ChunkedUpload, upload_id=upload_id)
+    try:
+        upload = write_part(
+            upload, index, request, request.headers.get("X-Content-SHA256")
+        )
+    except UploadError as e:
+        return _upload_error(e)
+    return JsonResponse(upload_status(upload))
+
+
+def chunked_upload_complete(request, upload_id):
+    """
+    POST {"sheet": ...} — завершить загрузку: превью первых строк, переход
+    к маппингу колонок. Диалект CSV берётся из сохранённого начала файла.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Метод не поддерживается"}, status=405)
+    upload = get_object_or_404(ChunkedUpload, upload_id=upload_id)
+    try:
+        sheet = _json_payload(request).get("sheet") or None
+        upload = complete_upload(upload)
+        df, dialect = read_file_preview(
+            upload.file_path,
+            upload.original_name,
+            sheet=sheet,
+            dialect=upload_dialect(upload),
+        )
+    except UploadError as e:
+        return _upload_error(e)
+    except Exception as e:
+        return JsonResponse({"error": f"Ошибка чтения файла: {e}"}, status=400)
+
+    _remember_upload(request, upload.file_path, upload.original_name, df, dialect)
+    return JsonResponse(
+        {**upload_status(upload), "mapping_url": reverse("upload_mapping")}
+    )
+
+
 def upload_step2_import(request):
     """
     Шаг 2: импорт по маппингу колонок в БД.
@@ -96,6 +271,7 @@ def upload_step2_import(request):
     tmp_full_path = request.session.get("tmp_full_path")
     original_name = request.session.get("original_name")
     preview_cols = request.session.get("preview_cols") or []
+    dialect = request.session.get("csv_dialect")
 
     if not (tmp_full_path and original_name and os.path.exists(tmp_full_path)):
         messages.error(request, "Не найден временный файл. Повторите загрузку.")
@@ -107,80 +283,140 @@ def upload_step2_import(request):
     if request.method == "POST":
         form = ColumnMappingForm(request.POST)
         if form.is_valid():
-            mapping = form.cleaned_data
-            try:
-                df = safe_read_textlike_file_to_df(tmp_full_path, original_name)
-            except Exception as e:
-                messages.error(request, f"Ошибка чтения файла: {e}")
-                return redirect("upload_step1")
-
-            df.columns = [str(c).strip() for c in df.columns]
-
-            review_col = mapping.get("review_text")
-            if not review_col or review_col not in df.columns:
-                messages.error(request, "Не выбрана валидная колонка с текстом отзыва.")
-                return redirect("upload_step1")
-
-            to_create = []
-            skipped = 0
-
-            date_col = mapping.get("date") or None
-            region_col = mapping.get("region") or None
-            cat_col = mapping.get("product_category") or None
-            gender_col = mapping.get("gender") or None
-            age_col = mapping.get("age") or None
-            src_col = mapping.get("source") or None
-
-            for _, row in df.iterrows():
-                text_raw = row.get(review_col, "")
-                text = to_str_or_empty(text_raw)
-                if not text:
-                    skipped += 1
-                    continue
-
-                processed = preprocess_pipeline(text)
-                date_val = parse_date_or_none(row.get(date_col)) if date_col else None
-                region_val = to_str_or_empty(row.get(region_col)) if region_col else ""
-                cat_val = to_str_or_empty(row.get(cat_col)) if cat_col else ""
-                gender_val = to_str_or_empty(row.get(gender_col)) if gender_col else ""
-                age_val = to_int_or_none(row.get(age_col)) if age_col else None
-                source_val = to_str_or_empty(row.get(src_col)) if src_col else ""
-
-                to_create.append(
-                    Review(
-                        review_text=text,
-                        processed_text=processed,
-                        sentiment="",
-                        date=date_val,
-                        region=region_val,
-                        product_category=cat_val,
-                        gender=gender_val,
-                        age=age_val,
-                        source=source_val,
-                    )
-                )
-
-            created = 0
-            if to_create:
-                Review.objects.bulk_create(to_create, batch_size=1000)
-                created = len(to_create)
-
-            try:
-                os.remove(tmp_full_path)
-            except OSError:
-                pass
-
-            return render(
-                request,
-                "reviews/import_result.html",
-                {
-                    "original_name": original_name,
-                    "created": created,
-                    "skipped": skipped,
-                    "total": int(created) + int(skipped),
-                },
+            # импорт выполняет воркер (manage.py run_import_worker),
+            # запрос сразу возвращает страницу задачи с прогрессом
+            mapping = dict(form.cleaned_data)
+            score_sentiment = mapping.pop("score_sentiment", False)
+            job = enqueue_import(
+                tmp_full_path, original_name, mapping, dialect, score_sentiment
             )
+            for key in UPLOAD_SESSION_KEYS:
+                request.session.pop(key, None)
+            return redirect("import_job_detail", job_id=job.id)
 
     # если не POST — вернуть на шаг 1
     messages.error(request, "Неверный метод запроса. Повторите загрузку.")
     return redirect("upload_step1")
+
+
+def import_job_detail(request, job_id):
+    """Страница фонового импорта; прогресс подгружается из import_job_progress."""
+    job = get_object_or_404(ImportJob, id=job_id)
+    return render(
+        request,
+        "reviews/import_job.html",
+        {"job": job, "progress": job_progress(job)},
+    )
+
+
+def import_job_progress(request, job_id):
+    job = get_object_or_404(ImportJob, id=job_id)
+    return JsonResponse(job_progress(job))
+
+
+def _predict_batch(texts):
+    # импорт здесь: модель и numpy/scipy не нужны до первого запроса
+    from reviews.ml_inference import preprocess_and_predict_batch
+
+    return preprocess_and_predict_batch(texts)
+
+
+PREDICT_BATCHER = MicroBatcher(
+    _predict_batch,
+    max_batch=settings.SENTIMENT_BATCH_MAX_SIZE,
+    max_delay=settings.SENTIMENT_BATCH_MAX_DELAY_MS / 1000,
+)
+
+
+@csrf_exempt
+async def predict_api(request):
+    """
+    JSON API тональности.
+
+    POST {"text": "..."}      -> {"label": ..., "model_version": ...}
+    POST {"texts": ["...", ...]} -> {"predictions": [{...}, ...]}
+    GET                       -> статистика микробатчера
+
+    Одновременные запросы собираются в один батч (PREDICT_BATCHER), инференс
+    идёт в отдельном потоке и не блокирует event loop. Батчинг работает при
+    запуске через ASGI (reviews_project/asgi.py).
+    """
+    if request.method == "GET":
+        return JsonResponse({"batcher": PREDICT_BATCHER.stats()})
+    if request.method != "POST":
+        return JsonResponse({"error": "Метод не поддерживается"}, status=405)
+
+    try:
+        payload = json.loads(request.body)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({"error": "Тело запроса должно быть JSON"}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({"error": "Ожидается JSON-объект"}, status=400)
+
+    single = "text" in payload
+    texts = [payload["text"]] if single else payload.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return JsonResponse(
+            {"error": "Передайте строку text или список строк texts"}, status=400
+        )
+    if len(texts) > settings.SENTIMENT_API_MAX_TEXTS:
+        return JsonResponse(
+            {
+                "error": f"Не больше {settings.SENTIMENT_API_MAX_TEXTS} текстов за запрос"
+            },
+            status=400,
+        )
+
+    try:
+        predictions = await PREDICT_BATCHER.submit_many(texts)
+    except RuntimeError as e:
+        return JsonResponse({"error": str(e)}, status=503)
+
+    items = [{"label": p.label, "model_version": p.model_version} for p in predictions]
+    if single:
+        return JsonResponse(items[0])
+    return JsonResponse({"predictions": items})
+
+
+def _analytics_response(request, kind: str, compute) -> JsonResponse:
+    """Общая часть отчётов: фильтры из GET, кэш, заголовки X-Cache и Server-Timing."""
+    started = time.perf_counter()
+    try:
+        filters = analytics.parse_filters(request.GET)
+        data, hit = analytics.cached_report(kind, filters, lambda: compute(filters))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    response = JsonResponse(data)
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    response["Server-Timing"] = f"app;dur={1000 * (time.perf_counter() - started):.1f}"
+    return response
+
+
+def analytics_distribution(request):
+    """
+    GET -> распределение тональности: {"total": ..., "sentiment": {...}}.
+    Фильтры: date_from, date_to (ГГГГ-ММ-ДД), region, product_category,
+    gender, source (можно повторять: ?region=A&region=B).
+    """
+    return _analytics_response(
+        request, "distribution", analytics.sentiment_distribution
+    )
+
+
+def analytics_timeseries(request):
+    """GET -> ряд по тональностям; bucket=day|week|month, фильтры как выше."""
+    bucket = request.GET.get("bucket", "day")
+    if bucket not in analytics.BUCKETS:
+        return JsonResponse(
+            {"error": f"bucket: одно из {', '.join(analytics.BUCKETS)}"}, status=400
+        )
+    return _analytics_response(
+        request,
+        f"timeseries:{bucket}",
+        lambda filters: analytics.sentiment_timeseries(filters, bucket),
+    )
+
+
+def analytics_stats(request):
+    """GET -> доля попаданий в кэш отчётов и среднее время ответа (этот процесс)."""
+    return JsonResponse(analytics.cache_stats())
@@ -3,6 +3,15 @@ ASGI config for reviews_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The sentiment prediction API (/api/predict/) is an async view: concurrent
+requests are micro-batched on the event loop, which only happens when the
+project is served by an ASGI server, e.g.:
+
+    uvicorn reviews_project.asgi:application --workers 2
+
+Under WSGI every request runs in its own event loop and is scored alone.
+Load test: python scripts/bench_predict_api.py --url http://127.0.0.1:8000
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
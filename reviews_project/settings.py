@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -78,6 +79,8 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # несколько воркеров импорта пишут в SQLite одновременно
+        "OPTIONS": {"timeout": 20},
     }
 }
 
@@ -127,3 +130,79 @@ MEDIA_ROOT = BASE_DIR / "media"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Text preprocessing
+# pymorphy2 dictionaries and NLTK stopwords are loaded lazily on first use.
+# Set PRELOAD_TEXT_RESOURCES=1 for worker processes that should load them at startup.
+
+PRELOAD_TEXT_RESOURCES = os.environ.get("PRELOAD_TEXT_RESOURCES") == "1"
+
+
+# Review file import
+# Uploads are imported in chunks of REVIEWS_IMPORT_CHUNK_ROWS rows, each in its
+# own transaction, so memory use does not grow with the file size.
+
+REVIEWS_UPLOAD_MAX_MB = int(os.environ.get("REVIEWS_UPLOAD_MAX_MB", "500"))
+REVIEWS_IMPORT_CHUNK_ROWS = 5000
+
+# Resumable chunked upload (reviews/chunked_upload.py): the browser sends the
+# file in parts of REVIEWS_UPLOAD_PART_BYTES, each appended straight to disk.
+
+REVIEWS_CHUNKED_UPLOAD_MAX_MB = int(
+    os.environ.get("REVIEWS_CHUNKED_UPLOAD_MAX_MB", "4096")
+)
+REVIEWS_UPLOAD_PART_BYTES = 8 * 1024 * 1024
+
+
+# Sentiment model engine
+# "sklearn" loads the joblib pickles from ml/; "bundle" scores with the
+# memory-mapped numpy bundle from ml/bundle/ (scripts/export_model_bundle.py).
+
+SENTIMENT_ENGINE = os.environ.get("SENTIMENT_ENGINE", "sklearn")
+
+
+# Sentiment model registry
+# When ml/registry/ACTIVE exists, workers serve that version and re-read the
+# pointer at most this often; a new version is loaded in the background.
+
+SENTIMENT_MODEL_POLL_SECONDS = float(
+    os.environ.get("SENTIMENT_MODEL_POLL_SECONDS", "5")
+)
+
+
+# Sentiment prediction cache
+# In-process LRU tier size and an optional SQLite file shared between processes.
+
+SENTIMENT_PREDICTION_CACHE_SIZE = 100_000
+SENTIMENT_PREDICTION_CACHE_PATH = (
+    os.environ.get("SENTIMENT_PREDICTION_CACHE_PATH") or None
+)
+
+
+# Prediction API (/api/predict/)
+# Concurrent requests are flushed as one batch when it reaches MAX_SIZE texts
+# or MAX_DELAY_MS after its first text arrived.
+
+SENTIMENT_BATCH_MAX_SIZE = int(os.environ.get("SENTIMENT_BATCH_MAX_SIZE", "64"))
+SENTIMENT_BATCH_MAX_DELAY_MS = float(
+    os.environ.get("SENTIMENT_BATCH_MAX_DELAY_MS", "5")
+)
+SENTIMENT_API_MAX_TEXTS = 1000
+
+
+# Analytics API (/api/analytics/)
+# Responses are cached in a file-based cache shared by web and worker processes;
+# imports and scoring runs bump a data version that is part of every cache key.
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "analytics": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("ANALYTICS_CACHE_DIR")
+        or str(BASE_DIR / "cache" / "analytics"),
+        "TIMEOUT": 24 * 60 * 60,
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
+}
+ANALYTICS_CACHE_ALIAS = "analytics"
@@ -0,0 +1,184 @@
+"""
+Compares Review with free-text dimensions (schema 0009) and with integer
+FKs into dimension tables (0012).
+
+Builds a throwaway SQLite database, migrates it to 0009, inserts --rows
+synthetic reviews, measures table/index sizes (dbstat) and a GROUP BY over
+the dimensions, then migrates to the latest schema (running the 0011 data
+migration) and measures again. Both snapshots are taken after VACUUM.
+
+    python scripts/bench_dimension_sizes.py [--rows 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+REGIONS = [
+    "Москва",
+    "Санкт-Петербург",
+    "Новосибирск",
+    "Екатеринбург",
+    "Казань",
+    "Нижний Новгород",
+    "Ростов-на-Дону",
+    "Краснодар",
+    "",
+]
+CATEGORIES = ["Одежда", "Обувь", "Электроника", "Бытовая техника", "Книги", ""]
+GENDERS = ["female", "male", ""]
+SOURCES = ["site", "app", "marketplace", ""]
+SENTIMENTS = ["negative", "neutral", "positive", ""]
+WORDS = "товар пришёл быстро качество отличное размер подошёл цена доставка".split()
+
+GROUP_BY = {
+    "strings": "SELECT region, product_category, sentiment, COUNT(*) "
+    "FROM reviews_review GROUP BY 1, 2, 3",
+    "dimensions": "SELECT region_id, product_category_id, sentiment, COUNT(*) "
+    "FROM reviews_review GROUP BY 1, 2, 3",
+}
+
+
+def setup_django(db_path: str) -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reviews_project.settings")
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = db_path
+
+    import django
+
+    django.setup()
+
+
+def migrate(target: str) -> float:
+    from django.core.management import call_command
+
+    started = time.perf_counter()
+    call_command("migrate", "reviews", target, verbosity=0)
+    return time.perf_counter() - started
+
+
+def insert_reviews(rows: int) -> None:
+    from django.db import connection, transaction
+
+    rng = random.Random(0)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    sql = (
+        "INSERT INTO reviews_review (review_text, processed_text, "
+        "processed_version, sentiment, date, region, product_category, gender, "
+        "age, source, content_hash, created_at) "
+        "VALUES (%s, '', '', %s, %s, %s, %s, %s, %s, %s, '', %s)"
+    )
+    batch = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for i in range(rows):
+            created = start + timedelta(seconds=37 * i)
+            batch.append(
+                (
+                    " ".join(rng.choices(WORDS, k=rng.randint(5, 25))),
+                    rng.choice(SENTIMENTS),
+                    date(2025, 1, 1) + timedelta(days=i % 300),
+                    rng.choice(REGIONS),
+                    rng.choice(CATEGORIES),
+                    rng.choice(GENDERS),
+                    rng.randint(16, 70),
+                    rng.choice(SOURCES),
+                    created.isoformat(),
+                )
+            )
+            if len(batch) == 5000:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+def fill_string_rollup() -> None:
+    # at 0009 the rollup is keyed by strings; the current rollup code expects
+    # FKs, so the same GROUP BY is written in SQL here (0012 refills it)
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO reviews_sentimentrollup (day, region, product_category, "
+            "gender, age_bucket, source, sentiment, count) "
+            "SELECT date, region, product_category, gender, "
+            "CASE WHEN age IS NULL THEN '' WHEN age < 18 THEN '<18' "
+            "WHEN age < 25 THEN '18-24' WHEN age < 35 THEN '25-34' "
+            "WHEN age < 45 THEN '35-44' WHEN age < 55 THEN '45-54' "
+            "ELSE '55+' END, source, sentiment, COUNT(*) "
+            "FROM reviews_review GROUP BY 1, 2, 3, 4, 5, 6, 7"
+        )
+
+
+def measure(layout: str) -> dict:
+    """Sizes of review/rollup tables and indexes in bytes, GROUP BY time."""
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM")
+        cursor.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat "
+            "WHERE name IN (SELECT name FROM sqlite_master "
+            "WHERE tbl_name IN ('reviews_review', 'reviews_sentimentrollup')) "
+            "GROUP BY name"
+        )
+        sizes = dict(cursor.fetchall())
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            cursor.execute(GROUP_BY[layout])
+            cursor.fetchall()
+            timings.append(time.perf_counter() - started)
+    return {"sizes": sizes, "group_by_ms": 1000 * min(timings)}
+
+
+def report(before: dict, after: dict) -> None:
+    def mb(n) -> str:
+        return f"{n / 2**20:8.2f}" if n is not None else "       —"
+
+    names = sorted(set(before["sizes"]) | set(after["sizes"]))
+    print(f"{'object':45} {'strings MB':>10} {'dims MB':>10}")
+    for name in names:
+        print(
+            f"{name:45} {mb(before['sizes'].get(name)):>10} "
+            f"{mb(after['sizes'].get(name)):>10}"
+        )
+    print(
+        f"{'total':45} {mb(sum(before['sizes'].values())):>10} "
+        f"{mb(sum(after['sizes'].values())):>10}"
+    )
+    print(
+        f"GROUP BY region, category, sentiment: "
+        f"{before['group_by_ms']:.1f} ms -> {after['group_by_ms']:.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(os.path.join(tmp, "bench.sqlite3"))
+        migrate("0009")
+        insert_reviews(args.rows)
+        fill_string_rollup()
+        before = measure("strings")
+        seconds = migrate("0012")
+        after = measure("dimensions")
+
+    print(f"rows: {args.rows}, migration 0010-0012: {seconds:.1f} s")
+    report(before, after)
+
+
+if __name__ == "__main__":
+    main()
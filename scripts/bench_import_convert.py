@@ -0,0 +1,125 @@
+"""
+Benchmark: row-by-row helpers over iterrows() vs column-wise series_* converters.
+
+Generates a CSV with --rows rows (text, date, region, age, source), reads it
+in import-sized chunks and converts the mapped columns both ways. Checks that
+the results are identical and reports rows/s. The baseline is slow, so it
+runs on the first --baseline-rows rows only.
+
+    python scripts/bench_import_convert.py [--rows 1000000] [--baseline-rows 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from reviews.utils import (  # noqa: E402
+    parse_date_or_none,
+    read_csv_with_dialect,
+    series_to_date_or_none,
+    series_to_int_or_none,
+    series_to_str_or_empty,
+    sniff_csv_dialect,
+    to_int_or_none,
+    to_str_or_empty,
+)
+
+CHUNK_ROWS = 5000
+REGIONS = ["Москва", "Санкт-Петербург", "Казань", "Новосибирск", ""]
+SOURCES = ["site", "app", "marketplace"]
+
+
+def write_csv(path: str, rows: int) -> None:
+    rng = random.Random(0)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("text;date;region;age;source\n")
+        for i in range(rows):
+            if i % 3 == 0:
+                date = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            elif i % 3 == 1:
+                date = f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2024"
+            else:
+                date = ""
+            age = rng.choice([str(rng.randint(14, 90)), "", "н/д"])
+            f.write(
+                f"Отзыв {i} о товаре;{date};{rng.choice(REGIONS)};"
+                f"{age};{rng.choice(SOURCES)}\n"
+            )
+
+
+def convert_rows(df) -> list:
+    out = []
+    for _, row in df.iterrows():
+        out.append(
+            (
+                to_str_or_empty(row.get("text", "")),
+                parse_date_or_none(row.get("date")),
+                to_str_or_empty(row.get("region")),
+                to_int_or_none(row.get("age")),
+                to_str_or_empty(row.get("source")),
+            )
+        )
+    return out
+
+
+def convert_columns(df) -> list:
+    return list(
+        zip(
+            series_to_str_or_empty(df["text"]),
+            series_to_date_or_none(df["date"]),
+            series_to_str_or_empty(df["region"]),
+            series_to_int_or_none(df["age"]),
+            series_to_str_or_empty(df["source"]),
+        )
+    )
+
+
+def run(path: str, dialect: dict, convert, max_rows=None) -> tuple:
+    rows = 0
+    results = []
+    started = time.perf_counter()
+    for df in read_csv_with_dialect(path, dialect, chunksize=CHUNK_ROWS):
+        if max_rows is not None and rows >= max_rows:
+            break
+        results.extend(convert(df))
+        rows += len(df)
+    return rows, time.perf_counter() - started, results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--baseline-rows", type=int, default=100_000)
+    args = ap.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_csv(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"File: {args.rows} rows, {size_mb:.0f} MB")
+        dialect = sniff_csv_dialect(path)
+
+        old_rows, old_s, old = run(path, dialect, convert_rows, args.baseline_rows)
+        new_rows, new_s, new = run(path, dialect, convert_columns)
+
+        mismatches = sum(a != b for a, b in zip(old, new[: len(old)]))
+        print(f"Mismatches on the first {len(old)} rows: {mismatches}")
+        print(f"iterrows + helpers: {old_rows} rows, {old_rows / old_s:.0f} rows/s")
+        print(f"series_* columns:   {new_rows} rows, {new_rows / new_s:.0f} rows/s")
+        print(f"Speedup: x{(new_rows / new_s) / (old_rows / old_s):.1f}")
+        if mismatches:
+            sys.exit(1)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
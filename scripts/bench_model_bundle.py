@@ -0,0 +1,118 @@
+"""
+Compares the joblib/sklearn scorer with the numpy model bundle.
+
+Each engine is measured in a fresh interpreter: import time, artifact load
+time and peak RSS after loading. Then both engines score the same corpus of
+preprocessed texts and the predictions are compared.
+
+    python scripts/bench_model_bundle.py [--rows 20000]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+ML_DIR = BASE_DIR / "ml"
+DATASET_PATH = BASE_DIR / "data" / "women-clothing-accessories.3-class.balanced.csv"
+
+PROBES = {
+    "sklearn": """
+import time; t0 = time.perf_counter()
+import joblib, sklearn.linear_model, sklearn.feature_extraction.text
+t1 = time.perf_counter()
+ml = {ml!r}
+vectorizer = joblib.load(ml + "/sentiment_vectorizer.joblib")
+model = joblib.load(ml + "/sentiment_model.joblib")
+labels = joblib.load(ml + "/sentiment_labels.joblib")
+t2 = time.perf_counter()
+""",
+    "bundle": """
+import time; t0 = time.perf_counter()
+import numpy, scipy.sparse
+from reviews.ml_bundle import ModelBundle
+t1 = time.perf_counter()
+bundle = ModelBundle({ml!r} + "/bundle")
+t2 = time.perf_counter()
+""",
+}
+
+PROBE_TAIL = """
+import json, resource
+print(json.dumps({"import_s": t1 - t0, "load_s": t2 - t1,
+                  "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def probe(engine: str) -> dict:
+    code = PROBES[engine].format(ml=str(ML_DIR)) + PROBE_TAIL
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def load_corpus(rows: int) -> list[str]:
+    from reviews.text_preprocess import preprocess_many
+
+    if DATASET_PATH.exists():
+        import pandas as pd
+
+        df = pd.read_csv(DATASET_PATH, sep="\t", usecols=["review"])
+        texts = df["review"].fillna("").astype(str).head(rows).tolist()
+    else:
+        texts = [
+            "Очень понравилось платье, буду заказывать ещё",
+            "Ужасное качество, больше не куплю",
+            "Нормальный товар, ничего особенного",
+        ] * (rows // 3)
+    return [t for t in preprocess_many(texts) if t]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=20000)
+    args = ap.parse_args()
+
+    for engine in ("sklearn", "bundle"):
+        stats = probe(engine)
+        print(
+            f"{engine:8s} import {stats['import_s']:.3f} s, "
+            f"load {stats['load_s']:.3f} s, peak RSS {stats['maxrss_mb']:.0f} MB"
+        )
+
+    import joblib
+
+    from reviews.ml_bundle import ModelBundle
+
+    vectorizer = joblib.load(ML_DIR / "sentiment_vectorizer.joblib")
+    model = joblib.load(ML_DIR / "sentiment_model.joblib")
+    bundle = ModelBundle(ML_DIR / "bundle")
+
+    corpus = load_corpus(args.rows)
+
+    started = time.perf_counter()
+    expected = [str(p) for p in model.predict(vectorizer.transform(corpus))]
+    sklearn_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = bundle.predict(corpus)
+    bundle_s = time.perf_counter() - started
+
+    mismatches = sum(a != b for a, b in zip(expected, actual))
+    print(f"Corpus: {len(corpus)} texts, prediction mismatches: {mismatches}")
+    print(f"sklearn scoring: {len(corpus) / sklearn_s:.0f} texts/s")
+    print(f"bundle scoring:  {len(corpus) / bundle_s:.0f} texts/s")
+
+
+if __name__ == "__main__":
+    main()
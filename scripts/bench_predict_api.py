@@ -0,0 +1,219 @@
+"""
+Load test for the sentiment prediction API (/api/predict/).
+
+Sends --requests POST requests from --concurrency concurrent clients and
+reports throughput and p50/p90/p99 latency, plus the batcher statistics
+(mean batch size) from the server.
+
+Against a running ASGI server (keep-alive HTTP/1.1, no extra dependencies):
+
+    uvicorn reviews_project.asgi:application
+    python scripts/bench_predict_api.py --url http://127.0.0.1:8000
+
+Without --url the ASGI application is driven in-process through Django's
+AsyncClient, which measures the view and the micro-batcher without sockets.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+DATASET_PATH = BASE_DIR / "data" / "women-clothing-accessories.3-class.balanced.csv"
+API_PATH = "/api/predict/"
+
+SYNTHETIC_PHRASES = [
+    "Очень понравилось платье, буду заказывать ещё",
+    "Ужасное качество, больше не куплю",
+    "Нормальный товар, ничего особенного",
+    "Доставка быстрая, но упаковка была порвана",
+    "Ткань тонкая, после стирки села на размер",
+]
+
+
+def load_texts(rows: int) -> list[str]:
+    if DATASET_PATH.exists():
+        import pandas as pd
+
+        df = pd.read_csv(DATASET_PATH, sep="\t", usecols=["review"])
+        return df["review"].fillna("").astype(str).head(rows).tolist()
+    return SYNTHETIC_PHRASES
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams."""
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> tuple:
+        for attempt in (1, 2):
+            if self.writer is None:
+                await self._connect()
+            self.writer.write(
+                (
+                    f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n\r\n"
+                ).encode()
+                + body
+            )
+            try:
+                await self.writer.drain()
+                head = await self.reader.readuntil(b"\r\n\r\n")
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # the server closed an idle keep-alive connection
+                await self.close()
+                if attempt == 2:
+                    raise
+                continue
+            lines = head.decode("latin-1").split("\r\n")
+            status = int(lines[0].split()[1])
+            headers = dict(line.split(":", 1) for line in lines[1:] if ":" in line)
+            headers = {k.strip().lower(): v.strip() for k, v in headers.items()}
+            payload = await self.reader.readexactly(
+                int(headers.get("content-length", "0"))
+            )
+            if headers.get("connection", "").lower() == "close":
+                await self.close()
+            return status, payload
+        raise ConnectionError("unreachable")
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class InProcessClient:
+    def __init__(self):
+        from django.test import AsyncClient
+
+        self.client = AsyncClient()
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> tuple:
+        if method == "GET":
+            response = await self.client.get(path)
+        else:
+            response = await self.client.post(
+                path, body, content_type="application/json"
+            )
+        return response.status_code, response.content
+
+    async def close(self):
+        pass
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(args) -> None:
+    if args.url:
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+    else:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reviews_project.settings")
+        import django
+        from django.test.utils import setup_test_environment
+
+        django.setup()
+        setup_test_environment()
+        make_client = InProcessClient
+
+    texts = load_texts(args.rows)
+    rng = random.Random(0)
+    bodies = [
+        json.dumps(
+            {"texts": [rng.choice(texts) for _ in range(args.texts_per_request)]}
+        ).encode("utf-8")
+        for _ in range(args.requests)
+    ]
+
+    warmup = make_client()
+    status, payload = await warmup.request("POST", API_PATH, bodies[0])
+    if status != 200:
+        sys.exit(f"Warm-up request failed: HTTP {status} {payload[:200]!r}")
+    _, before = await warmup.request("GET", API_PATH)
+
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def client_loop():
+        nonlocal next_index, errors
+        client = make_client()
+        try:
+            while next_index < len(bodies):
+                body = bodies[next_index]
+                next_index += 1
+                started = time.perf_counter()
+                status, _ = await client.request("POST", API_PATH, body)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    _, after = await warmup.request("GET", API_PATH)
+    await warmup.close()
+    before = json.loads(before)["batcher"]
+    after = json.loads(after)["batcher"]
+    batches = after["batches"] - before["batches"]
+    items = after["items"] - before["items"]
+
+    latencies.sort()
+    n_texts = len(bodies) * args.texts_per_request
+    print(
+        f"Requests: {len(bodies)} x {args.texts_per_request} texts, "
+        f"concurrency {args.concurrency}, errors {errors}"
+    )
+    print(
+        f"Throughput: {len(bodies) / elapsed:.0f} req/s, "
+        f"{n_texts / elapsed:.0f} texts/s"
+    )
+    print(
+        "Latency: "
+        f"p50 {percentile(latencies, 0.50) * 1000:.1f} ms, "
+        f"p90 {percentile(latencies, 0.90) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+        f"max {latencies[-1] * 1000:.1f} ms"
+    )
+    if batches:
+        print(f"Server batches: {batches}, mean batch {items / batches:.1f} texts")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default=None, help="Server base URL (default: in-process)")
+    ap.add_argument("--requests", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--texts-per-request", type=int, default=1)
+    ap.add_argument("--rows", type=int, default=20000)
+    args = ap.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
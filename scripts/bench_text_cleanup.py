@@ -0,0 +1,91 @@
+"""
+Micro-benchmark: fused clean_tokens vs basic_cleanup -> tokenize -> filter_stopwords.
+
+Checks that both paths produce identical tokens on the corpus, then times them.
+Uses the training dataset when it exists, otherwise a synthetic corpus.
+
+    python scripts/bench_text_cleanup.py [--repeat 5] [--rows 20000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from reviews import text_preprocess  # noqa: E402
+
+DATASET_PATH = BASE_DIR / "data" / "women-clothing-accessories.3-class.balanced.csv"
+
+SYNTHETIC_PHRASES = [
+    "Очень понравилось платье, буду заказывать ещё!",
+    "Ужасное качество, больше не куплю. Подробнее: https://example.com/item?id=42",
+    "<p>Нормальный товар</p>, ничего особенного. Размер M подошёл.",
+    "Доставка быстрая, курьер вежливый, но упаковка была порвана :(",
+    "Ткань тонкая, после стирки села на размер. Продавцу 3/5.",
+]
+
+
+def load_corpus(rows: int) -> list[str]:
+    if DATASET_PATH.exists():
+        import pandas as pd
+
+        df = pd.read_csv(DATASET_PATH, sep="\t", usecols=["review"])
+        return df["review"].fillna("").astype(str).head(rows).tolist()
+
+    rng = random.Random(0)
+    corpus = []
+    for _ in range(rows):
+        k = rng.randint(1, 6)
+        corpus.append(" ".join(rng.choice(SYNTHETIC_PHRASES) for _ in range(k)))
+    return corpus
+
+
+def reference_tokens(text: str) -> list[str]:
+    s = text_preprocess.basic_cleanup(text)
+    return text_preprocess.filter_stopwords(text_preprocess.tokenize(s))
+
+
+def best_of(repeat: int, fn, corpus: list[str]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--rows", type=int, default=20000)
+    args = ap.parse_args()
+
+    corpus = load_corpus(args.rows)
+    text_preprocess.get_stopwords()
+
+    mismatches = [
+        t for t in corpus if text_preprocess.clean_tokens(t) != reference_tokens(t)
+    ]
+    print(f"Corpus: {len(corpus)} texts, mismatches: {len(mismatches)}")
+    if mismatches:
+        print(f"First mismatch: {mismatches[0]!r}")
+        sys.exit(1)
+
+    old = best_of(args.repeat, reference_tokens, corpus)
+    new = best_of(args.repeat, text_preprocess.clean_tokens, corpus)
+    print(
+        f"basic_cleanup+tokenize+filter: {old:.3f} s ({len(corpus) / old:.0f} texts/s)"
+    )
+    print(
+        f"clean_tokens:                  {new:.3f} s ({len(corpus) / new:.0f} texts/s)"
+    )
+    print(f"Speedup: x{old / new:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Compares pd.read_excel with the read-only openpyxl reader (iter_xlsx_batches).
+
+Generates an XLSX export with --rows rows (text, date, region, age, source)
+and reads it in a fresh interpreter per reader, so peak RSS is not shared:
+rows/s and peak RSS for the whole file, read in import-sized chunks.
+
+    python scripts/bench_xlsx_read.py [--rows 50000]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+CHUNK_ROWS = 5000
+REGIONS = ["Москва", "Санкт-Петербург", "Казань", "Новосибирск", None]
+SOURCES = ["site", "app", "marketplace"]
+
+PROBES = {
+    "read_excel": """
+import pandas as pd
+df = pd.read_excel(path)
+rows = sum(len(df.iloc[i : i + {chunk}]) for i in range(0, len(df), {chunk}))
+""",
+    "openpyxl read_only": """
+import pandas as pd
+from reviews.utils import iter_xlsx_batches
+rows = 0
+for header, batch in iter_xlsx_batches(path, {chunk}):
+    rows += len(pd.DataFrame(batch, columns=header, dtype=object))
+""",
+}
+
+PROBE_HEAD = """
+import time; t0 = time.perf_counter()
+path = {path!r}
+"""
+
+PROBE_TAIL = """
+import json, resource
+print(json.dumps({"rows": rows, "seconds": time.perf_counter() - t0,
+                  "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def write_xlsx(path: str, rows: int) -> None:
+    import openpyxl
+
+    rng = random.Random(0)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Отзывы")
+    ws.append(["text", "date", "region", "age", "source"])
+    start = datetime(2024, 1, 1)
+    for i in range(rows):
+        ws.append(
+            [
+                f"Отзыв {i}: товар пришёл вовремя, качество "
+                f"{rng.choice(['отличное', 'нормальное', 'так себе'])}",
+                start + timedelta(hours=rng.randint(0, 24 * 600)),
+                rng.choice(REGIONS),
+                rng.choice([rng.randint(14, 90), None]),
+                rng.choice(SOURCES),
+            ]
+        )
+    wb.save(path)
+
+
+def probe(reader: str, path: str) -> dict:
+    code = (
+        PROBE_HEAD.format(path=path)
+        + PROBES[reader].format(chunk=CHUNK_ROWS)
+        + PROBE_TAIL
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000)
+    args = ap.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_xlsx(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"File: {args.rows} rows, {size_mb:.1f} MB")
+        for reader in PROBES:
+            stats = probe(reader, path)
+            print(
+                f"{reader:18s} {stats['rows']} rows, "
+                f"{stats['rows'] / stats['seconds']:.0f} rows/s, "
+                f"peak RSS {stats['maxrss_mb']:.0f} MB"
+            )
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
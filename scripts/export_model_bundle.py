@@ -0,0 +1,39 @@
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from reviews.ml_bundle import export_bundle  # noqa: E402
+
+ML_DIR = BASE_DIR / "ml"
+VECTORIZER_PATH = ML_DIR / "sentiment_vectorizer.joblib"
+MODEL_PATH = ML_DIR / "sentiment_model.joblib"
+LABELS_PATH = ML_DIR / "sentiment_labels.joblib"
+BUNDLE_DIR = ML_DIR / "bundle"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Export joblib sentiment artifacts as a memory-mappable bundle."
+    )
+    ap.add_argument("--out", default=str(BUNDLE_DIR))
+    ap.add_argument(
+        "--version", default=None, help="Bundle version (default: UTC time)"
+    )
+    args = ap.parse_args()
+
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    model = joblib.load(MODEL_PATH)
+    labels = joblib.load(LABELS_PATH)
+
+    out_dir = export_bundle(vectorizer, model, labels, Path(args.out), args.version)
+    size = sum(p.stat().st_size for p in out_dir.iterdir())
+    print(f"Exported bundle: {out_dir} ({size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ from reviews.models import Review  # noqa: E402
 
 
 def main(limit: int | None = None):
-    qs = Review.objects.all().order_by("-created_at")
+    qs = Review.objects.select_related(*Review.DIMENSION_FIELDS).order_by("-created_at")
     if limit:
         qs = qs[:limit]
     rows = []
@@ -26,11 +26,11 @@ def main(limit: int | None = None):
             {
                 "id": r.id,
                 "date": r.date.isoformat() if r.date else "",
-                "region": r.region,
-                "product_category": r.product_category,
-                "gender": r.gender,
+                "region": r.dimension_name("region"),
+                "product_category": r.dimension_name("product_category"),
+                "gender": r.dimension_name("gender"),
                 "age": r.age if r.age is not None else "",
-                "source": r.source,
+                "source": r.dimension_name("source"),
                 "review_text": r.review_text,
                 "processed_text": r.processed_text,
                 "sentiment": r.sentiment,
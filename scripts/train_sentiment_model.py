@@ -14,7 +14,14 @@ sys.path.insert(0, str(BASE_DIR))
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reviews_project.settings")
 
-from reviews.text_preprocess import preprocess_pipeline  # noqa: E402
+from reviews.ml_bundle import export_bundle  # noqa: E402
+from reviews.model_registry import publish  # noqa: E402
+from reviews.text_preprocess import (  # noqa: E402
+    lemma_cache_stats,
+    load_lemma_cache,
+    preprocess_many,
+    save_lemma_cache,
+)
 
 
 DATASET_PATH = BASE_DIR / "data" / "women-clothing-accessories.3-class.balanced.csv"
@@ -22,6 +29,8 @@ ML_DIR = BASE_DIR / "ml"
 VECTORIZER_PATH = ML_DIR / "sentiment_vectorizer.joblib"
 MODEL_PATH = ML_DIR / "sentiment_model.joblib"
 LABELS_PATH = ML_DIR / "sentiment_labels.joblib"
+BUNDLE_DIR = ML_DIR / "bundle"
+REGISTRY_DIR = ML_DIR / "registry"
 
 REQUIRED_COLUMNS = {"review", "sentiment"}
 LABEL_FIXES = {"neautral": "neutral"}
@@ -59,7 +68,7 @@ def load_dataset(path: Path) -> pd.DataFrame:
 
 
 def preprocess_reviews(reviews: pd.Series) -> list[str]:
-    return [preprocess_pipeline(text) for text in reviews]
+    return preprocess_many(reviews)
 
 
 def main() -> None:
@@ -70,8 +79,15 @@ def main() -> None:
     print("Class distribution:")
     print(df["sentiment"].value_counts().reindex(ALLOWED_LABELS, fill_value=0))
 
+    print(f"Lemma cache: loaded {load_lemma_cache()} entries")
     print("Preprocessing reviews...")
     X = preprocess_reviews(df["review"])
+    save_lemma_cache()
+    stats = lemma_cache_stats()
+    print(
+        f"Lemma cache: {stats['size']} entries, "
+        f"hits {stats['hits']}, misses {stats['misses']} ({stats['hit_rate']:.1%})"
+    )
     y = df["sentiment"].tolist()
 
     X_train, X_test, y_train, y_test = train_test_split(
@@ -111,6 +127,12 @@ def main() -> None:
     print(f"- {MODEL_PATH}")
     print(f"- {LABELS_PATH}")
 
+    export_bundle(vectorizer, model, ALLOWED_LABELS, BUNDLE_DIR)
+    print(f"- {BUNDLE_DIR} (numpy bundle)")
+
+    version = publish(REGISTRY_DIR, ML_DIR, activate=True)
+    print(f"Published and activated model version {version} in {REGISTRY_DIR}")
+
     print("Quick test:")
     quick_processed = preprocess_reviews(pd.Series(QUICK_TEST_PHRASES))
     quick_vectors = vectorizer.transform(quick_processed)
@@ -0,0 +1,110 @@
+from datetime import date
+
+import pytest
+from django.urls import reverse
+
+from reviews import analytics
+from reviews.models import Region, Review, Source
+
+
+@pytest.fixture(autouse=True)
+def analytics_cache(settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        "analytics": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "analytics"),
+        },
+    }
+    analytics.reset_cache_stats()
+
+
+@pytest.fixture
+def reviews(django_capture_on_commit_callbacks):
+    rows = [
+        (date(2025, 10, 1), "Москва", "site", "positive"),
+        (date(2025, 10, 1), "Москва", "app", "negative"),
+        (date(2025, 10, 2), "Казань", "site", "positive"),
+        (date(2025, 11, 5), "Москва", "site", "neutral"),
+        (None, "Москва", "site", ""),
+    ]
+    with django_capture_on_commit_callbacks(execute=True):
+        for i, (day, region, source, sentiment) in enumerate(rows):
+            Review.objects.create(
+                review_text=f"отзыв {i}",
+                date=day,
+                region=Region.of(region),
+                source=Source.of(source),
+                sentiment=sentiment,
+            )
+
+
+def test_filters_are_normalized():
+    from django.http import QueryDict
+
+    a = analytics.parse_filters(
+        QueryDict(
+            "region=Казань&region=Москва&region=+Москва&gender=&date_to=2025-10-31"
+        )
+    )
+    b = analytics.parse_filters(
+        QueryDict("date_to=2025-10-31&region=Москва&region=Казань")
+    )
+    assert a == b == {"date_to": "2025-10-31", "region": ["Казань", "Москва"]}
+    assert analytics.cache_key("d", a, "1") == analytics.cache_key("d", b, "1")
+    with pytest.raises(ValueError, match="date_from"):
+        analytics.parse_filters(QueryDict("date_from=31.10.2025"))
+
+
+@pytest.mark.django_db
+def test_distribution_is_cached_until_data_changes(
+    client, reviews, django_capture_on_commit_callbacks
+):
+    url = reverse("analytics_distribution")
+    response = client.get(url, {"region": "Москва", "source": "site"})
+    assert response["X-Cache"] == "MISS"
+    data = response.json()
+    assert data["total"] == 3
+    assert data["sentiment"] == {
+        "negative": 0,
+        "neutral": 1,
+        "positive": 1,
+        "unknown": 1,
+    }
+
+    response = client.get(url, {"source": "site", "region": ["Москва", "Москва"]})
+    assert response["X-Cache"] == "HIT"
+    assert response.json() == data
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Review.objects.create(
+            review_text="новый", region=Region.of("Москва"), source=Source.of("site")
+        )
+    response = client.get(url, {"region": "Москва", "source": "site"})
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["total"] == 4
+
+    stats = client.get(reverse("analytics_stats")).json()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+    assert stats["mean_hit_ms"] is not None
+
+
+@pytest.mark.django_db
+def test_timeseries_buckets_and_date_range(client, reviews):
+    url = reverse("analytics_timeseries")
+    series = client.get(url, {"date_from": "2025-10-01"}).json()["series"]
+    assert [p["period"] for p in series] == ["2025-10-01", "2025-10-02", "2025-11-05"]
+    assert series[0]["positive"] == series[0]["negative"] == 1
+
+    monthly = client.get(url, {"bucket": "month", "date_to": "2025-10-31"}).json()
+    assert monthly["series"] == [
+        {
+            "period": "2025-10-01",
+            "negative": 1,
+            "neutral": 0,
+            "positive": 2,
+            "unknown": 0,
+        }
+    ]
+    assert client.get(url, {"bucket": "year"}).status_code == 400
+    assert client.get(url, {"date_from": "2025-13-01"}).status_code == 400
@@ -0,0 +1,159 @@
+import fcntl
+import hashlib
+import io
+import os
+
+import pytest
+from django.urls import reverse
+
+from reviews import chunked_upload
+from reviews.models import ChunkedUpload
+
+PART = 64
+
+
+@pytest.fixture(autouse=True)
+def small_parts(settings, tmp_path, monkeypatch):
+    settings.REVIEWS_UPLOAD_PART_BYTES = PART
+    monkeypatch.setattr(chunked_upload, "TMP_DIR", str(tmp_path))
+
+
+@pytest.fixture
+def payload():
+    rows = "".join(f"отзыв номер {i};{i}\n" for i in range(20))
+    return ("text;age\n" + rows).encode("cp1251")
+
+
+def _parts(data):
+    return [data[i : i + PART] for i in range(0, len(data), PART)]
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.django_db
+def test_parts_are_appended_in_order_and_resumed(payload):
+    upload = chunked_upload.create_upload("reviews.csv", len(payload))
+    parts = _parts(payload)
+    assert upload.parts_total == len(parts) > 2
+
+    upload = chunked_upload.write_part(upload, 0, io.BytesIO(parts[0]), _sha(parts[0]))
+    with pytest.raises(chunked_upload.UploadError) as e:
+        chunked_upload.write_part(upload, 2, io.BytesIO(parts[2]), _sha(parts[2]))
+    assert (e.value.status, e.value.extra) == (409, {"expected_part": 1})
+    with pytest.raises(chunked_upload.UploadError, match="X-Content-SHA256"):
+        chunked_upload.write_part(upload, 1, io.BytesIO(parts[1]))
+
+    # обрыв посреди части: принятое не меняется, хвост обрезается
+    with pytest.raises(chunked_upload.UploadError, match="Размер части 1"):
+        chunked_upload.write_part(upload, 1, io.BytesIO(parts[1][:10]), _sha(parts[1]))
+    with pytest.raises(chunked_upload.UploadError, match="sha256"):
+        chunked_upload.write_part(upload, 1, io.BytesIO(parts[1]), _sha(b"x"))
+    upload.refresh_from_db()
+    assert upload.received_bytes == PART
+    assert open(upload.file_path, "rb").read() == parts[0]
+
+    # повтор уже принятой части (потерянный ответ) ничего не пишет
+    chunked_upload.write_part(upload, 0, io.BytesIO(parts[0]), _sha(parts[0]))
+    for i, part in enumerate(parts[1:], start=1):
+        upload = chunked_upload.write_part(upload, i, io.BytesIO(part), _sha(part))
+
+    upload = chunked_upload.complete_upload(upload)
+    assert open(upload.file_path, "rb").read() == payload
+    joined = "".join(_sha(p) for p in parts).encode()
+    assert upload.file_hash == f"{_sha(joined)}-{len(parts)}"
+    assert chunked_upload.upload_dialect(upload) == {"encoding": "cp1251", "sep": ";"}
+
+
+@pytest.mark.django_db
+def test_stale_retry_of_a_part_does_not_touch_accepted_bytes(payload):
+    upload = chunked_upload.create_upload("reviews.csv", len(payload))
+    parts = _parts(payload)
+    upload = chunked_upload.write_part(upload, 0, io.BytesIO(parts[0]), _sha(parts[0]))
+    # запрос A с частью 1 ещё идёт, когда повтор B уже принят
+    stale = ChunkedUpload.objects.get(pk=upload.pk)
+    upload = chunked_upload.write_part(upload, 1, io.BytesIO(parts[1]), _sha(parts[1]))
+
+    # опоздавшая копия той же части — как повтор; другая — конфликт
+    assert (
+        chunked_upload.write_part(
+            stale, 1, io.BytesIO(parts[1]), _sha(parts[1])
+        ).parts_received
+        == 2
+    )
+    with pytest.raises(chunked_upload.UploadError) as e:
+        chunked_upload.write_part(stale, 1, io.BytesIO(parts[2]), _sha(parts[2]))
+    assert e.value.status == 409
+    assert open(upload.file_path, "rb").read() == payload[: 2 * PART]
+
+    for i, part in enumerate(parts[2:], start=2):
+        upload = chunked_upload.write_part(upload, i, io.BytesIO(part), _sha(part))
+    upload = chunked_upload.complete_upload(upload)
+    assert open(upload.file_path, "rb").read() == payload
+    assert os.listdir(os.path.dirname(upload.file_path)) == [
+        os.path.basename(upload.file_path)
+    ]
+
+
+@pytest.mark.django_db
+def test_part_is_rejected_while_another_request_writes(payload):
+    upload = chunked_upload.create_upload("reviews.csv", len(payload))
+    parts = _parts(payload)
+    with open(upload.file_path, "r+b") as busy:
+        fcntl.flock(busy, fcntl.LOCK_EX)
+        with pytest.raises(chunked_upload.UploadError, match="записывается") as e:
+            chunked_upload.write_part(upload, 0, io.BytesIO(parts[0]), _sha(parts[0]))
+    assert (e.value.status, e.value.extra) == (409, {"expected_part": 0})
+
+    upload = chunked_upload.write_part(upload, 0, io.BytesIO(parts[0]), _sha(parts[0]))
+    assert upload.received_bytes == PART
+
+
+@pytest.mark.django_db
+def test_upload_is_validated_on_create(settings):
+    settings.REVIEWS_CHUNKED_UPLOAD_MAX_MB = 1
+    with pytest.raises(chunked_upload.UploadError, match="Неподдерживаемый"):
+        chunked_upload.create_upload("reviews.exe", 10)
+    with pytest.raises(chunked_upload.UploadError, match="превышает"):
+        chunked_upload.create_upload("reviews.csv", 2 * 1024 * 1024)
+    upload = chunked_upload.create_upload("reviews.csv", 10)
+    with pytest.raises(chunked_upload.UploadError, match="Получено 0 из 10"):
+        chunked_upload.complete_upload(upload)
+
+
+@pytest.mark.django_db
+def test_chunked_upload_api_leads_to_mapping(client, payload):
+    response = client.post(
+        reverse("chunked_upload_create"),
+        {"filename": "reviews.csv", "size": len(payload)},
+        content_type="application/json",
+    )
+    assert response.status_code == 201
+    upload_id = response.json()["upload_id"]
+
+    for i, part in enumerate(_parts(payload)):
+        response = client.put(
+            reverse("chunked_upload_part", args=[upload_id, i]),
+            part,
+            content_type="application/octet-stream",
+            headers={"X-Content-SHA256": _sha(part)},
+        )
+        assert response.status_code == 200, response.json()
+
+    state = client.get(reverse("chunked_upload_detail", args=[upload_id])).json()
+    assert state["received_bytes"] == len(payload)
+
+    response = client.post(
+        reverse("chunked_upload_complete", args=[upload_id]),
+        {},
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    assert client.session["csv_dialect"] == {"encoding": "cp1251", "sep": ";"}
+    assert client.session["preview_cols"] == ["text", "age"]
+    assert ChunkedUpload.objects.get().is_complete
+
+    response = client.get(response.json()["mapping_url"])
+    assert response.status_code == 200
+    assert "text" in response.content.decode()
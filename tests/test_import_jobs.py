@@ -0,0 +1,145 @@
+import functools
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from reviews import import_jobs, importer
+from reviews.models import ImportJob, Review
+
+MAPPING = {"review_text": "text", "age": "age"}
+
+
+@pytest.fixture(autouse=True)
+def plain_preprocess(monkeypatch):
+    monkeypatch.setattr(importer, "pipeline_version", lambda: "test")
+    monkeypatch.setattr(
+        importer, "preprocess_many", lambda texts: [t.lower() for t in texts]
+    )
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        "text;age\n" + "".join(f"Отзыв {i};{i}\n" for i in range(12)) + '"  ";\n',
+        encoding="cp1251",
+    )
+    return path
+
+
+@pytest.mark.django_db
+def test_job_is_claimed_once_and_runs(csv_file):
+    job = import_jobs.enqueue_import(str(csv_file), "reviews.csv", MAPPING)
+    assert job.status == ImportJob.STATUS_QUEUED
+    assert job.bytes_total == csv_file.stat().st_size
+
+    claimed = import_jobs.claim_next_job("w1")
+    assert (claimed.id, claimed.status, claimed.worker) == (job.id, "running", "w1")
+    assert import_jobs.claim_next_job("w2") is None
+
+    job = import_jobs.run_job(claimed)
+    assert job.status == ImportJob.STATUS_DONE
+    assert (job.rows_read, job.created, job.skipped) == (13, 12, 1)
+    assert Review.objects.count() == 12
+    assert not csv_file.exists()
+
+    progress = import_jobs.job_progress(job)
+    assert progress["finished"] and progress["percent"] == 100.0
+    assert progress["eta_seconds"] is None
+
+
+@pytest.mark.django_db
+def test_failed_job_keeps_file_and_error(csv_file):
+    import_jobs.enqueue_import(str(csv_file), "reviews.csv", {"review_text": "nope"})
+    job = import_jobs.run_job(import_jobs.claim_next_job("w1"))
+    assert job.status == ImportJob.STATUS_FAILED
+    assert "колонка" in job.error
+    assert csv_file.exists()
+
+
+@pytest.mark.django_db
+def test_stale_running_jobs_are_failed(csv_file):
+    job = import_jobs.enqueue_import(str(csv_file), "reviews.csv", MAPPING)
+    import_jobs.claim_next_job("w1")
+    assert import_jobs.fail_stale_jobs(timedelta(minutes=5)) == 0
+    assert import_jobs.fail_stale_jobs(timedelta(seconds=-1)) == 1
+    job.refresh_from_db()
+    assert job.status == ImportJob.STATUS_FAILED
+
+
+@pytest.mark.django_db
+def test_finishing_worker_does_not_revive_job_failed_as_stale(
+    csv_file, monkeypatch, caplog
+):
+    import_jobs.enqueue_import(str(csv_file), "reviews.csv", MAPPING)
+    job = import_jobs.claim_next_job("w1")
+
+    def slow_import(*args, progress, **kwargs):
+        # воркер завис дольше таймаута, задачу уже пометили ошибкой
+        import_jobs.fail_stale_jobs(timedelta(seconds=-1))
+        stats = importer.ImportStats(rows_read=13, created=12)
+        progress(stats)
+        return stats
+
+    monkeypatch.setattr(import_jobs, "import_reviews_file", slow_import)
+    job = import_jobs.run_job(job)
+    assert (job.status, job.error) == (
+        ImportJob.STATUS_FAILED,
+        "Воркер перестал отвечать",
+    )
+    assert (job.rows_read, job.created) == (0, 0)
+    assert csv_file.exists()
+    assert "уже не принадлежит воркеру w1" in caplog.text
+
+
+@pytest.mark.django_db
+def test_import_stops_after_chunk_when_job_is_failed_as_stale(
+    csv_file, monkeypatch, caplog
+):
+    import_jobs.enqueue_import(str(csv_file), "reviews.csv", MAPPING)
+    job = import_jobs.claim_next_job("w1")
+    monkeypatch.setattr(
+        import_jobs,
+        "import_reviews_file",
+        functools.partial(importer.import_reviews_file, chunk_rows=5),
+    )
+    save_progress = import_jobs._save_progress
+
+    def stale_after_first_chunk(job, stats):
+        import_jobs.fail_stale_jobs(timedelta(seconds=-1))
+        save_progress(job, stats)
+
+    monkeypatch.setattr(import_jobs, "_save_progress", stale_after_first_chunk)
+    job = import_jobs.run_job(job)
+    assert job.status == ImportJob.STATUS_FAILED
+    assert Review.objects.count() == 5
+    assert csv_file.exists()
+    assert "импорт остановлен" in caplog.text
+
+
+@pytest.mark.django_db
+def test_upload_mapping_enqueues_job_and_worker_runs_it(client, csv_file):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    response = client.post(
+        reverse("upload_step1"),
+        {"file": SimpleUploadedFile("reviews.csv", csv_file.read_bytes())},
+    )
+    assert response.status_code == 200
+    assert client.session["csv_dialect"] == {"encoding": "cp1251", "sep": ";"}
+
+    response = client.post(reverse("upload_step2_import"), {"review_text": "text"})
+    job = ImportJob.objects.get()
+    assert "score_sentiment" not in job.mapping and not job.score_sentiment
+    assert response.status_code == 302
+    assert response.url == reverse("import_job_detail", args=[job.id])
+    assert Review.objects.count() == 0
+
+    call_command("run_import_worker", "--once", stdout=open("/dev/null", "w"))
+
+    progress = client.get(reverse("import_job_progress", args=[job.id])).json()
+    assert progress["status"] == "done"
+    assert progress["created"] == 12
+    assert client.get(response.url).status_code == 200
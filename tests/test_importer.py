@@ -0,0 +1,273 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from reviews import importer, ml_inference
+from reviews.models import Review
+
+MAPPING = {
+    "review_text": "text",
+    "date": "date",
+    "region": "",
+    "product_category": "",
+    "gender": "",
+    "age": "age",
+    "source": "",
+}
+
+
+@pytest.fixture(autouse=True)
+def plain_preprocess(monkeypatch):
+    # предобработка проверяется в test_text_preprocess; здесь важен только поток
+    monkeypatch.setattr(importer, "pipeline_version", lambda: "test")
+    monkeypatch.setattr(
+        importer, "preprocess_many", lambda texts: [t.lower() for t in texts]
+    )
+
+
+@pytest.mark.django_db
+def test_csv_is_imported_chunk_by_chunk(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        "text,date,age\n"
+        "Отличное платье,2025-10-27,30\n"
+        '"  ",2025-10-27,25\n'
+        "Ужасное качество,27.10.2025,abc\n"
+        "Нормально,,41\n"
+        "Пришло быстро,,\n",
+        encoding="utf-8",
+    )
+    seen = []
+    stats = importer.import_reviews_file(
+        str(path),
+        "reviews.csv",
+        MAPPING,
+        chunk_rows=2,
+        progress=lambda s: seen.append((s.rows_read, s.created, s.skipped)),
+    )
+
+    assert seen == [(2, 1, 1), (4, 3, 1), (5, 4, 1)]
+    assert (stats.rows_read, stats.created, stats.skipped) == (5, 4, 1)
+    assert Review.objects.count() == 4
+    review = Review.objects.get(review_text="Отличное платье")
+    assert review.processed_text == "отличное платье"
+    assert review.processed_version == "test"
+    assert review.age == 30
+    assert str(review.date) == "2025-10-27"
+
+
+@pytest.mark.django_db
+def test_ndjson_is_streamed(tmp_path):
+    path = tmp_path / "reviews.ndjson"
+    rows = [{"text": f"отзыв {i}", "age": i} for i in range(7)]
+    path.write_text(
+        "\n".join(json.dumps(r, ensure_ascii=False) for r in rows), encoding="utf-8"
+    )
+
+    chunks = list(importer.iter_file_chunks(str(path), "reviews.ndjson", 3))
+    assert [len(c) for c in chunks] == [3, 3, 1]
+
+    stats = importer.import_reviews_file(str(path), "reviews.ndjson", MAPPING, 3)
+    assert (stats.created, stats.chunks) == (7, 3)
+
+
+@pytest.mark.django_db
+def test_json_array_is_streamed(tmp_path, monkeypatch):
+    monkeypatch.setattr("reviews.utils.JSON_READ_BYTES", 64)
+    path = tmp_path / "reviews.json"
+    rows = [{"text": f"отзыв {i}", "age": i} for i in range(7)]
+    path.write_text(json.dumps(rows, ensure_ascii=False), encoding="utf-8")
+
+    reader = importer.FileChunkReader(str(path), "reviews.json", 3)
+    offsets = []
+    for chunk in reader:
+        offsets.append(reader.tell())
+    # файл читается по мере разбора, а не целиком перед первым чанком
+    assert offsets[0] < reader.size
+    assert reader.tell() == reader.size
+
+    stats = importer.import_reviews_file(str(path), "reviews.json", MAPPING, 3)
+    assert (stats.created, stats.chunks) == (7, 3)
+
+
+@pytest.mark.django_db
+def test_xlsx_sheet_is_streamed(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    path = tmp_path / "reviews.xlsx"
+    wb = openpyxl.Workbook()
+    wb.active.append(["other"])
+    ws = wb.create_sheet("data")
+    ws.append(["text", "date", "age"])
+    for i in range(7):
+        ws.append([f"отзыв {i}", datetime(2025, 10, 27, 14, 33), i or None])
+    wb.save(path)
+
+    stats = importer.import_reviews_file(
+        str(path), "reviews.xlsx", MAPPING, 3, dialect={"sheet": "data"}
+    )
+    assert (stats.created, stats.chunks) == (7, 3)
+    review = Review.objects.get(review_text="отзыв 5")
+    assert (str(review.date), review.age) == ("2025-10-27", 5)
+    assert Review.objects.get(review_text="отзыв 0").age is None
+
+
+@pytest.mark.django_db
+def test_unknown_review_column_raises(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text("comment,age\nok,1\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="колонка с текстом"):
+        importer.import_reviews_file(str(path), "reviews.csv", MAPPING)
+    assert Review.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_reimport_skips_duplicates(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        "text,date,age\n"
+        "Отличное платье,2025-10-27,30\n"
+        "Отличное   ПЛАТЬЕ ,2025-10-27,30\n"
+        "Отличное платье,2025-10-28,30\n"
+        "Ужасное качество,,\n",
+        encoding="utf-8",
+    )
+    stats = importer.import_reviews_file(str(path), "reviews.csv", MAPPING)
+    assert (stats.created, stats.duplicates) == (3, 1)
+
+    stats = importer.import_reviews_file(str(path), "reviews.csv", MAPPING, 2)
+    assert (stats.created, stats.duplicates) == (0, 4)
+    assert Review.objects.count() == 3
+    assert Review.objects.filter(content_hash="").count() == 0
+
+
+@pytest.mark.django_db
+def test_rows_lost_to_parallel_import_count_as_duplicates(tmp_path, monkeypatch):
+    path = tmp_path / "reviews.csv"
+    path.write_text("text,age\nраз,1\nдва,2\n", encoding="utf-8")
+    importer.import_reviews_file(str(path), "reviews.csv", MAPPING)
+
+    # проверка хэшей «не видит» строки, вставленные параллельным импортом
+    path.write_text("text,age\nраз,1\nдва,2\nтри,3\n", encoding="utf-8")
+    real_lookup = importer.existing_content_hashes
+    calls = []
+
+    def racy_lookup(hashes):
+        calls.append(hashes)
+        return set() if len(calls) == 1 else real_lookup(hashes)
+
+    monkeypatch.setattr(importer, "existing_content_hashes", racy_lookup)
+    stats = importer.import_reviews_file(str(path), "reviews.csv", MAPPING)
+    assert (stats.created, stats.duplicates) == (1, 2)
+    assert Review.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_dimensions_are_resolved_once_per_import(tmp_path):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from reviews.models import Region, Source
+
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        "text,region,source\n"
+        + "".join(
+            f"отзыв {i},{'Москва' if i % 2 else 'Казань'},{'site' if i < 6 else 'app'}\n"
+            for i in range(10)
+        ),
+        encoding="utf-8",
+    )
+    Region.of("Казань")
+    mapping = {**MAPPING, "region": "region", "source": "source"}
+    with CaptureQueriesContext(connection) as queries:
+        importer.import_reviews_file(str(path), "reviews.csv", mapping, 3)
+
+    assert sorted(Region.objects.values_list("name", flat=True)) == [
+        "Казань",
+        "Москва",
+    ]
+    assert list(Source.objects.values_list("name", flat=True)) == ["app", "site"]
+    # справочники читаются только в первом чанке, новое имя создаётся один раз
+    region_sql = [q["sql"] for q in queries if '"reviews_region"' in q["sql"]]
+    assert len(region_sql) == 3
+    assert sum(sql.startswith("INSERT") for sql in region_sql) == 1
+
+    review = Review.objects.get(review_text="отзыв 7")
+    assert (review.region.name, review.dimension_name("gender")) == ("Москва", "")
+    assert review.content_hash == review.compute_content_hash()
+
+
+def _write_scoring_csv(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        "text,date,age\n"
+        "Отличное платье,2025-10-27,30\n"
+        "Ужасное качество,,\n"
+        "Нормально,,41\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+@pytest.mark.django_db
+def test_score_sentiment_labels_rows_before_insert(tmp_path, monkeypatch):
+    from reviews.ml_inference import Prediction
+
+    batches = []
+
+    def fake_predict(texts):
+        batches.append(list(texts))
+        return [
+            Prediction(t.lower(), "negative" if "Ужас" in t else "positive", "v1")
+            for t in texts
+        ]
+
+    monkeypatch.setattr(ml_inference, "preprocess_and_predict_batch", fake_predict)
+    path = _write_scoring_csv(tmp_path)
+    stats = importer.import_reviews_file(
+        str(path), "reviews.csv", MAPPING, chunk_rows=2, score_sentiment=True
+    )
+
+    # один вызов модели на чанк
+    assert [len(b) for b in batches] == [2, 1]
+    assert (stats.created, stats.scored, stats.scoring_error) == (3, 3, "")
+    review = Review.objects.get(review_text="Ужасное качество")
+    assert (review.sentiment, review.processed_text) == ("negative", "ужасное качество")
+    assert review.processed_version == "test"
+
+
+@pytest.mark.django_db
+def test_score_sentiment_falls_back_when_model_missing(tmp_path, monkeypatch):
+    calls = []
+
+    def missing_model(texts):
+        calls.append(texts)
+        raise RuntimeError("Sentiment model artifacts are missing")
+
+    monkeypatch.setattr(ml_inference, "preprocess_and_predict_batch", missing_model)
+    path = _write_scoring_csv(tmp_path)
+    stats = importer.import_reviews_file(
+        str(path), "reviews.csv", MAPPING, chunk_rows=2, score_sentiment=True
+    )
+
+    assert len(calls) == 1
+    assert (stats.created, stats.scored) == (3, 0)
+    assert "missing" in stats.scoring_error
+    assert set(Review.objects.values_list("sentiment", flat=True)) == {""}
+    assert Review.objects.get(review_text="Нормально").processed_text == "нормально"
+
+
+@pytest.mark.django_db
+def test_backfill_content_hash(capsys):
+    from django.core.management import call_command
+
+    for text in ["раз", "два", "раз", " РАЗ "]:
+        Review.objects.create(review_text=text)
+    call_command("backfill_content_hash", "--batch", "2")
+    assert Review.objects.exclude(content_hash="").count() == 2
+    assert Review.objects.filter(content_hash="").count() == 2
+
+    call_command("backfill_content_hash", "--delete-duplicates")
+    assert Review.objects.count() == 2
+    assert "Удалено дублей: 2" in capsys.readouterr().out
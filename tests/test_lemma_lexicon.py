@@ -0,0 +1,65 @@
+import pytest
+
+from reviews.lemma_lexicon import LemmaLexicon, build_lexicon
+
+
+def test_lexicon_roundtrip(tmp_path):
+    path = tmp_path / "lexicon.bin"
+    mapping = {"платья": "платье", "платью": "платье", "ёлки": "ёлка", "я": "я"}
+    build_lexicon(path, mapping, meta={"v": 1})
+
+    lexicon = LemmaLexicon(path)
+    try:
+        assert len(lexicon) == 4
+        assert lexicon.meta["v"] == 1
+        for token, lemma in mapping.items():
+            assert lexicon.get(token) == lemma
+        assert lexicon.get("отзыв") is None
+        assert lexicon.get("") is None
+        assert lexicon.stats()["hits"] == 4
+        assert lexicon.stats()["misses"] == 2
+    finally:
+        lexicon.close()
+
+
+def test_empty_lexicon(tmp_path):
+    path = tmp_path / "lexicon.bin"
+    build_lexicon(path, {})
+    lexicon = LemmaLexicon(path)
+    try:
+        assert len(lexicon) == 0
+        assert lexicon.get("платья") is None
+    finally:
+        lexicon.close()
+
+
+def test_lexicon_rejects_foreign_file(tmp_path):
+    path = tmp_path / "lexicon.bin"
+    path.write_bytes(b"not a lexicon at all")
+    with pytest.raises(ValueError):
+        LemmaLexicon(path)
+
+
+def _truncated_lexicon(path):
+    build_lexicon(path, {"платья": "платье", "ёлки": "ёлка"}, meta={"v": 1})
+    path.write_bytes(path.read_bytes()[:-5])
+
+
+@pytest.mark.parametrize("make", ["empty", "garbage", "truncated"])
+def test_broken_lexicon_falls_back_to_pymorphy(tmp_path, monkeypatch, make):
+    from reviews import text_preprocess
+
+    path = tmp_path / "lexicon.bin"
+    if make == "truncated":
+        _truncated_lexicon(path)
+        with pytest.raises(ValueError, match="Truncated"):
+            LemmaLexicon(path)
+    else:
+        path.write_bytes(b"" if make == "empty" else b"LEMX" + b"\xff" * 64)
+
+    monkeypatch.setattr(text_preprocess, "LEMMA_LEXICON_PATH", path)
+    monkeypatch.setattr(text_preprocess, "_LEXICON", None)
+    monkeypatch.setattr(text_preprocess, "_LEXICON_CHECKED", False)
+    text_preprocess._LEMMA_CACHE.clear()
+    assert text_preprocess.get_lemma_lexicon() is None
+    assert text_preprocess.lemmatize_ru(["платья"]) == ["платье"]
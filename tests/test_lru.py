@@ -0,0 +1,43 @@
+from reviews.lru import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+
+
+def test_lru_cache_counts_misses():
+    cache = LRUCache(maxsize=2)
+    assert cache.get("missing") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_cache_roundtrip_json(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = LRUCache(maxsize=10)
+    cache.put("платья", "платье")
+    cache.put("отзывы", "отзыв")
+    assert cache.save_json(path, meta={"v": 1}) == 2
+
+    warm = LRUCache(maxsize=10)
+    assert warm.load_json(path, meta={"v": 1}) == 2
+    assert warm.get("платья") == "платье"
+
+
+def test_lru_cache_ignores_json_with_other_meta(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = LRUCache(maxsize=10)
+    cache.put("a", "b")
+    cache.save_json(path, meta={"v": 1})
+
+    warm = LRUCache(maxsize=10)
+    assert warm.load_json(path, meta={"v": 2}) == 0
+    assert len(warm) == 0
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import pytest
+
+from reviews.microbatch import MicroBatcher
+
+
+def test_concurrent_submits_are_flushed_as_one_batch():
+    calls = []
+
+    def infer(items):
+        calls.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(infer, max_batch=100, max_delay=0.05)
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    assert asyncio.run(main()) == [i * 2 for i in range(10)]
+    assert calls == [list(range(10))]
+    assert batcher.stats()["mean_batch"] == 10
+
+
+def test_batches_are_capped_by_max_batch():
+    calls = []
+
+    def infer(items):
+        calls.append(len(items))
+        return items
+
+    batcher = MicroBatcher(infer, max_batch=4, max_delay=0.05)
+
+    async def main():
+        return await batcher.submit_many(list(range(10)))
+
+    assert asyncio.run(main()) == list(range(10))
+    assert max(calls) <= 4
+    assert sum(calls) == 10
+
+
+def test_batch_error_is_raised_in_every_request():
+    def infer(items):
+        raise RuntimeError("model is missing")
+
+    batcher = MicroBatcher(infer, max_batch=8, max_delay=0.01)
+
+    async def main():
+        return await asyncio.gather(
+            batcher.submit("a"), batcher.submit("b"), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert [str(r) for r in results] == ["model is missing"] * 2
+
+    # the worker survives a failed batch
+    batcher.infer = lambda items: [i.upper() for i in items]
+    assert asyncio.run(batcher.submit("c")) == "C"
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    from reviews import views
+    from reviews.ml_inference import Prediction
+
+    def infer(texts):
+        return [Prediction(t, "positive" if t else "", "v-test") for t in texts]
+
+    batcher = MicroBatcher(infer, max_batch=64, max_delay=0.02)
+    monkeypatch.setattr(views, "PREDICT_BATCHER", batcher)
+    return batcher
+
+
+def test_predict_api_batches_concurrent_requests(fake_model):
+    from django.test import AsyncClient
+
+    async def main():
+        client = AsyncClient()
+        return await asyncio.gather(
+            *(
+                client.post(
+                    "/api/predict/",
+                    json.dumps({"text": f"отзыв {i}"}),
+                    content_type="application/json",
+                )
+                for i in range(8)
+            )
+        )
+
+    responses = asyncio.run(main())
+    assert [r.status_code for r in responses] == [200] * 8
+    assert responses[0].json() == {"label": "positive", "model_version": "v-test"}
+    assert fake_model.stats()["items"] == 8
+    assert fake_model.stats()["batches"] < 8
+
+
+def test_predict_api_validates_payload(client, fake_model):
+    response = client.post(
+        "/api/predict/",
+        json.dumps({"texts": ["ok", 1]}),
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    response = client.post("/api/predict/", "not json", content_type="application/json")
+    assert response.status_code == 400
+
+    response = client.post(
+        "/api/predict/",
+        json.dumps({"texts": ["", "ok"]}),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+    assert [p["label"] for p in response.json()["predictions"]] == ["", "positive"]
@@ -0,0 +1,71 @@
+import pytest
+
+from reviews.ml_bundle import ModelBundle, export_bundle
+
+TRAIN_TEXTS = [
+    "отличный платье качество",
+    "ужасный качество порваться",
+    "нормальный товар обычный",
+    "отличный сумка рекомендовать",
+    "плохой материал ужасный",
+    "обычный вещь нормальный",
+] * 3
+TRAIN_LABELS = ["positive", "negative", "neutral"] * 6
+CHECK_TEXTS = [
+    "отличный платье",
+    "ужасный ужасный качество",
+    "нормальный товар отличный",
+    "совсем незнакомый слово",
+    "",
+]
+
+
+@pytest.mark.parametrize(
+    "vectorizer_kwargs",
+    [
+        {"ngram_range": (1, 2)},
+        {"ngram_range": (1, 1), "sublinear_tf": True},
+        {"ngram_range": (2, 2), "norm": "l1"},
+    ],
+)
+def test_bundle_matches_sklearn(tmp_path, vectorizer_kwargs):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer = TfidfVectorizer(**vectorizer_kwargs)
+    X = vectorizer.fit_transform(TRAIN_TEXTS)
+    model = LogisticRegression().fit(X, TRAIN_LABELS)
+
+    export_bundle(
+        vectorizer, model, ["negative", "neutral", "positive"], tmp_path / "b"
+    )
+    bundle = ModelBundle(tmp_path / "b")
+
+    expected = vectorizer.transform(CHECK_TEXTS).toarray()
+    assert bundle.transform(CHECK_TEXTS).toarray() == pytest.approx(
+        expected[:, _column_order(vectorizer, bundle)], abs=1e-6
+    )
+    assert bundle.predict(CHECK_TEXTS) == [
+        str(p) for p in model.predict(vectorizer.transform(CHECK_TEXTS))
+    ]
+
+
+def _column_order(vectorizer, bundle):
+    from reviews.ml_bundle import term_hash
+
+    by_hash = {term_hash(t): i for t, i in vectorizer.vocabulary_.items()}
+    return [by_hash[int(h)] for h in bundle.vocab_hash]
+
+
+def test_bundle_binary_classifier(tmp_path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    texts = ["отличный платье", "ужасный качество"] * 4
+    labels = ["positive", "negative"] * 4
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression().fit(vectorizer.fit_transform(texts), labels)
+
+    export_bundle(vectorizer, model, ["negative", "positive"], tmp_path / "b")
+    bundle = ModelBundle(tmp_path / "b")
+    assert bundle.predict(["отличный", "ужасный"]) == ["positive", "negative"]
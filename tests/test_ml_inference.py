@@ -30,6 +30,183 @@ def test_predict_sentiment_raises_runtime_error_when_files_missing(monkeypatch):
         "LABELS_PATH",
         missing_dir / "missing_labels.joblib",
     )
+    monkeypatch.setattr(ml_inference, "REGISTRY_DIR", missing_dir / "registry")
+    monkeypatch.setattr(ml_inference, "_SERVED", None)
+    monkeypatch.setattr(ml_inference, "_NEXT_POLL", 0.0)
 
     with pytest.raises(RuntimeError, match="Sentiment model artifacts are missing"):
         ml_inference.predict_sentiment("some text")
+
+
+def _stopwords_available() -> bool:
+    from nltk.corpus import stopwords
+
+    try:
+        stopwords.words("russian")
+    except LookupError:
+        return False
+    return True
+
+
+requires_stopwords = pytest.mark.skipif(
+    not _stopwords_available(), reason="NLTK stopwords corpus is not installed"
+)
+
+
+@pytest.fixture
+def tiny_model(tmp_path, monkeypatch):
+    joblib = pytest.importorskip("joblib")
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    texts = ["отличный платье", "ужасный качество", "нормальный товар"] * 5
+    labels = ["positive", "negative", "neutral"] * 5
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression().fit(vectorizer.fit_transform(texts), labels)
+
+    paths = {
+        "VECTORIZER_PATH": tmp_path / "vectorizer.joblib",
+        "MODEL_PATH": tmp_path / "model.joblib",
+        "LABELS_PATH": tmp_path / "labels.joblib",
+    }
+    joblib.dump(vectorizer, paths["VECTORIZER_PATH"])
+    joblib.dump(model, paths["MODEL_PATH"])
+    joblib.dump(["negative", "neutral", "positive"], paths["LABELS_PATH"])
+
+    monkeypatch.setattr(ml_inference, "_ARTIFACTS", None)
+    for name, path in paths.items():
+        monkeypatch.setattr(ml_inference, name, path)
+    monkeypatch.setattr(ml_inference, "REGISTRY_DIR", tmp_path / "registry")
+    monkeypatch.setattr(ml_inference, "_SERVED", None)
+    monkeypatch.setattr(ml_inference, "_NEXT_POLL", 0.0)
+    return paths
+
+
+def test_predict_sentiment_batch_empty_texts_return_unknown():
+    assert ml_inference.predict_sentiment_batch(["", "   ", None]) == ["", "", ""]
+
+
+@requires_stopwords
+def test_predict_sentiment_batch_matches_single_predictions(tiny_model):
+    texts = ["Отличное платье!", "", "Ужасное качество", "Нормальный товар", "и"]
+    batch = ml_inference.predict_sentiment_batch(texts)
+    assert batch == [ml_inference.predict_sentiment(t) for t in texts]
+    assert batch[:4] == ["positive", "", "negative", "neutral"]
+
+
+@requires_stopwords
+def test_duplicate_reviews_are_served_from_prediction_cache(tiny_model, monkeypatch):
+    from reviews.prediction_cache import PredictionCache
+
+    monkeypatch.setattr(ml_inference, "_PREDICTION_CACHE", PredictionCache(maxsize=10))
+    ml_inference.predict_sentiment_batch(["Отличное платье", "Отличное платье"])
+    assert ml_inference.prediction_cache_stats()["misses"] == 1
+
+    assert ml_inference.predict_sentiment("Отличное платье") == "positive"
+    assert ml_inference.prediction_cache_stats()["hits"] == 1
+
+
+@requires_stopwords
+def test_bundle_engine_matches_sklearn_engine(
+    tiny_model, tmp_path, monkeypatch, settings
+):
+    import joblib
+
+    from reviews.ml_bundle import export_bundle
+
+    export_bundle(
+        joblib.load(tiny_model["VECTORIZER_PATH"]),
+        joblib.load(tiny_model["MODEL_PATH"]),
+        joblib.load(tiny_model["LABELS_PATH"]),
+        tmp_path / "bundle",
+    )
+    texts = ["Отличное платье!", "Ужасное качество", "Нормальный товар", ""]
+    expected = ml_inference.predict_sentiment_batch(texts)
+
+    settings.SENTIMENT_ENGINE = "bundle"
+    monkeypatch.setattr(ml_inference, "BUNDLE_DIR", tmp_path / "bundle")
+    monkeypatch.setattr(ml_inference, "_BUNDLE", None)
+    assert ml_inference.model_files_exist()
+    assert ml_inference.predict_sentiment_batch(texts) == expected
+
+
+def _publish(registry, version, texts, labels, tmp_path):
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    from reviews import model_registry
+
+    source = tmp_path / f"source-{version}"
+    source.mkdir()
+    vectorizer = TfidfVectorizer()
+    model = LogisticRegression().fit(vectorizer.fit_transform(texts), labels)
+    names = model_registry.ARTIFACT_FILES
+    joblib.dump(vectorizer, source / names[0])
+    joblib.dump(model, source / names[1])
+    joblib.dump(["negative", "neutral", "positive"], source / names[2])
+    model_registry.publish(registry, source, version=version, activate=True)
+
+
+@requires_stopwords
+def test_registry_version_is_hot_swapped(tiny_model, tmp_path, settings):
+    import threading
+
+    settings.SENTIMENT_MODEL_POLL_SECONDS = 0
+    texts = ["отличный платье", "ужасный качество"] * 5
+    registry = ml_inference.REGISTRY_DIR
+
+    assert ml_inference.predict_sentiment_batch(["Отличное платье"]) == ["positive"]
+    assert ml_inference.served_model_version() == ml_inference.LEGACY_VERSION
+
+    _publish(registry, "v1", texts, ["positive", "negative"] * 5, tmp_path)
+    [prediction] = ml_inference.preprocess_and_predict_batch(["Отличное платье"])
+    assert prediction.label == "positive"
+    assert prediction.model_version == "v1"
+
+    # v2 swaps the labels; the first batch after activation is still served
+    # by v1 while v2 loads in the background
+    _publish(registry, "v2", texts, ["negative", "positive"] * 5, tmp_path)
+    [prediction] = ml_inference.preprocess_and_predict_batch(["Отличное платье"])
+    assert (prediction.label, prediction.model_version) == ("positive", "v1")
+
+    for thread in threading.enumerate():
+        if thread.name.startswith("sentiment-model-load-"):
+            thread.join(timeout=30)
+    [prediction] = ml_inference.preprocess_and_predict_batch(["Отличное платье"])
+    assert (prediction.label, prediction.model_version) == ("negative", "v2")
+
+    from reviews import model_registry
+
+    model_registry.activate_version(registry, "v1")
+    assert ml_inference.refresh_model(wait=True) == "v1"
+    assert ml_inference.predict_sentiment("Отличное платье") == "positive"
+
+
+@requires_stopwords
+@pytest.mark.django_db
+def test_apply_sentiment_model_skips_preprocessing_on_cache_hits(
+    tiny_model, monkeypatch
+):
+    from django.core.management import call_command
+
+    from reviews import text_preprocess
+    from reviews.models import Review
+    from reviews.prediction_cache import PredictionCache
+
+    monkeypatch.setattr(ml_inference, "_PREDICTION_CACHE", PredictionCache(maxsize=10))
+    for _ in range(3):
+        Review.objects.create(review_text="Отличное платье")
+    run = ["apply_sentiment_model", "--no-lemma-cache"]
+    call_command(*run, stdout=open("/dev/null", "w"))
+
+    Review.objects.update(sentiment="", processed_text="", processed_version="")
+
+    def no_lemmatization(tokens):
+        raise AssertionError("cache hits must not be lemmatized")
+
+    monkeypatch.setattr(text_preprocess, "lemmatize_ru", no_lemmatization)
+    call_command(*run, stdout=open("/dev/null", "w"))
+    assert set(Review.objects.values_list("sentiment", "processed_text")) == {
+        ("positive", "отличный платье")
+    }
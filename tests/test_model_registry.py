@@ -0,0 +1,61 @@
+import pytest
+
+from reviews import model_registry
+
+
+@pytest.fixture
+def artifacts(tmp_path):
+    source = tmp_path / "ml"
+    source.mkdir()
+    for name in model_registry.ARTIFACT_FILES:
+        (source / name).write_bytes(name.encode())
+    return source
+
+
+def test_publish_and_activate(tmp_path, artifacts):
+    registry = tmp_path / "registry"
+    assert model_registry.list_versions(registry) == []
+    assert model_registry.active_version(registry) is None
+
+    model_registry.publish(registry, artifacts, version="v1")
+    assert model_registry.active_version(registry) is None
+    model_registry.publish(registry, artifacts, version="v2", activate=True)
+
+    assert model_registry.list_versions(registry) == ["v1", "v2"]
+    assert model_registry.active_version(registry) == "v2"
+    manifest = model_registry.read_manifest(registry, "v1")
+    assert manifest["version"] == "v1"
+    assert manifest["has_bundle"] is False
+    # same content, same fingerprint
+    assert (
+        manifest["fingerprint"]
+        == model_registry.read_manifest(registry, "v2")["fingerprint"]
+    )
+
+    model_registry.activate_version(registry, "v1")
+    assert model_registry.active_version(registry) == "v1"
+    assert not list(registry.glob("*.tmp"))
+
+
+def test_published_versions_are_immutable(tmp_path, artifacts):
+    registry = tmp_path / "registry"
+    model_registry.publish(registry, artifacts, version="v1")
+    with pytest.raises(ValueError, match="already exists"):
+        model_registry.publish(registry, artifacts, version="v1")
+
+
+def test_activate_unknown_version_keeps_pointer(tmp_path, artifacts):
+    registry = tmp_path / "registry"
+    model_registry.publish(registry, artifacts, version="v1", activate=True)
+    with pytest.raises(LookupError):
+        model_registry.activate_version(registry, "v9")
+    with pytest.raises(ValueError, match="Invalid model version"):
+        model_registry.activate_version(registry, "../v1")
+    assert model_registry.active_version(registry) == "v1"
+
+
+def test_publish_requires_all_artifacts(tmp_path, artifacts):
+    (artifacts / model_registry.ARTIFACT_FILES[0]).unlink()
+    with pytest.raises(FileNotFoundError):
+        model_registry.publish(tmp_path / "registry", artifacts, version="v1")
+    assert model_registry.list_versions(tmp_path / "registry") == []
@@ -0,0 +1,76 @@
+import sqlite3
+
+from reviews import prediction_cache
+from reviews.prediction_cache import (
+    DiskPredictionCache,
+    PredictionCache,
+    prediction_key,
+)
+
+
+def test_prediction_key_depends_on_model_and_pipeline():
+    key = prediction_key("Отлично", "model-a", "v1")
+    assert key == prediction_key("Отлично", "model-a", "v1")
+    assert key != prediction_key("Отлично", "model-b", "v1")
+    assert key != prediction_key("Отлично", "model-a", "v2")
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    path = tmp_path / "predictions.sqlite3"
+    first = PredictionCache(maxsize=10, disk_path=path)
+    first.bind("model-a")
+    first.put_many({"k1": ("отлично", "positive")})
+
+    second = PredictionCache(maxsize=10, disk_path=path)
+    second.bind("model-a")
+    assert second.get_many(["k1", "k2"]) == {"k1": ("отлично", "positive")}
+
+
+def test_binding_new_fingerprint_keeps_disk_rows_of_other_models(tmp_path):
+    path = tmp_path / "predictions.sqlite3"
+    old = PredictionCache(maxsize=10, disk_path=path)
+    old.bind("model-a")
+    old.put_many({"k1": ("отлично", "positive")})
+
+    new = PredictionCache(maxsize=10, disk_path=path)
+    new.bind("model-b")
+    new.put_many({"k2": ("плохо", "negative")})
+
+    assert old.memory.get("k1") == ("отлично", "positive")
+    assert new.memory.get("k1") is None
+    assert new.disk.counts() == {"model-a": 1, "model-b": 1}
+    # a process still serving model-a keeps hitting its rows on disk
+    assert PredictionCache(maxsize=10, disk_path=path).get_many(["k1"]) == {
+        "k1": ("отлично", "positive")
+    }
+
+
+def test_prune_by_age_and_size(tmp_path, monkeypatch):
+    disk = DiskPredictionCache(tmp_path / "predictions.sqlite3")
+    for i in range(5):
+        monkeypatch.setattr(prediction_cache.time, "time", lambda: 100.0 + i)
+        disk.put_many({f"k{i}": ("текст", "neutral")}, f"model-{i % 2}")
+
+    assert disk.prune(max_age=2.5, now=104.0) == 2
+    assert sorted(disk.get_many(f"k{i}" for i in range(5))) == ["k2", "k3", "k4"]
+    assert disk.prune(max_rows=2) == 1
+    assert sorted(disk.get_many(f"k{i}" for i in range(5))) == ["k3", "k4"]
+    assert disk.prune(max_rows=10) == 0
+
+
+def test_old_cache_file_gets_timestamp_column(tmp_path):
+    path = tmp_path / "predictions.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE predictions (key TEXT PRIMARY KEY, fingerprint TEXT "
+            "NOT NULL, processed TEXT NOT NULL, label TEXT NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO predictions VALUES ('k1', 'model-a', 'x', 'positive')"
+        )
+    conn.close()
+
+    disk = DiskPredictionCache(path)
+    assert disk.get_many(["k1"]) == {"k1": ("x", "positive")}
+    # untimestamped rows are the oldest ones
+    assert disk.prune(max_age=60) == 1
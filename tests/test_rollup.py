@@ -0,0 +1,160 @@
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from reviews import importer, rollup
+from reviews.ml_inference import Prediction
+from reviews.models import Region, Review, SentimentRollup
+
+# ключ rollup с именами справочников вместо id
+NAMED_KEY = (
+    "day",
+    "region__name",
+    "product_category__name",
+    "gender__name",
+    "age_bucket",
+    "source__name",
+    "sentiment",
+)
+
+
+def _snapshot() -> dict:
+    rows = SentimentRollup.objects.values_list(*NAMED_KEY, "count")
+    return {row[:-1]: row[-1] for row in rows}
+
+
+def _assert_matches_rebuild():
+    incremental = _snapshot()
+    rollup.rebuild_rollup()
+    assert incremental == _snapshot()
+
+
+def test_age_bucket():
+    assert [rollup.age_bucket(a) for a in (None, 0, 17, 18, 34, 54, 55, 90)] == [
+        "",
+        "<18",
+        "<18",
+        "18-24",
+        "25-34",
+        "45-54",
+        "55+",
+        "55+",
+    ]
+
+
+@pytest.mark.django_db
+def test_save_and_delete_apply_deltas():
+    day = date(2025, 10, 27)
+    moscow = Region.of("Москва")
+    a = Review.objects.create(review_text="a", date=day, region=moscow, age=30)
+    Review.objects.create(review_text="b", date=day, region=moscow, age=31)
+    Review.objects.create(review_text="c", region=Region.of("Казань"))
+    key = (day, "Москва", None, None, "25-34", None, "")
+    assert _snapshot() == {key: 2, (None, "Казань", None, None, "", None, ""): 1}
+
+    a.sentiment = "positive"
+    a.save()
+    assert _snapshot()[key] == 1
+    assert _snapshot()[key[:6] + ("positive",)] == 1
+
+    # правка полей вне ключа не трогает агрегат
+    a.processed_text = "a"
+    a.save(update_fields=["processed_text"])
+    a.delete()
+    assert key[:6] + ("positive",) not in _snapshot()
+    _assert_matches_rebuild()
+
+
+@pytest.mark.django_db
+def test_import_and_scoring_keep_rollup_in_sync(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "pipeline_version", lambda: "test")
+    monkeypatch.setattr(
+        importer, "preprocess_many", lambda texts: [t.lower() for t in texts]
+    )
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        "text,date,region,age\n"
+        + "".join(
+            f"отзыв {i},2025-10-{1 + i % 3:02d},{'Москва' if i % 2 else 'Казань'},"
+            f"{20 + i}\n"
+            for i in range(30)
+        ),
+        encoding="utf-8",
+    )
+    mapping = {"review_text": "text", "date": "date", "region": "region", "age": "age"}
+    importer.import_reviews_file(str(path), "reviews.csv", mapping, chunk_rows=7)
+    assert sum(_snapshot().values()) == 30
+    _assert_matches_rebuild()
+
+    from reviews.management.commands import apply_sentiment_model
+
+    def fake_predict(texts):
+        return [
+            Prediction(t, "negative" if t.endswith("1") else "positive", "v1")
+            for t in texts
+        ]
+
+    monkeypatch.setattr(
+        apply_sentiment_model, "preprocess_and_predict_batch", fake_predict
+    )
+    call_command(
+        "apply_sentiment_model",
+        "--batch",
+        "8",
+        "--no-lemma-cache",
+        stdout=open("/dev/null", "w"),
+    )
+    counts = {}
+    for key, count in _snapshot().items():
+        counts[key[-1]] = counts.get(key[-1], 0) + count
+    assert counts == {"negative": 3, "positive": 27}
+    _assert_matches_rebuild()
+
+
+@pytest.mark.django_db
+def test_rebuild_command_recovers_after_bulk_update():
+    Review.objects.create(review_text="a", region=Region.of("Москва"))
+    # QuerySet.update обходит сигналы — агрегат устаревает
+    Review.objects.update(region=Region.of("Казань"))
+    assert list(_snapshot()) == [(None, "Москва", None, None, "", None, "")]
+
+    call_command("rebuild_sentiment_rollup", stdout=open("/dev/null", "w"))
+    assert _snapshot() == {(None, "Казань", None, None, "", None, ""): 1}
+
+
+@pytest.mark.django_db
+def test_delta_for_missing_key_does_not_create_negative_row(caplog):
+    review = Review.objects.create(review_text="a", region=Region.of("Москва"))
+    Review.objects.update(region=Region.of("Казань"))
+    Review.objects.get(id=review.id).delete()
+
+    # строки Казани в агрегате не было — вычитать не из чего
+    assert _snapshot() == {(None, "Москва", None, None, "", None, ""): 1}
+    assert "rebuild_sentiment_rollup" in caplog.text
+
+
+@pytest.mark.django_db
+def test_import_race_does_not_count_rows_inserted_elsewhere(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "pipeline_version", lambda: "test")
+    monkeypatch.setattr(importer, "preprocess_many", lambda texts: texts)
+    path = tmp_path / "reviews.csv"
+    path.write_text("text,region\nраз,Москва\nдва,Москва\n", encoding="utf-8")
+    mapping = {"review_text": "text", "region": "region"}
+    importer.import_reviews_file(str(path), "reviews.csv", mapping)
+
+    # параллельный импорт вставил "раз" уже после проверки хэшей
+    path.write_text("text,region\nраз,Москва\nтри,Москва\n", encoding="utf-8")
+    real_lookup = importer.existing_content_hashes
+    calls = []
+
+    def racy_lookup(hashes):
+        calls.append(hashes)
+        return set() if len(calls) == 1 else real_lookup(hashes)
+
+    monkeypatch.setattr(importer, "existing_content_hashes", racy_lookup)
+    importer.import_reviews_file(str(path), "reviews.csv", mapping)
+
+    assert Review.objects.count() == 3
+    assert sum(_snapshot().values()) == 3
+    _assert_matches_rebuild()
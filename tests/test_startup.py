@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# django.setup() + загрузка URLconf: ~0.8 с с ленивой инициализацией против
+# ~2.3 с, когда стоп-слова NLTK и словари pymorphy2 грузятся при старте.
+# Порог по времени на общем CI либо мигает, либо пропускает регрессию,
+# поэтому проверяется, что тяжёлые модули при старте не импортируются.
+STARTUP_PROBE = """
+import json, os, sys
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reviews_project.settings")
+import django
+django.setup()
+import reviews_project.urls
+print(json.dumps({
+    "modules": [m for m in ("pymorphy2", "nltk", "scipy") if m in sys.modules],
+}))
+"""
+
+
+def _probe_startup() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE],
+        cwd=settings.BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PRELOAD_TEXT_RESOURCES": "0"},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_startup_does_not_load_text_resources_or_model():
+    assert _probe_startup()["modules"] == []
@@ -0,0 +1,118 @@
+import pytest
+from nltk.corpus import stopwords
+
+try:
+    stopwords.words("russian")
+except LookupError:
+    pytest.skip("NLTK stopwords corpus is not installed", allow_module_level=True)
+
+from reviews import text_preprocess  # noqa: E402
+
+CORPUS = [
+    "Очень понравилось платье, буду заказывать ещё!",
+    "Ужасное качество, больше не куплю. https://example.com/item?id=1",
+    "<p>Нормальный товар</p>, ничего особенного",
+    "Очень понравилось платье, буду заказывать ещё!",
+    "",
+    "Size M fits well, доставка быстрая",
+]
+
+
+def test_preprocess_many_matches_pipeline():
+    expected = [text_preprocess.preprocess_pipeline(t) for t in CORPUS]
+    assert text_preprocess.preprocess_many(CORPUS) == expected
+
+
+def test_preprocess_many_without_lemmatization_matches_pipeline():
+    expected = [
+        text_preprocess.preprocess_pipeline(t, do_lemmatize=False) for t in CORPUS
+    ]
+    assert text_preprocess.preprocess_many(CORPUS, do_lemmatize=False) == expected
+
+
+def test_lemmatize_ru_uses_cache():
+    text_preprocess._LEMMA_CACHE.clear()
+    text_preprocess.lemmatize_ru(["платья", "платья"])
+    stats = text_preprocess.lemma_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+
+def test_imap_preprocess_matches_serial_batches():
+    from reviews.preprocess_pool import imap_preprocess, preprocess_batch
+
+    batches = [list(enumerate(CORPUS)), list(enumerate(reversed(CORPUS)))]
+    expected = [preprocess_batch(b) for b in batches]
+    parallel = list(imap_preprocess(batches, workers=2, use_lemma_cache=False))
+    assert [result for result, _ in parallel] == expected
+    # счётчики кэша лемм считаются в воркерах и приходят вместе с батчем
+    lookups = sum(c["cache_hits"] + c["cache_misses"] for _, c in parallel)
+    assert lookups > 0
+
+
+def _reference_tokens(text):
+    s = text_preprocess.basic_cleanup(text)
+    return text_preprocess.filter_stopwords(text_preprocess.tokenize(s))
+
+
+def test_clean_tokens_matches_reference_chain_on_tricky_inputs():
+    tricky = [
+        "abchttp://x.ru/path остаток",
+        "wwwww.example.com и дальше",
+        '<a href="http://x.ru">ссылка</a> текст <b>жирный',
+        "HTTPS://EXAMPLE.COM/Путь Товар",
+        "ſtrange Kelvin İstanbul ıı",
+        "ёлка ЁЛКА\x1cзелёная\tтекст\nстрока",
+        "123 4567 цена-качество 50%!!!",
+        "<<>> < > >< текст",
+        "   ",
+    ]
+    for text in tricky + CORPUS:
+        assert text_preprocess.clean_tokens(text) == _reference_tokens(text), text
+
+
+def test_clean_tokens_matches_reference_chain_on_random_corpus():
+    import random
+
+    rng = random.Random(42)
+    alphabet = list("абвгдеёжзийклмнопрстуфхцчшщъыьэюяabcdefhlpstwxyz0123")
+    alphabet += list("АБЁABCZ .,:;!?/<>\"'-_%\t\n ſKİ")
+    pieces = ["http://", "https://", "www.", "<b>", "</p>", "<a href='", "'>"]
+    for _ in range(2000):
+        parts = []
+        for _ in range(rng.randint(0, 20)):
+            if rng.random() < 0.1:
+                parts.append(rng.choice(pieces))
+            else:
+                parts.append("".join(rng.choices(alphabet, k=rng.randint(1, 8))))
+        text = "".join(parts)
+        assert text_preprocess.clean_tokens(text) == _reference_tokens(text), text
+
+
+def test_pipeline_version_tracks_settings(monkeypatch):
+    base = text_preprocess.pipeline_version()
+    assert base == text_preprocess.pipeline_version()
+    assert base != text_preprocess.pipeline_version(do_lemmatize=False)
+
+    monkeypatch.setattr(
+        text_preprocess, "_COMMON_TRASH", text_preprocess._COMMON_TRASH | {"новое"}
+    )
+    assert text_preprocess.pipeline_version() != base
+
+
+def test_pipeline_version_is_memoized_until_stopwords_reload(monkeypatch):
+    base = text_preprocess.pipeline_version()
+    calls = []
+    meta = text_preprocess._lemma_cache_meta
+    monkeypatch.setattr(
+        text_preprocess, "_lemma_cache_meta", lambda: calls.append(1) or meta()
+    )
+    assert text_preprocess.pipeline_version() == base
+    assert calls == []
+
+    # перезагрузка стоп-слов даёт новый набор — отпечаток считается заново
+    monkeypatch.setattr(
+        text_preprocess, "_RU_STOP", text_preprocess.get_stopwords() - {"и"}
+    )
+    assert text_preprocess.pipeline_version() != base
+    assert calls == [1]
@@ -0,0 +1,208 @@
+import json
+
+import pandas as pd
+import pytest
+
+from reviews.utils import (
+    HEADER_ROWS_PREVIEW,
+    infer_date_format,
+    parse_date_or_none,
+    iter_json_records,
+    iter_xlsx_batches,
+    read_file_preview,
+    read_xlsx_to_df,
+    safe_read_textlike_file_to_df,
+    series_to_date_or_none,
+    series_to_int_or_none,
+    series_to_str_or_empty,
+    sniff_csv_dialect,
+    to_int_or_none,
+    to_str_or_empty,
+)
+
+
+@pytest.mark.parametrize(
+    "encoding, sep",
+    [("utf-8", ","), ("cp1251", ";"), ("utf-8", "\t"), ("cp1251", "|")],
+)
+def test_sniff_csv_dialect(tmp_path, encoding, sep):
+    path = tmp_path / "reviews.csv"
+    rows = [["text", "region", "age"]] + [
+        [f"Отзыв номер {i}", "Москва", str(i)] for i in range(20)
+    ]
+    path.write_text("\n".join(sep.join(r) for r in rows), encoding=encoding)
+
+    assert sniff_csv_dialect(str(path)) == {"encoding": encoding, "sep": sep}
+    df = safe_read_textlike_file_to_df(str(path), "reviews.csv")
+    assert list(df.columns) == ["text", "region", "age"]
+    assert len(df) == 20
+
+
+def test_sniff_ignores_separators_inside_quotes(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        'text;age\n"Хорошо, но дорого, очень";30\n"Да, да, да";20\n', encoding="utf-8"
+    )
+    assert sniff_csv_dialect(str(path))["sep"] == ";"
+
+
+def test_sniff_utf8_bom_and_late_cyrillic(tmp_path, monkeypatch):
+    path = tmp_path / "bom.csv"
+    path.write_bytes("text,age\nотзыв,1\n".encode("utf-8-sig"))
+    assert sniff_csv_dialect(str(path))["encoding"] == "utf-8-sig"
+
+    # первые килобайты — только ASCII, кириллица в cp1251 дальше по файлу
+    monkeypatch.setattr("reviews.utils.SNIFF_BYTES", 64)
+    path = tmp_path / "late.csv"
+    path.write_bytes(b"text,age\n" + b"ok,1\n" * 100 + "плохо,2\n".encode("cp1251"))
+    assert sniff_csv_dialect(str(path))["encoding"] == "cp1251"
+
+
+def test_read_file_preview_reads_only_head(tmp_path):
+    path = tmp_path / "reviews.csv"
+    path.write_text(
+        "text;age\n" + "".join(f"отзыв {i};{i}\n" for i in range(1000)),
+        encoding="cp1251",
+    )
+    df, dialect = read_file_preview(str(path), "reviews.csv")
+    assert list(df.columns) == ["text", "age"]
+    assert len(df) == HEADER_ROWS_PREVIEW
+    assert dialect == {"encoding": "cp1251", "sep": ";"}
+
+    path = tmp_path / "reviews.ndjson"
+    path.write_text('{"text": "a"}\n' * 50, encoding="utf-8")
+    df, dialect = read_file_preview(str(path), "reviews.ndjson")
+    assert (len(df), dialect) == (HEADER_ROWS_PREVIEW, None)
+
+
+JSON_ROWS = [
+    {"text": "Отличное платье, рекомендую", "age": 30, "tags": ["a", "]"]},
+    {"text": 'Ужасное качество \\ "кавычки"', "age": None},
+    {"text": "Нормально", "age": 41.5, "nested": {"k": [1, 2, {"x": "}"}]}},
+]
+
+
+@pytest.mark.parametrize("read_bytes", [1, 7, 64 * 1024])
+def test_iter_json_records_streams_array_and_ndjson(tmp_path, monkeypatch, read_bytes):
+    # маленький буфер: элементы, числа и многобайтовые символы режутся границей
+    monkeypatch.setattr("reviews.utils.JSON_READ_BYTES", read_bytes)
+    array = tmp_path / "reviews.json"
+    array.write_bytes(
+        b"\xef\xbb\xbf \n[\n"
+        + ",\n ".join(json.dumps(r, ensure_ascii=False) for r in JSON_ROWS).encode()
+        + b"\n]\n"
+    )
+    ndjson = tmp_path / "reviews.ndjson"
+    ndjson.write_text(
+        "\n".join(json.dumps(r, ensure_ascii=False) for r in JSON_ROWS) + "\n\n",
+        encoding="utf-8",
+    )
+    for path in (array, ndjson):
+        with open(path, "rb") as f:
+            assert list(iter_json_records(f)) == JSON_ROWS
+
+    empty = tmp_path / "empty.json"
+    empty.write_text("[ ]", encoding="utf-8")
+    with open(empty, "rb") as f:
+        assert list(iter_json_records(f)) == []
+
+
+def test_iter_json_records_rejects_truncated_array(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('[{"text": "a"}, {"text": "b"', encoding="utf-8")
+    with open(path, "rb") as f, pytest.raises(ValueError):
+        list(iter_json_records(f))
+
+
+def _write_workbook(path):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Сводка"
+    wb.active.append(["не отзывы"])
+    ws = wb.create_sheet("Отзывы")
+    ws.append([])
+    ws.append(["text", "age", None])
+    for i in range(5):
+        ws.append([f"отзыв {i}", i, "x"])
+    ws.append([None, None])
+    ws.append(["без возраста"])
+    wb.save(path)
+
+
+def test_iter_xlsx_batches_streams_selected_sheet(tmp_path):
+    path = tmp_path / "reviews.xlsx"
+    _write_workbook(path)
+
+    batches = list(iter_xlsx_batches(str(path), 2, sheet="Отзывы"))
+    assert [len(rows) for _, rows in batches] == [2, 2, 2]
+    assert batches[0][0] == ["text", "age", "Unnamed: 2"]
+    assert batches[0][1][0] == ("отзыв 0", 0, "x")
+    assert batches[-1][1][-1] == ("без возраста", None, None)
+
+    assert list(read_xlsx_to_df(str(path), sheet="2").columns)[0] == "text"
+    assert list(read_xlsx_to_df(str(path)).columns) == ["не отзывы"]
+    with pytest.raises(ValueError, match="Листы в файле: Сводка, Отзывы"):
+        read_xlsx_to_df(str(path), sheet="3")
+
+    df, options = read_file_preview(str(path), "reviews.xlsx", sheet="Отзывы")
+    assert (len(df), options) == (HEADER_ROWS_PREVIEW, {"sheet": "Отзывы"})
+
+
+MIXED_VALUES = [
+    None,
+    float("nan"),
+    "",
+    "  ",
+    " 42 ",
+    "+7",
+    "-3",
+    "1_000",
+    "3.0",
+    "abc",
+    "None",
+    "NaT",
+    17,
+    -5,
+    30.0,
+    True,
+    "2025-10-27",
+    "2025-1-5",
+    "10.11.2025",
+    "27.10.2025",
+    "10/27/2025 14:33",
+    "20251027",
+    "2025-13-01",
+    "вчера",
+]
+
+
+@pytest.mark.parametrize(
+    "series",
+    [
+        pd.Series(MIXED_VALUES * 3, dtype=object),
+        pd.Series([1, 0, -2, 35]),
+        pd.Series([1.0, float("nan"), 30.5]),
+        pd.Series([True, False]),
+        pd.Series([f"2025-{m:02d}-{d:02d}" for m in range(1, 13) for d in (1, 15)]),
+        pd.Series([f"2025-10-{d:02d} 12:{d:02d}:00" for d in range(1, 29)] + ["вчера"]),
+        pd.to_datetime(pd.Series(["2025-10-27", "2024-02-29"])),
+    ],
+)
+def test_series_converters_match_row_helpers(series):
+    values = series.tolist()
+    for convert, helper in [
+        (series_to_str_or_empty, to_str_or_empty),
+        (series_to_int_or_none, to_int_or_none),
+        (series_to_date_or_none, parse_date_or_none),
+    ]:
+        expected = [helper(v) for v in values]
+        actual = convert(series)
+        assert actual == expected
+        assert [type(v) for v in actual] == [type(v) for v in expected]
+
+
+def test_infer_date_format():
+    assert infer_date_format(["2025-10-27"] * 19 + ["вчера"]) == "%Y-%m-%d"
+    assert infer_date_format(["2025-10-27 10:00:00"]) == "%Y-%m-%d %H:%M:%S"
+    # 10.11.2025 dateutil читает как 11 октября — strptime здесь не годится
+    assert infer_date_format(["10.11.2025", "27.10.2025"]) is None